@@ -4,62 +4,387 @@ AI-powered meeting summary using Google Gemini (100% FREE)
 No OpenAI, no paid API - completely free!
 """
 
-import google.generativeai as genai
+import json
+import math
 import os
-from dotenv import load_dotenv
+import sys
 import time
-
-load_dotenv()
-
-# Configure Gemini
-GENAI_API_KEY = os.getenv("GENAI_API_KEY")
-if not GENAI_API_KEY:
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from render_cache import RenderCache, segment_key, segment_version
+from llm_client import get_model, get_response_cache, model_cache_key, iter_text
+from llm_gateway import get_gateway, PRIORITY_SUMMARY, PRIORITY_BACKGROUND, TIMEOUT_GRACE
+from extractive_summarizer import generate_local_summary
+from transcript_compactor import compact_transcript
+from summary_schema import (
+    SUMMARY_JSON_EXAMPLE, parse_summary_json, parse_partial_json,
+    validate_summary, render_summary_markdown, summary_to_markdown
+)
+
+# Gemini model (resolved lazily on the first summary - no network call here)
+model = get_model(PRIORITY_SUMMARY)
+background_model = get_model(PRIORITY_BACKGROUND)  # Rolling summary updates
+if not model:
     print("❌ ERROR: GENAI_API_KEY not found in .env file")
     print("Get your free key: https://makersuite.google.com/app/apikey")
-    model = None
-else:
-    genai.configure(api_key=GENAI_API_KEY)
+
+
+def _render_prompt_line(number, t):
+    """Transcript line as sent to the model"""
+    return f"[{t.get('time', '')}] {t.get('speaker', 'Unknown')}: {t.get('en', '')}\n"
+
+
+def _render_transcript_entry(number, t):
+    """Transcript entry in the final summary"""
+    return f"**{number}. [{t.get('time', '')}] {t.get('speaker', 'Unknown')}:**  \n{t.get('en', '')}\n\n"
+
+
+# Per-segment render caches (re-summarizing a meeting only renders new segments)
+prompt_cache = RenderCache(_render_prompt_line)
+transcript_cache = RenderCache(_render_transcript_entry)
+
+
+# Map-reduce settings (long meetings are summarized in parallel chunks)
+CHUNK_MAX_CHARS = int(os.getenv("MEETINGAI_SUMMARY_CHUNK_CHARS", "6000"))     # ~1500 tokens per chunk
+TOPIC_GAP_SECONDS = int(os.getenv("MEETINGAI_SUMMARY_TOPIC_GAP", "120"))      # Silence that starts a new chunk
+MIN_CHUNK_SEGMENTS = 5                                                        # Don't split on gaps before this
+MAP_CONCURRENCY = int(os.getenv("MEETINGAI_SUMMARY_CONCURRENCY", "4"))        # Parallel chunk requests
+REDUCE_FAN_IN = 8                                                             # Partial summaries per reduce call
+
+# Bump when a prompt below changes (invalidates cached responses)
+SUMMARY_TEMPLATE_VERSION = 4
+
+SAFETY_SETTINGS = {
+    'HARM_CATEGORY_HARASSMENT': 'BLOCK_NONE',
+    'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_NONE',
+    'HARM_CATEGORY_SEXUALLY_EXPLICIT': 'BLOCK_NONE',
+    'HARM_CATEGORY_DANGEROUS_CONTENT': 'BLOCK_NONE',
+}
+
+SUMMARY_JSON_FORMAT = f"""Respond with ONLY a JSON object in exactly this format:
+{SUMMARY_JSON_EXAMPLE}
+
+Rules:
+- Use speaker names and [HH:MM:SS] timestamps exactly as they appear in the transcript
+- Use "" when an owner, due date or timestamp is unknown
+- Be specific and professional"""
+
+CHUNK_NOTES_FORMAT = """Write concise notes using exactly these headings:
+### Key Points
+### Action Items (who / what / when)
+### Decisions
+
+Keep speaker names and timestamps where relevant. Bullet points only, no introduction."""
+
+
+def _parse_time(value):
+    """'HH:MM:SS' -> seconds (None if missing/invalid)"""
+    try:
+        h, m, s = (int(part) for part in str(value).split(":"))
+        return h * 3600 + m * 60 + s
+    except ValueError:
+        return None
+
+
+def chunk_transcripts(transcripts_list, max_chars=CHUNK_MAX_CHARS, gap_seconds=TOPIC_GAP_SECONDS):
+    """
+    Split a transcript into consecutive chunks for map-reduce summarization
+
+    A new chunk starts when the current one would exceed max_chars, or at a
+    long pause between segments (a likely topic change).
+
+    Args:
+        transcripts_list: List of transcript dicts
+        max_chars: Prompt characters per chunk
+        gap_seconds: Pause that starts a new chunk (0 disables)
+
+    Returns:
+        list: [(start, end), ...] index ranges (end exclusive)
+    """
+    chunks = []
+    start = 0
+    size = 0
+    last_time = None
+
+    for index, t in enumerate(transcripts_list):
+        line_size = len(prompt_cache.fragment(index + 1, index, t))
+        seconds = _parse_time(t.get('time'))
+
+        new_topic = (
+            gap_seconds and seconds is not None and last_time is not None and
+            seconds - last_time >= gap_seconds and index - start >= MIN_CHUNK_SEGMENTS
+        )
+        if index > start and (size + line_size > max_chars or new_topic):
+            chunks.append((start, index))
+            start = index
+            size = 0
+
+        size += line_size
+        if seconds is not None:
+            last_time = seconds
+
+    if start < len(transcripts_list):
+        chunks.append((start, len(transcripts_list)))
+    return chunks
+
+
+def _generate(llm, prompt, max_output_tokens, stream=False, json_output=False):
+    generation_config = {
+        'temperature': 0.7,
+        'top_p': 0.8,
+        'top_k': 40,
+        'max_output_tokens': max_output_tokens,
+    }
+    if json_output:
+        generation_config['response_mime_type'] = 'application/json'
     
-    # Try latest Gemini models
-    model = None
-    model_names = [
-        "models/gemini-2.5-flash",       # Latest, fastest
-        "models/gemini-2.0-flash",       # Stable
-        "models/gemini-flash-latest",    # Auto-updated
-        "models/gemini-pro-latest",      # High quality
+    return llm.generate_content(
+        prompt,
+        generation_config=generation_config,
+        safety_settings=SAFETY_SETTINGS,
+        **({'stream': True} if stream else {})
+    )
+
+
+def _response_text(response):
+    """Response text, or '' if the response was blocked/empty"""
+    try:
+        return response.text or ""
+    except ValueError:
+        return ""  # Blocked responses raise on .text
+
+
+def _cache_key(kind, llm, transcripts_list, start=0, end=None, *extra):
+    """Response cache key: model, template version and the segments (id + content)"""
+    segments = [
+        (segment_key(index, transcripts_list[index]), segment_version(transcripts_list[index]))
+        for index in range(start, len(transcripts_list) if end is None else end)
     ]
-    
-    for model_name in model_names:
-        try:
-            model = genai.GenerativeModel(model_name)
-            # Quick test
-            test_response = model.generate_content("Hi")
-            print(f"✅ AI Summarizer using: {model_name}")
-            break
-        except Exception as e:
-            print(f"⚠️ {model_name} failed, trying next...")
-            continue
-    
-    if not model:
-        print("❌ No Gemini model available")
+    return get_response_cache().make_key(
+        kind, SUMMARY_TEMPLATE_VERSION, model_cache_key(llm), segments, *extra
+    )
+
+
+def _summarize_chunk(llm, transcripts_list, start, end, part, parts):
+    """Map step: notes for one chunk (falls back to the raw lines if blocked)"""
+    chunk_text = prompt_cache.render(transcripts_list, start, end)
+    first = transcripts_list[start].get('time', '')
+    last = transcripts_list[end - 1].get('time', '')
+
+    prompt = f"""You are an expert meeting analyzer. Below is part {part} of a meeting transcript ({first} - {last}).
+
+{chunk_text}
 
+{CHUNK_NOTES_FORMAT}"""
 
-def generate_ai_summary(transcripts_list):
+    # Earlier chunks are unchanged when a growing meeting is summarized again
+    notes = get_response_cache().get_or_compute(
+        _cache_key("chunk", llm, transcripts_list, start, end, part),
+        lambda: _response_text(_generate(llm, prompt, 800))
+    )
+    if not notes:
+        print(f"⚠️ Chunk {part}/{parts} returned no summary, using transcript lines")
+        notes = chunk_text[:CHUNK_MAX_CHARS // 4]
+    return f"## Part {part} ({first} - {last})\n{notes.strip()}\n"
+
+
+def _merge_notes(llm, notes):
+    """Intermediate reduce step: merge consecutive partial notes into one"""
+    joined = "\n".join(notes)
+    prompt = f"""You are an expert meeting analyzer. Merge these notes from consecutive parts of one meeting into a single set of notes. Remove repetition but keep every action item and decision.
+
+{joined}
+
+{CHUNK_NOTES_FORMAT}"""
+
+    merged = _response_text(_generate(llm, prompt, 1200))
+    return merged.strip() + "\n" if merged else joined
+
+
+def _map_reduce_notes(llm, transcripts_list, chunks):
     """
-    Generate AI-powered meeting summary using Gemini
-    
+    Summarize chunks in parallel and merge until the notes fit in one prompt
+
+    Returns:
+        str: Combined notes for the final summary prompt
+    """
+    parts = len(chunks)
+    workers = max(1, min(MAP_CONCURRENCY, parts))
+    print(f"🧩 Summarizing {parts} chunks ({workers} in parallel)...")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="summary") as pool:
+        notes = list(pool.map(
+            lambda item: _summarize_chunk(llm, transcripts_list, item[1][0], item[1][1], item[0] + 1, parts),
+            enumerate(chunks)
+        ))
+
+        # Reduce in rounds of REDUCE_FAN_IN (log depth, each round in parallel)
+        while len(notes) > 1 and sum(len(n) for n in notes) > CHUNK_MAX_CHARS:
+            groups = [notes[i:i + REDUCE_FAN_IN] for i in range(0, len(notes), REDUCE_FAN_IN)]
+            notes = list(pool.map(lambda group: _merge_notes(llm, group), groups))
+
+    return "\n".join(notes)
+
+
+def format_ai_summary(transcripts_list, ai_summary):
+    """
+    Build the final Markdown report around an AI summary
+
     Args:
-        transcripts_list: List of transcript dicts with 'speaker', 'en', 'bn', 'time'
-    
+        transcripts_list: List of transcript dicts
+        ai_summary: Summary text from the model
+
     Returns:
-        str: Markdown formatted AI summary
+        str: Markdown report (summary, statistics, full transcript)
     """
+    total_segments = len(transcripts_list)
+    total_words = sum(len(t.get('en', '').split()) for t in transcripts_list)
+    unique_speakers = len(set(t.get('speaker', 'Unknown') for t in transcripts_list))
+
+    header = f"""# 🤖 AI-Powered Meeting Analysis
+*Generated using Google Gemini 2.5 (FREE)*
+
+{ai_summary}
+
+---
+
+## 📊 Meeting Statistics
+
+| Metric | Value |
+|--------|-------|
+| Total Segments | {total_segments} |
+| Total Words | {total_words} |
+| Unique Speakers | {unique_speakers} |
+| Estimated Duration | ~{total_segments * 5} seconds |
+
+---
+
+## 📝 Full Transcript
+
+"""
+
+    # Add condensed transcript (cached fragments)
+    return "".join([
+        header,
+        transcript_cache.render(transcripts_list),
+        f"\n---\n\n*AI Summary generated on {time.strftime('%Y-%m-%d %H:%M:%S')}*\n",
+        "*Powered by Google Gemini 2.5 Flash (100% Free)*"
+    ])
+
+
+def update_running_summary(previous_summary, new_segments, llm=None):
+    """
+    Update a running meeting summary with newly committed segments
+
+    Only the previous summary and the new segments are sent, so the prompt
+    size doesn't grow with the meeting.
+
+    Args:
+        previous_summary: Current summary ('' for the first update)
+        new_segments: Transcript dicts added since the last update
+        llm: Model with generate_content() (default: shared Gemini model, background priority)
+
+    Returns:
+        str: Updated summary as JSON text (see summary_schema)
+
+    Raises:
+        SummaryValidationError: If the model did not return a valid summary
+    """
+    llm = background_model if llm is None else llm
+    new_segments, _ = compact_transcript(new_segments, token_budget=0)
+    new_text = "".join(_render_prompt_line(0, t) for t in new_segments)
+
+    if previous_summary:
+        source = f"""Summary of the meeting so far (JSON):
+{previous_summary}
+
+New transcript lines since that summary:
+{new_text}
+Update the summary so it covers the whole meeting so far. Keep every earlier action item and decision unless the new lines change them."""
+    else:
+        source = f"""Meeting Transcript (in progress):
+{new_text}"""
+
+    prompt = f"""You are an expert meeting analyzer, keeping a running summary of a meeting that is still in progress.
+
+{source}
+
+{SUMMARY_JSON_FORMAT}"""
+
+    summary = parse_summary_json(_response_text(_generate(llm, prompt, 2000, json_output=True)))
+    return json.dumps(summary, ensure_ascii=False)
+
+
+def _prompt_segments(transcripts_list):
+    """
+    Compacted transcript for prompting (the report keeps the full one)
+
+    Sentences are only trimmed to the token budget when the transcript goes
+    into a single prompt; map-reduce already keeps each chunk prompt small.
+
+    Returns:
+        tuple: (segments, chunks from chunk_transcripts())
+    """
+    segments, stats = compact_transcript(transcripts_list, token_budget=0)
+    chunks = chunk_transcripts(segments)
+    if len(chunks) == 1:
+        segments, stats = compact_transcript(transcripts_list)
+        chunks = [(0, len(segments))]
+    print(
+        f"🗜️ Transcript compacted: {stats['segments_in']} → {stats['segments_out']} lines, "
+        f"~{stats['tokens_in']} → ~{stats['tokens_out']} tokens"
+    )
+    return segments, chunks
+
+
+def _summary_wait_timeout(transcripts_list):
+    """
+    Seconds to wait for an identical summary request that is already running
+
+    One summary timeout per sequential LLM round: the map waves, the reduce
+    rounds and the final prompt.
+    """
+    parts = len(chunk_transcripts(transcripts_list))
+    rounds = 1
+    if parts > 1:
+        rounds += math.ceil(parts / MAP_CONCURRENCY)
+        while parts > 1:
+            parts = math.ceil(parts / REDUCE_FAN_IN)
+            rounds += 1
+    return rounds * (get_gateway().timeout_for(PRIORITY_SUMMARY) + TIMEOUT_GRACE)
+
+
+def _summary_prompt(llm, transcripts_list, chunks):
+    """Final prompt - the transcript itself, or map-reduced notes for long meetings"""
+    if len(chunks) == 1:
+        # Short meeting - summarize the transcript directly
+        source = f"Meeting Transcript (Generated at {time.strftime('%Y-%m-%d %H:%M:%S')}):\n{prompt_cache.render(transcripts_list)}"
+    else:
+        notes = _map_reduce_notes(llm, transcripts_list, chunks)
+        source = f"Meeting Notes ({len(chunks)} parts, generated at {time.strftime('%Y-%m-%d %H:%M:%S')}):\n{notes}"
     
-    if not transcripts_list or len(transcripts_list) == 0:
-        return "📭 No transcripts available for AI summary."
-    
-    if not model:
-        return """❌ Gemini AI Not Configured
+    # AI prompt for intelligent summary
+    return f"""You are an expert meeting analyzer. Analyze this meeting and provide a comprehensive summary.
+
+{source}
+
+{SUMMARY_JSON_FORMAT}"""
+
+
+def _finish_reason(response):
+    """Finish reason of the first candidate ('' if unknown)"""
+    candidates = getattr(response, 'candidates', None)
+    if not candidates:
+        return ""
+    reason = candidates[0].finish_reason
+    return getattr(reason, 'name', str(reason))
+
+
+def _not_configured_message():
+    return """❌ Gemini AI Not Configured
 
 **Setup Instructions:**
 
@@ -77,62 +402,16 @@ def generate_ai_summary(transcripts_list):
 
 **Fallback:** Use 'Show Summary' for basic transcript view.
 """
-    
-    try:
-        # Prepare transcript text
-        transcript_text = ""
-        for i, t in enumerate(transcripts_list, 1):
-            speaker = t.get('speaker', 'Unknown')
-            text = t.get('en', '')
-            timestamp = t.get('time', '')
-            transcript_text += f"[{timestamp}] {speaker}: {text}\n"
-        
-        # AI prompt for intelligent summary
-        prompt = f"""You are an expert meeting analyzer. Analyze this meeting transcript and provide a comprehensive summary.
-
-Meeting Transcript (Generated at {time.strftime('%Y-%m-%d %H:%M:%S')}):
-{transcript_text}
-
-Please provide:
-
-1. **Executive Summary** (2-3 sentences overview of the entire meeting)
-
-2. **Key Discussion Points** (Main topics discussed - use bullet points)
-
-3. **Action Items** (Any tasks, decisions, or follow-ups mentioned)
 
-4. **Important Decisions** (Key conclusions or agreements reached)
 
-5. **Next Steps** (What should happen after this meeting)
-
-6. **Suggestions** (Recommendations for improvement or follow-up)
-
-Format your response in clean markdown. Be specific and professional."""
-
-        # Generate with Gemini
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.7,
-                top_p=0.8,
-                top_k=40,
-                max_output_tokens=2000,
-            ),
-            safety_settings={
-                'HARM_CATEGORY_HARASSMENT': 'BLOCK_NONE',
-                'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_NONE',
-                'HARM_CATEGORY_SEXUALLY_EXPLICIT': 'BLOCK_NONE',
-                'HARM_CATEGORY_DANGEROUS_CONTENT': 'BLOCK_NONE',
-            }
-        )
-        
-        # Check if response was blocked
-        if not response.text:
-            # Try to get the reason
-            finish_reason = response.candidates[0].finish_reason if response.candidates else "Unknown"
-            safety_ratings = response.candidates[0].safety_ratings if response.candidates else []
-            
-            error_details = f"""**Finish Reason:** {finish_reason}
+def _blocked_message(response, total_segments, total_words):
+    """Explain an empty/blocked response"""
+    # Try to get the reason
+    candidates = getattr(response, 'candidates', None)
+    finish_reason = _finish_reason(response) or "Unknown"
+    safety_ratings = candidates[0].safety_ratings if candidates else []
+    
+    error_details = f"""**Finish Reason:** {finish_reason}
 
 **Possible Causes:**
 - Content was flagged by safety filters
@@ -141,10 +420,10 @@ Format your response in clean markdown. Be specific and professional."""
 
 **Safety Ratings:**
 """
-            for rating in safety_ratings:
-                error_details += f"- {rating.category}: {rating.probability}\n"
-            
-            return f"""⚠️ AI Summary Blocked
+    for rating in safety_ratings:
+        error_details += f"- {rating.category}: {rating.probability}\n"
+    
+    return f"""⚠️ AI Summary Blocked
 
 {error_details}
 
@@ -159,55 +438,18 @@ Format your response in clean markdown. Be specific and professional."""
 
 **Fallback:** Use 'Show Summary' button for basic transcript view.
 """
-        
-        ai_summary = response.text
-        
-        # Calculate statistics
-        total_segments = len(transcripts_list)
-        total_words = sum(len(t.get('en', '').split()) for t in transcripts_list)
-        unique_speakers = len(set(t.get('speaker', 'Unknown') for t in transcripts_list))
-        
-        # Build final summary
-        full_summary = f"""# 🤖 AI-Powered Meeting Analysis
-*Generated using Google Gemini 2.5 (FREE)*
 
-{ai_summary}
 
----
+def _slow_summary_message(transcripts_list):
+    """Local summary shown when an identical AI summary request is still running"""
+    return (f"{generate_local_summary(transcripts_list)}\n---\n\n"
+            "⚠️ *The AI summary is taking too long - showing the local summary. Try again later.*")
 
-## 📊 Meeting Statistics
 
-| Metric | Value |
-|--------|-------|
-| Total Segments | {total_segments} |
-| Total Words | {total_words} |
-| Unique Speakers | {unique_speakers} |
-| Estimated Duration | ~{total_segments * 5} seconds |
-
----
+def _failure_message(error, total_segments, total_words):
+    return f"""❌ AI Summary Generation Failed
 
-## 📝 Full Transcript
-
-"""
-        
-        # Add condensed transcript
-        for i, t in enumerate(transcripts_list, 1):
-            speaker = t.get('speaker', 'Unknown')
-            text = t.get('en', '')
-            timestamp = t.get('time', '')
-            full_summary += f"**{i}. [{timestamp}] {speaker}:**  \n{text}\n\n"
-        
-        full_summary += f"\n---\n\n*AI Summary generated on {time.strftime('%Y-%m-%d %H:%M:%S')}*\n"
-        full_summary += "*Powered by Google Gemini 2.5 Flash (100% Free)*"
-        
-        return full_summary
-            
-    except Exception as e:
-        error_msg = str(e)
-        
-        return f"""❌ AI Summary Generation Failed
-
-**Error:** {error_msg}
+**Error:** {str(error)}
 
 **Troubleshooting:**
 
@@ -226,13 +468,182 @@ Format your response in clean markdown. Be specific and professional."""
    - Temporary API issues may resolve automatically
 
 **Statistics:**
-- Segments: {len(transcripts_list)}
-- Words: {sum(len(t.get('en', '').split()) for t in transcripts_list)}
+- Segments: {total_segments}
+- Words: {total_words}
 
 **Fallback:** Use 'Show Summary' button for basic transcript view.
 """
 
 
+def generate_ai_summary(transcripts_list, llm=None, on_summary=None):
+    """
+    Generate AI-powered meeting summary using Gemini
+    
+    Short meetings are summarized in one request. Longer ones are split into
+    time/topic chunks that are summarized in parallel, then reduced into the
+    final sections. The model returns a JSON summary (summary_schema) that
+    is validated and rendered to Markdown locally.
+    
+    Args:
+        transcripts_list: List of transcript dicts with 'speaker', 'en', 'bn', 'time'
+        llm: Model with generate_content() (default: shared Gemini model)
+        on_summary: Optional callback(summary dict) to store the structured result
+    
+    Returns:
+        str: Markdown formatted AI summary
+    """
+    
+    if not transcripts_list or len(transcripts_list) == 0:
+        return "📭 No transcripts available for AI summary."
+    
+    llm = model if llm is None else llm
+    if not llm:
+        # Offline: local extractive summary + setup instructions
+        return f"{generate_local_summary(transcripts_list)}\n---\n\n{_not_configured_message()}"
+    
+    # Calculate statistics
+    total_segments = len(transcripts_list)
+    total_words = sum(len(t.get('en', '').split()) for t in transcripts_list)
+    responses = []
+    
+    def summarize():
+        segments, chunks = _prompt_segments(transcripts_list)
+        prompt = _summary_prompt(llm, segments, chunks)
+        
+        # Generate with Gemini
+        response = _generate(llm, prompt, 2000, json_output=True)
+        responses.append(response)
+        text = _response_text(response)
+        if text:
+            parse_summary_json(text)  # Raises before an invalid summary is cached
+        return text
+    
+    try:
+        # Same transcript + model -> cached text; identical concurrent requests share one call
+        ai_summary = get_response_cache().get_or_compute(
+            _cache_key("summary", llm, transcripts_list), summarize,
+            timeout=_summary_wait_timeout(transcripts_list)
+        )
+        
+        # Check if response was blocked
+        if not ai_summary:
+            return _blocked_message(responses[0] if responses else None, total_segments, total_words)
+        
+        summary, markdown = summary_to_markdown(ai_summary)
+        if summary is not None and on_summary:
+            on_summary(summary)
+        return format_ai_summary(transcripts_list, markdown)
+    
+    except FutureTimeoutError:
+        print("⚠️ Timed out waiting for the running AI summary, showing the local one")
+        return _slow_summary_message(transcripts_list)
+    except Exception as e:
+        return f"{_failure_message(e, total_segments, total_words)}\n---\n\n{generate_local_summary(transcripts_list)}"
+
+
+def stream_ai_summary(transcripts_list, llm=None, on_summary=None):
+    """
+    Streaming version of generate_ai_summary()
+    
+    Yields the growing Markdown report while Gemini generates, so the first
+    sections show up long before the response is complete (the incomplete
+    JSON is parsed best-effort). Validation and safety/blocked handling are
+    done once the stream has finished. A caller asking for a summary that is
+    already being generated (streamed or not) waits for that request instead
+    of starting a second one.
+    
+    Args:
+        transcripts_list: List of transcript dicts with 'speaker', 'en', 'bn', 'time'
+        llm: Model with generate_content() (default: shared Gemini model)
+        on_summary: Optional callback(summary dict) to store the structured result
+    
+    Yields:
+        str: Markdown report so far (the last value is the final report)
+    """
+    
+    if not transcripts_list or len(transcripts_list) == 0:
+        yield "📭 No transcripts available for AI summary."
+        return
+    
+    llm = model if llm is None else llm
+    if not llm:
+        yield f"{generate_local_summary(transcripts_list)}\n---\n\n{_not_configured_message()}"
+        return
+    
+    total_segments = len(transcripts_list)
+    total_words = sum(len(t.get('en', '').split()) for t in transcripts_list)
+    cache = get_response_cache()
+    key = _cache_key("summary", llm, transcripts_list)
+    
+    cached, future, owner = cache.claim(key)
+    if not owner:
+        try:
+            if cached is None:
+                # Same summary already being generated: show the local one meanwhile
+                yield f"⏳ *Generating AI summary...*\n\n{generate_local_summary(transcripts_list)}"
+                try:
+                    cached = future.result(timeout=_summary_wait_timeout(transcripts_list))
+                except FutureTimeoutError:
+                    print("⚠️ Timed out waiting for the running AI summary, showing the local one")
+                    yield _slow_summary_message(transcripts_list)
+                    return
+                if not cached:
+                    yield _blocked_message(None, total_segments, total_words)
+                    return
+            summary, markdown = summary_to_markdown(cached)
+            if summary is not None and on_summary:
+                on_summary(summary)
+            yield format_ai_summary(transcripts_list, markdown)
+        except Exception as e:
+            yield f"{_failure_message(e, total_segments, total_words)}\n---\n\n{generate_local_summary(transcripts_list)}"
+        return
+    
+    # This caller owns the request: every exit must resolve `future` for the waiters
+    try:
+        # Local summary right away, replaced once Gemini starts streaming
+        preview = generate_local_summary(transcripts_list)
+        yield f"⏳ *Generating AI summary...*\n\n{preview}"
+        
+        segments, chunks = _prompt_segments(transcripts_list)
+        if len(chunks) > 1:
+            yield f"🧩 *Summarizing {len(chunks)} parts of the meeting...*\n\n{preview}"
+        prompt = _summary_prompt(llm, segments, chunks)
+        
+        response = _generate(llm, prompt, 2000, stream=True, json_output=True)
+        ai_summary = ""
+        for text in iter_text(response):
+            ai_summary += text
+            partial = parse_partial_json(ai_summary)
+            if partial:
+                markdown = render_summary_markdown(validate_summary(partial)[0])
+                yield format_ai_summary(transcripts_list, markdown + " ▌")
+        
+        # Safety handling once the full response is in
+        if not ai_summary.strip():
+            cache.finish(key, future, "")
+            yield _blocked_message(response, total_segments, total_words)
+            return
+        
+        summary, markdown = summary_to_markdown(ai_summary)
+        complete = summary is not None and _finish_reason(response) != "SAFETY"
+        if _finish_reason(response) == "SAFETY":
+            markdown += "\n\n⚠️ *Summary stopped early by safety filters.*"
+        # Only complete, valid summaries are cached; waiters get the text either way
+        cache.finish(key, future, ai_summary, store=complete)
+        if complete and on_summary:
+            on_summary(summary)
+        
+        yield format_ai_summary(transcripts_list, markdown)
+    
+    except Exception as e:
+        cache.finish(key, future, error=e)
+        yield f"{_failure_message(e, total_segments, total_words)}\n---\n\n{generate_local_summary(transcripts_list)}"
+    finally:
+        # Consumer stopped iterating (e.g. the page was closed): don't leave waiters hanging
+        if not future.done():
+            cache.finish(key, future, error=RuntimeError("Summary generation was cancelled"))
+
+
 def test_ai_summarizer():
     """Test function to verify AI summarizer works"""
     
@@ -1,11 +1,12 @@
 import gradio as gr
 import threading
 import time
-import numpy as np
 import queue
 import json
 import sys
 import os
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
 from dotenv import load_dotenv
 
 # Add src to path
@@ -15,31 +16,50 @@ try:
     from transcriber import transcribe
     from translator import translate_to_bangla
     from summarizer import generate_summary
-    from audio_listener import start_listening, combined_queue
-    from speaker_identifier import identify_speaker, reset_speakers
+    from speaker_identifier import ImprovedSpeakerIdentifier
     from ai_summarizer import generate_ai_summary  # Gemini-only AI summarizer
+    from ai_summarizer import format_ai_summary, update_running_summary, stream_ai_summary
     from ai_converstion_practise.ai_conversation import (  # NEW: AI Conversation
         start_conversation,
         stop_conversation,
         process_speech,
         get_topic_suggestions,
         change_level,
-        conversation_engine
+        conversation_engine,
+        create_duplex_controller
     )
     print("✅ All modules imported successfully")
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("⚠️ Running with limited functionality")
     
-    def identify_speaker(audio, samplerate=16000):
-        return "Person-1"
+    # Stubs only for the modules that failed to import
+    if 'transcribe' not in globals():
+        def transcribe(audio):
+            return ""
     
-    def reset_speakers():
-        pass
+    if 'translate_to_bangla' not in globals():
+        def translate_to_bangla(text):
+            return ""
+    
+    if 'ImprovedSpeakerIdentifier' not in globals():
+        class ImprovedSpeakerIdentifier:
+            def identify_speaker(self, audio, samplerate=16000):
+                return "Person-1"
+            
+            def reset(self):
+                pass
     
     def generate_ai_summary(transcripts):
         return "❌ AI Summarizer module not found. Check ai_summarizer.py"
     
+    if 'stream_ai_summary' not in globals():
+        def stream_ai_summary(transcripts, on_summary=None):
+            yield generate_ai_summary(transcripts)
+    
+    if 'update_running_summary' not in globals():
+        update_running_summary = None  # No rolling summary without ai_summarizer
+    
     def start_conversation():
         return {'status': '❌ Error', 'message': 'Module not found', 'history': '', 'stats': ''}
     
@@ -54,6 +74,21 @@ except ImportError as e:
     
     def change_level(level):
         return "Error"
+    
+    if 'create_duplex_controller' not in globals():
+        def create_duplex_controller(transcribe_fn, on_state=None):
+            return None
+
+from render_cache import RenderCache
+from caption_server import start_caption_server
+from meeting_session import SessionManager, LocalCaptureSource
+from network_ingest import start_ingest_server
+from inference_pool import InferencePool, RESULT_TIMEOUT
+from capture_engine import get_capture_engine
+from rolling_summarizer import RollingSummarizer, ROLLING_SUMMARY_EVERY
+from extractive_summarizer import generate_local_summary
+from summary_schema import render_summary_markdown, summary_to_markdown
+from llm_client import get_model
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -76,61 +111,42 @@ except Exception as e:
     print(f"⚠️ OpenAI not available: {e}")
 
 # Fallback to Gemini if OpenAI not available
+# (shared lazy client - the model is resolved on the first real request)
 if not AI_MODEL:
-    try:
-        GENAI_API_KEY = os.getenv("GENAI_API_KEY")
-        if GENAI_API_KEY:
-            import google.generativeai as genai
-            genai.configure(api_key=GENAI_API_KEY)
-            
-            # Latest Gemini models (2024-2025)
-            model_names = [
-                "models/gemini-2.5-flash",           # Latest, fastest
-                "models/gemini-2.0-flash",           # Stable, fast
-                "models/gemini-flash-latest",        # Auto-updated
-                "models/gemini-pro-latest",          # High quality
-                "models/gemini-2.5-pro",             # Most powerful
-            ]
-            
-            for model_name in model_names:
-                try:
-                    AI_MODEL = genai.GenerativeModel(model_name)
-                    # Quick test
-                    test_response = AI_MODEL.generate_content("Hi")
-                    AI_TYPE = "gemini"
-                    print(f"✅ Using Gemini: {model_name}")
-                    break
-                except Exception as e:
-                    print(f"⚠️ {model_name} not available: {str(e)[:50]}")
-                    continue
-    except Exception as e:
-        print(f"⚠️ Gemini initialization failed: {e}")
+    gemini_model = get_model()
+    if gemini_model:
+        AI_MODEL = gemini_model
+        AI_TYPE = "gemini"
+        print("✅ Using Gemini (model resolved on first request)")
 
 if not AI_MODEL:
     print("⚠️ No AI model configured. Add OPENAI_API_KEY or GENAI_API_KEY to .env file")
 
-# Global state
-running_flag = threading.Event()
-audio_buffer = []
-thread_instance = [None]
-
 # AI Conversation state
 conversation_active = threading.Event()
-conversation_audio_buffer = []
-conversation_audio_stream = [None]  # Dedicated stream for conversation
-
-# Shared state for real-time updates
-latest_english = ["Waiting for speech..."]
-latest_bangla = ["বক্তৃতার জন্য অপেক্ষা করছি..."]
-all_transcripts = []
-transcript_counter = [0]
-current_segment = {
-    "speaker": None, 
-    "text": "", 
-    "text_bn_temp": "",      # Phase 1: Word-by-word (temporary)
-    "text_bn_final": "",     # Phase 2: Context-aware (saved)
-    "is_translating": False  # Flag to show translation in progress
-}
+conversation_controller = [None]    # Turn taking + barge-in (duplex_controller.py)
+
+def _render_summary_segment(number, t):
+    """Markdown fragment for one segment in the basic summary"""
+    parts = [
+        f"### {number}. [{t['time']}] {t.get('speaker', 'Unknown')}\n\n",
+        f"**🇬🇧 EN:** {t['en']}\n\n"
+    ]
+    if t['bn']:
+        parts.append(f"**🇧🇩 BN:** {t['bn']}\n\n")
+    parts.append("---\n\n")
+    return "".join(parts)
+
+def _render_history_segment(number, t):
+    """Markdown fragment for one segment in the transcript history"""
+    parts = [
+        f"### [{t['time']}] {t.get('speaker', 'Unknown')}\n\n",
+        f"**🇬🇧 English:**  \n{t['en']}\n\n"
+    ]
+    if t['bn']:
+        parts.append(f"**🇧🇩 বাংলা (Context-aware):**  \n{t['bn']}\n\n")
+    parts.append("---\n\n")
+    return "".join(parts)
 
 def word_by_word_translate(text):
     """
@@ -189,196 +205,75 @@ def split_into_sentences(text):
         result.append(current.strip())
     return result if result else [text]
 
-def meeting_loop():
-    """Background thread for real-time transcription"""
-    global audio_buffer
-    
-    print("🎙️ Meeting loop started (2-PHASE TRANSLATION)")
-    
-    listener_thread = threading.Thread(target=start_listening(), daemon=True)
-    listener_thread.start()
-    
-    silence_counter = 0
-    MIN_AUDIO_LENGTH = 8000
-    MAX_AUDIO_LENGTH = 32000
-    SILENCE_THRESHOLD = 2
-    
-    while running_flag.is_set():
-        try:
-            if not combined_queue.empty():
-                audio_chunk = combined_queue.get_nowait()
-                audio_np = np.squeeze(audio_chunk).astype(np.float32)
-                max_amp = np.max(np.abs(audio_np))
-                
-                if max_amp > 0.005:
-                    audio_buffer.append(audio_np)
-                    silence_counter = 0
-                else:
-                    silence_counter += 1
-                
-                if len(audio_buffer) > 0:
-                    total_samples = sum(len(chunk) for chunk in audio_buffer)
-                    should_process = (
-                        (total_samples >= MIN_AUDIO_LENGTH and silence_counter >= SILENCE_THRESHOLD) or
-                        total_samples >= MAX_AUDIO_LENGTH
-                    )
-                    
-                    if should_process:
-                        combined_audio = np.concatenate(audio_buffer)
-                        audio_buffer = []
-                        silence_counter = 0
-                        
-                        def process_audio(audio):
-                            try:
-                                # Identify speaker (fast, cached)
-                                speaker = identify_speaker(audio, samplerate=16000)
-                                
-                                # Transcribe (GPU accelerated)
-                                text = transcribe(audio)
-                                
-                                if text and len(text.strip()) > 2:
-                                    print(f"⚡ [{speaker}] {text}")
-                                    
-                                    # Check if same speaker or new speaker
-                                    if current_segment["speaker"] is None:
-                                        current_segment["speaker"] = speaker
-                                        current_segment["text"] = text
-                                        
-                                        # Phase 1: Instant word-by-word (NOT SAVED)
-                                        current_segment["text_bn_temp"] = word_by_word_translate(text)
-                                        current_segment["text_bn_final"] = ""
-                                        current_segment["is_translating"] = True
-                                        
-                                        # Phase 2: Background context-aware translation
-                                        def translate_contextual():
-                                            final_bn = context_aware_translate(text)
-                                            current_segment["text_bn_final"] = final_bn
-                                            current_segment["is_translating"] = False
-                                            print(f"✅ Translation complete: {final_bn[:50]}...")
-                                        
-                                        threading.Thread(target=translate_contextual, daemon=True).start()
-                                        
-                                    elif current_segment["speaker"] == speaker:
-                                        # Same speaker - keep appending
-                                        current_segment["text"] += " " + text
-                                        
-                                        # Update Phase 1 (instant word-by-word)
-                                        current_segment["text_bn_temp"] = word_by_word_translate(current_segment["text"])
-                                        current_segment["is_translating"] = True
-                                        
-                                        # Update Phase 2 (background context-aware)
-                                        full_text = current_segment["text"]
-                                        def update_translation():
-                                            final_bn = context_aware_translate(full_text)
-                                            current_segment["text_bn_final"] = final_bn
-                                            current_segment["is_translating"] = False
-                                        
-                                        threading.Thread(target=update_translation, daemon=True).start()
-                                        
-                                    else:
-                                        # Different speaker - save previous & start new
-                                        if current_segment["text"]:
-                                            prev_text = current_segment["text"]
-                                            prev_speaker = current_segment["speaker"]
-                                            prev_bn = current_segment["text_bn_final"]
-                                            
-                                            # Wait a bit for final translation if still processing
-                                            if current_segment["is_translating"]:
-                                                time.sleep(0.5)  # Short wait for translation to complete
-                                                prev_bn = current_segment["text_bn_final"]
-                                            
-                                            # Save ONLY the final context-aware translation
-                                            all_transcripts.append({
-                                                "speaker": prev_speaker,
-                                                "en": prev_text,
-                                                "bn": prev_bn if prev_bn else "[Translation pending]",
-                                                "time": time.strftime("%H:%M:%S")
-                                            })
-                                            transcript_counter[0] += 1
-                                            print(f"💾 Saved segment {transcript_counter[0]}")
-                                        
-                                        # Start new segment
-                                        current_segment["speaker"] = speaker
-                                        current_segment["text"] = text
-                                        current_segment["text_bn_temp"] = word_by_word_translate(text)
-                                        current_segment["text_bn_final"] = ""
-                                        current_segment["is_translating"] = True
-                                        
-                                        # Phase 2 for new segment
-                                        def translate_new():
-                                            final_bn = context_aware_translate(text)
-                                            current_segment["text_bn_final"] = final_bn
-                                            current_segment["is_translating"] = False
-                                        
-                                        threading.Thread(target=translate_new, daemon=True).start()
-                                    
-                            except Exception as e:
-                                print(f"❌ {e}")
-                        
-                        threading.Thread(target=process_audio, args=(combined_audio,), daemon=True).start()
-            
-            time.sleep(0.01)
-        except:
-            time.sleep(0.01)
-    
-    print("🛑 Stopped")
+# Optional process pool for inference (MEETINGAI_INFERENCE_PROCESSES=0 keeps it in-process)
+inference_processes = int(os.getenv("MEETINGAI_INFERENCE_PROCESSES", "0"))
+inference_pool = InferencePool(inference_processes) if inference_processes > 0 else None
 
-def start_meeting():
+def pooled_translate(text):
+    """Context-aware translation in a worker process"""
+    try:
+        return inference_pool.translate(text).result(RESULT_TIMEOUT)
+    except FutureTimeoutError:
+        print(f"⚠️ Translation timed out after {RESULT_TIMEOUT:.0f}s")
+        return ""
+    except Exception as e:
+        print(f"⚠️ Translation error: {e}")
+        return ""
+
+# Meeting sessions (one per meeting id, models shared across sessions)
+session_manager = SessionManager({
+    'transcribe': transcribe,
+    'translate': pooled_translate if inference_pool else context_aware_translate,
+    'quick_translate': word_by_word_translate,
+    'speaker_factory': ImprovedSpeakerIdentifier,
+    'pool': inference_pool,
+    # Running AI summary, updated every N segments (needs Gemini)
+    'summarizer_factory': (
+        partial(RollingSummarizer, update_running_summary)
+        if update_running_summary and ROLLING_SUMMARY_EVERY > 0 and get_model() else None
+    )
+}, workers=inference_processes or None)
+
+def _session_caches(session):
+    """Render caches owned by a meeting session"""
+    summary_cache = session.get_cache('summary', lambda: RenderCache(_render_summary_segment))
+    history_cache = session.get_cache('history', lambda: RenderCache(_render_history_segment))
+    return summary_cache, history_cache
+
+def start_meeting(meeting_id="default"):
     """Start the meeting transcription"""
-    global all_transcripts, current_segment
-    all_transcripts = []
-    transcript_counter[0] = 0
-    latest_english[0] = "🎧 Listening..."
-    latest_bangla[0] = "🎧 শুনছি..."
-    current_segment = {
-        "speaker": None, 
-        "text": "", 
-        "text_bn_temp": "",
-        "text_bn_final": "",
-        "is_translating": False
-    }
-    
-    reset_speakers()
+    session = session_manager.get(meeting_id)
     
-    if thread_instance[0] is None or not thread_instance[0].is_alive():
-        running_flag.set()
-        thread_instance[0] = threading.Thread(target=meeting_loop, daemon=True)
-        thread_instance[0].start()
-        
+    if session.start(capture_factory=LocalCaptureSource):
         return (
-            "✅ Meeting started! 2-Phase translation active (Word-by-word → Context-aware)...",
+            f"✅ Meeting '{session.meeting_id}' started! 2-Phase translation active (Word-by-word → Context-aware)...",
             "🎧 Listening... Waiting for speech...",
             "🎧 শুনছি... বক্তৃতার জন্য অপেক্ষা করছি...",
             "🟢 LIVE | Segments: 0"
         )
     return "⚠️ Already running", "", "", ""
 
-def stop_meeting():
+def stop_meeting(meeting_id="default"):
     """Stop the meeting"""
-    running_flag.clear()
-    
-    # Save current segment before stopping
-    if current_segment["text"]:
-        if current_segment["is_translating"]:
-            time.sleep(1)  # Wait for translation
-        
-        all_transcripts.append({
-            "speaker": current_segment["speaker"],
-            "en": current_segment["text"],
-            "bn": current_segment["text_bn_final"] if current_segment["text_bn_final"] else "[Translation pending]",
-            "time": time.strftime("%H:%M:%S")
-        })
+    session = session_manager.get(meeting_id, create=False)
+    if session is None:
+        return "⚠️ No meeting with this ID"
+    session.stop()
     
     time.sleep(0.5)
     
     # Return message for status
     return "⏹️ Meeting stopped. Click 'Show Summary' to view transcript."
 
-def show_basic_summary():
+def show_basic_summary(meeting_id="default"):
     """Generate basic summary without AI"""
-    if len(all_transcripts) == 0:
+    session = session_manager.get(meeting_id, create=False)
+    if session is None or len(session.all_transcripts) == 0:
         return "📭 No transcripts yet. Start the meeting first!"
     
+    all_transcripts = session.all_transcripts
+    summary_cache, _ = _session_caches(session)
+    
     # Statistics
     total_segments = len(all_transcripts)
     total_words_en = sum(len(t["en"].split()) for t in all_transcripts)
@@ -395,36 +290,57 @@ def show_basic_summary():
 
 ---
 
+{generate_local_summary(all_transcripts, title="## 🧠 Key Points (Local)")}
+---
+
 ## 📝 Full Transcript:
 
 """
     
-    # Add all segments with speaker labels
-    for i, t in enumerate(all_transcripts, 1):
-        summary += f"### {i}. [{t['time']}] {t.get('speaker', 'Unknown')}\n\n"
-        summary += f"**🇬🇧 EN:** {t['en']}\n\n"
-        if t['bn']:
-            summary += f"**🇧🇩 BN:** {t['bn']}\n\n"
-        summary += "---\n\n"
-    
-    summary += "\n💡 **Click 'Generate AI Summary' for intelligent insights and suggestions!**"
-    
-    return summary
+    # Add all segments with speaker labels (cached fragments)
+    return "".join([
+        summary,
+        summary_cache.render(all_transcripts),
+        "\n💡 **Click 'Generate AI Summary' for intelligent insights and suggestions!**"
+    ])
 
-def generate_ai_summary_ui():
+def generate_ai_summary_ui(meeting_id="default"):
     """
     Generate AI-powered summary using separate ai_summarizer.py module
     Uses ONLY Gemini (100% FREE) - No OpenAI
+    Streams: the summary renders while Gemini is still generating
     """
+    session = session_manager.get(meeting_id, create=False)
+    all_transcripts = session.all_transcripts if session else []
+    
     if len(all_transcripts) == 0:
-        return "📭 No transcripts available for AI summary."
+        yield "📭 No transcripts available for AI summary."
+        return
     
     try:
+        # Stored structured summary is still current - render it locally
+        if session.has_current_summary():
+            yield format_ai_summary(all_transcripts, render_summary_markdown(session.summary))
+            return
+        
+        # Rolling summary already covers the meeting - no new request needed
+        rolling = session.rolling_summary
+        if rolling is not None and not session.running_flag.is_set():
+            if not rolling.wait(timeout=0):
+                yield "⏳ Finishing rolling summary..."
+                rolling.wait(timeout=30)  # Final update started at stop
+            if rolling.is_current(len(all_transcripts)):
+                summary, markdown = summary_to_markdown(rolling.snapshot()['summary'])
+                if summary is not None:
+                    session.save_summary(summary)
+                yield format_ai_summary(all_transcripts, markdown)
+                return
+        
         # Call the separate ai_summarizer module (Gemini only)
-        summary = generate_ai_summary(all_transcripts)
-        return summary
+        for summary in stream_ai_summary(all_transcripts, on_summary=session.save_summary):
+            yield summary
     except Exception as e:
-        return f"""❌ AI Summary Error
+        yield f"""❌ AI Summary Error
 
 **Error:** {str(e)}
 
@@ -451,10 +367,44 @@ def generate_ai_summary_ui():
 **Fallback:** Use 'Show Summary' button for basic transcript view.
 """
 
-def get_current_captions():
+def get_rolling_summary(meeting_id="default"):
+    """Get the running AI summary of the meeting so far"""
+    session = session_manager.get(meeting_id, create=False)
+    if session is None or session.rolling_summary is None:
+        return "📭 Live summary needs GENAI_API_KEY (updated every few segments)"
+    
+    snapshot = session.rolling_summary.snapshot()
+    if not snapshot['summary']:
+        return f"⏳ First summary after {session.rolling_summary.every} segments..."
+    
+    updated = time.strftime('%H:%M:%S', time.localtime(snapshot['updated_at']))
+    _, markdown = summary_to_markdown(snapshot['summary'])
+    return (
+        f"*Covers {snapshot['covered']} segments (updated {updated}, "
+        f"{snapshot['pending']} waiting)*\n\n{markdown}"
+    )
+
+def export_summary(meeting_id="default"):
+    """Saved meeting JSON (structured summary + transcript) for download"""
+    session = session_manager.get(meeting_id, create=False)
+    if session is None or session.summary is None:
+        gr.Warning("Generate the AI summary first")
+        return None
+    if session.saved_path is None:
+        session.save_summary(session.summary)
+    return session.saved_path
+
+def get_current_captions(meeting_id="default"):
     """Get current live captions with 2-phase translation"""
-    count = transcript_counter[0]
-    status = f"🟢 LIVE | Segments: {count}" if running_flag.is_set() else "⚪ Stopped"
+    session = session_manager.get(meeting_id, create=False)
+    if session is None:
+        return "Click 'Start Meeting' to begin...", "'Start Meeting' ক্লিক করুন...", "⚪ Ready"
+    
+    all_transcripts = session.all_transcripts
+    current_segment = session.current_segment
+    
+    count = session.transcript_counter[0]
+    status = f"🟢 LIVE | Segments: {count}" if session.running_flag.is_set() else "⚪ Stopped"
     
     # Get last 10 completed transcripts
     recent = all_transcripts[-10:] if len(all_transcripts) > 0 else []
@@ -547,22 +497,22 @@ def get_current_captions():
     
     return en_text, bn_text, status
 
-def get_transcript_history():
+def get_transcript_history(meeting_id="default"):
     """Get full transcript history (ONLY FINAL translations)"""
-    if len(all_transcripts) == 0:
+    session = session_manager.get(meeting_id, create=False)
+    if session is None or len(session.all_transcripts) == 0:
         return "📭 No transcripts yet. Start speaking!"
     
-    history = f"## 📜 Full Transcript ({len(all_transcripts)} segments)\n\n"
-    for i, t in enumerate(reversed(all_transcripts[-15:]), 1):
-        idx = len(all_transcripts) - i + 1
-        speaker = t.get('speaker', 'Unknown')
-        history += f"### [{t['time']}] {speaker}\n\n"
-        history += f"**🇬🇧 English:**  \n{t['en']}\n\n"
-        if t['bn']:
-            history += f"**🇧🇩 বাংলা (Context-aware):**  \n{t['bn']}\n\n"
-        history += "---\n\n"
+    all_transcripts = session.all_transcripts
+    _, history_cache = _session_caches(session)
+    
+    total = len(all_transcripts)
+    history = f"## 📜 Full Transcript ({total} segments)\n\n"
+    
+    # Newest first, last 15 segments (cached fragments)
+    recent = [(0, idx, all_transcripts[idx]) for idx in range(total - 1, max(total - 15, 0) - 1, -1)]
     
-    return history
+    return history + history_cache.render_items(recent)
 
 # ============================================================================
 # AI CONVERSATION FUNCTIONS
@@ -594,165 +544,51 @@ def stop_ai_conversation():
 conversation_listening = [False]
 
 def conversation_loop():
-    """Background loop for AI conversation - listens to user speech"""
-    import sounddevice as sd
-    
-    global conversation_audio_buffer
-    
+    """
+    Background loop for AI conversation - listens to user speech
+    Full duplex: the mic stays open while the AI talks; its own voice is
+    gated out and talking over it interrupts the reply (barge-in)
+    The mic stream is shared through the capture engine
+    """
     print("=" * 60)
     print("🎙️ AI CONVERSATION LISTENING STARTED")
     print("=" * 60)
     print("✅ Microphone active - Speak now!")
-    print("✅ Audio will be captured when you speak")
+    print("✅ Talk over the AI to interrupt it")
     print("=" * 60)
     
-    # ADD THESE LINES ↓↓↓
-    silence_counter = 0
-    MIN_AUDIO_LENGTH = 16000  # 1 second at 16kHz
-    MAX_AUDIO_LENGTH = 64000  # 4 seconds
-    SILENCE_THRESHOLD = 3
-    # ↑↑↑ ADD THESE LINES
-    
-    # Shared state for callback
-    callback_state = {
-        'audio_chunks_received': 0,
-        'last_print_time': time.time()
-    }
-    
-    # ... rest of code
-    
-    # Create dedicated audio stream for conversation
-    def audio_callback(indata, frames, time_info, status):
-        """Callback for audio capture"""
-        if status:
-            print(f"⚠️ Audio status: {status}")
-        
-        # Copy audio data
-        audio_np = np.squeeze(indata.copy()).astype(np.float32)
-        max_amp = np.max(np.abs(audio_np))
-        
-        callback_state['audio_chunks_received'] += 1
-        
-        # Print amplitude every 1 second
-        current_time = time.time()
-        if current_time - callback_state['last_print_time'] >= 1.0:
-            print(f"🎤 [LISTENING] Chunks: {callback_state['audio_chunks_received']} | Amplitude: {max_amp:.6f}")
-            callback_state['last_print_time'] = current_time
-        
-        # Store for processing
-        conversation_audio_buffer.append(audio_np)
+    controller = create_duplex_controller(transcribe)
+    if controller is None:
+        print("❌ Conversation module not available")
+        return
+    conversation_controller[0] = controller
     
-    # Start audio stream
     try:
-        print("🎤 Starting audio stream...")
-        stream = sd.InputStream(
-            samplerate=16000,
-            channels=1,
-            dtype='float32',
-            blocksize=8000,  # 0.5 second chunks
-            callback=audio_callback
-        )
-        
-        conversation_audio_stream[0] = stream
-        stream.start()
-        print("✅ Audio stream started!")
-        
+        subscription = get_capture_engine().subscribe("microphone")
     except Exception as e:
         print(f"❌ Failed to start audio stream: {e}")
         return
     
-    # Processing loop
+    # Processing loop: 0.1 s frames (fast barge-in); VAD, echo gating and turn taking happen in the controller
+    last_print_time = time.time()
     while conversation_active.is_set():
+        chunk = subscription.read(1600, timeout=0.1)
+        if chunk is None:
+            continue
+        
+        # Print amplitude every 1 second
+        if time.time() - last_print_time >= 1.0:
+            print(f"🎤 [{controller.state.upper()}] Amplitude: {subscription.level:.6f}")
+            last_print_time = time.time()
+        
         try:
-            if len(conversation_audio_buffer) > 0:
-                # Get current buffer
-                current_buffer = conversation_audio_buffer.copy()
-                
-                # Check for voice activity
-                max_amp = max(np.max(np.abs(chunk)) for chunk in current_buffer)
-                
-                if max_amp > 0.01:  # Voice detected
-                    silence_counter = 0
-                    print(f"🔴 [VOICE DETECTED!] Amplitude: {max_amp:.6f} - Recording...")
-                else:
-                    silence_counter += 1
-                
-                total_samples = sum(len(chunk) for chunk in current_buffer)
-                should_process = (
-                    (total_samples >= MIN_AUDIO_LENGTH and silence_counter >= SILENCE_THRESHOLD) or
-                    total_samples >= MAX_AUDIO_LENGTH
-                )
-                
-                if should_process and max_amp > 0.01:  # Only process if voice detected
-                    print("=" * 60)
-                    print(f"🎤 [PROCESSING AUDIO]")
-                    print(f"   Total samples: {total_samples}")
-                    print(f"   Max amplitude: {max_amp:.6f}")
-                    print(f"   Silence counter: {silence_counter}")
-                    print("=" * 60)
-                    
-                    combined_audio = np.concatenate(current_buffer)
-                    conversation_audio_buffer = []  # Clear buffer
-                    silence_counter = 0
-                    
-                    def process_conversation_audio(audio):
-                        try:
-                            print("🔄 [TRANSCRIBING] Starting Whisper transcription...")
-                            start_time = time.time()
-                            
-                            # Transcribe user speech
-                            user_text = transcribe(audio)
-                            
-                            transcribe_time = time.time() - start_time
-                            print(f"✅ [TRANSCRIBED] Time: {transcribe_time:.2f}s")
-                            print(f"📝 [TRANSCRIPTION] '{user_text}'")
-                            
-                            if user_text and len(user_text.strip()) > 2:
-                                print("=" * 60)
-                                print(f"👤 [USER SAID]: {user_text}")
-                                print("=" * 60)
-                                
-                                # Process with AI conversation engine
-                                print("🤖 [AI PROCESSING] Sending to Gemini...")
-                                ai_start_time = time.time()
-                                
-                                result = process_speech(user_text)
-                                
-                                ai_time = time.time() - ai_start_time
-                                print(f"✅ [AI PROCESSED] Time: {ai_time:.2f}s")
-                                print("=" * 60)
-                                print(f"🤖 [AI RESPONSE]: {result['ai_response']}")
-                                print("=" * 60)
-                                print("✅ Conversation turn complete!")
-                                print("🎤 Listening for next input...")
-                            else:
-                                print(f"⚠️ [SKIPPED] Transcription too short: '{user_text}'")
-                                
-                        except Exception as e:
-                            print(f"❌ [ERROR] Conversation error: {e}")
-                            import traceback
-                            traceback.print_exc()
-                    
-                    threading.Thread(
-                        target=process_conversation_audio, 
-                        args=(combined_audio,), 
-                        daemon=True
-                    ).start()
-            
-            time.sleep(0.1)  # Check every 100ms
-            
+            controller.feed(chunk)
         except Exception as e:
             print(f"❌ [LOOP ERROR]: {e}")
-            time.sleep(0.1)
     
-    # Stop stream
-    try:
-        if conversation_audio_stream[0]:
-            conversation_audio_stream[0].stop()
-            conversation_audio_stream[0].close()
-            print("🛑 Audio stream stopped")
-    except:
-        pass
+    subscription.close()
+    controller.stop()
+    print(f"📊 Duplex stats: {controller.stats}")
     
     print("=" * 60)
     print("🛑 AI CONVERSATION LISTENING STOPPED")
@@ -801,186 +637,228 @@ def get_conversation_update():
 - Active: {'Yes' if conversation_active.is_set() else 'No'}
 - Listening: {'🎤 Yes' if conversation_listening[0] else '⏸️ Paused'}
 """
+    controller = conversation_controller[0]
+    if controller is not None and conversation_listening[0]:
+        stats += f"""- Turn: {controller.state.replace('_', ' ')}
+- Interruptions: {controller.stats['barge_ins']}
+"""
+    pronunciation = getattr(conversation_engine, 'last_pronunciation', None)
+    if pronunciation:
+        weak = [w['word'] for w in pronunciation['words'] if w['weak']]
+        stats += f"- Pronunciation: {pronunciation['score']} ({pronunciation['pronunciation_grade']})"
+        stats += f" - practise: {', '.join(weak[:3])}\n" if weak else "\n"
     
     status = "🟢 Active" if conversation_active.is_set() else "⚪ Stopped"
     
     return history, stats, status
 
 # Gradio Interface
-with gr.Blocks(
-    title="MeetingAI - 2-Phase Translation + AI Conversation", 
-    theme=gr.themes.Soft(primary_hue="blue", secondary_hue="orange")
-) as demo:
-    
-    gr.Markdown("""
-    # 🧑‍💼 MeetingAI - Real-time Transcription + AI Practice ⚡
-    **Meeting Transcription** (Left) | **AI Conversation Practice** (Right)
-    """)
-    
-    with gr.Row():
-        # LEFT SIDE: Meeting Transcription
-        with gr.Column(scale=2):
-            gr.Markdown("## 📝 Meeting Transcription")
+def build_ui():
+    """Gradio interface (built at launch, not on import: spawned inference workers re-import this script)"""
+    with gr.Blocks(
+        title="MeetingAI - 2-Phase Translation + AI Conversation", 
+        theme=gr.themes.Soft(primary_hue="blue", secondary_hue="orange")
+    ) as demo:
+    
+        gr.Markdown("""
+        # 🧑‍💼 MeetingAI - Real-time Transcription + AI Practice ⚡
+        **Meeting Transcription** (Left) | **AI Conversation Practice** (Right)
+        """)
+    
+        with gr.Row():
+            # LEFT SIDE: Meeting Transcription
+            with gr.Column(scale=2):
+                gr.Markdown("## 📝 Meeting Transcription")
             
-            with gr.Row():
-                with gr.Column(scale=2):
-                    start_btn = gr.Button("▶️ Start Meeting", variant="primary", size="lg")
-                with gr.Column(scale=2):
-                    stop_btn = gr.Button("⏹️ Stop Meeting", variant="stop", size="lg")
-                with gr.Column(scale=2):
-                    summary_btn = gr.Button("📊 Show Summary", variant="secondary", size="lg")
-                with gr.Column(scale=2):
-                    ai_summary_btn = gr.Button("🤖 Generate AI Summary", variant="primary", size="lg")
-                with gr.Column(scale=2):
-                    status_display = gr.Textbox(label="Status", interactive=False, value="⚪ Ready")
+                with gr.Row():
+                    with gr.Column(scale=2):
+                        start_btn = gr.Button("▶️ Start Meeting", variant="primary", size="lg")
+                    with gr.Column(scale=2):
+                        stop_btn = gr.Button("⏹️ Stop Meeting", variant="stop", size="lg")
+                    with gr.Column(scale=2):
+                        summary_btn = gr.Button("📊 Show Summary", variant="secondary", size="lg")
+                    with gr.Column(scale=2):
+                        ai_summary_btn = gr.Button("🤖 Generate AI Summary", variant="primary", size="lg")
+                    with gr.Column(scale=2):
+                        export_btn = gr.Button("💾 Export Summary (JSON)", variant="secondary", size="lg")
+                    with gr.Column(scale=2):
+                        status_display = gr.Textbox(label="Status", interactive=False, value="⚪ Ready")
             
-            status_text = gr.Textbox(label="System Message", interactive=False, visible=False)
+                meeting_id_box = gr.Textbox(label="Meeting ID", value="default", interactive=True)
+                status_text = gr.Textbox(label="System Message", interactive=False, visible=False)
             
-            gr.Markdown("## 💬 Live Captions (2-Phase Translation)")
+                gr.Markdown("## 💬 Live Captions (2-Phase Translation)")
             
-            with gr.Row():
-                with gr.Column():
-                    english_output = gr.Textbox(
-                        label="🇬🇧 English (Last 10 Segments)", 
-                        lines=12,
-                        value="Click 'Start Meeting' to begin...",
-                        interactive=False,
-                        show_copy_button=True,
-                        autoscroll=True,
-                        max_lines=15
-                    )
+                with gr.Row():
+                    with gr.Column():
+                        english_output = gr.Textbox(
+                            label="🇬🇧 English (Last 10 Segments)", 
+                            lines=12,
+                            value="Click 'Start Meeting' to begin...",
+                            interactive=False,
+                            show_copy_button=True,
+                            autoscroll=True,
+                            max_lines=15
+                        )
                 
-                with gr.Column():
-                    bangla_output = gr.Textbox(
-                        label="🇧🇩 বাংলা (2-Phase: Word→Context)", 
-                        lines=12,
-                        value="'Start Meeting' ক্লিক করুন...",
-                        interactive=False,
-                        show_copy_button=True,
-                        autoscroll=True,
-                        max_lines=15
-                    )
+                    with gr.Column():
+                        bangla_output = gr.Textbox(
+                            label="🇧🇩 বাংলা (2-Phase: Word→Context)", 
+                            lines=12,
+                            value="'Start Meeting' ক্লিক করুন...",
+                            interactive=False,
+                            show_copy_button=True,
+                            autoscroll=True,
+                            max_lines=15
+                        )
+            
+                with gr.Accordion("📜 Transcript History (Final Translations Only)", open=False):
+                    transcript_display = gr.Markdown("Click 'Start Meeting' to begin")
             
-            with gr.Accordion("📜 Transcript History (Final Translations Only)", open=False):
-                transcript_display = gr.Markdown("Click 'Start Meeting' to begin")
+                with gr.Accordion("📝 Basic Summary (Transcript View)", open=False):
+                    summary_output = gr.Markdown("Click 'Show Summary' to view transcript")
             
-            with gr.Accordion("📝 Basic Summary (Transcript View)", open=False):
-                summary_output = gr.Markdown("Click 'Show Summary' to view transcript")
+                with gr.Accordion("🔄 Summary So Far (Live)", open=False):
+                    rolling_summary_output = gr.Markdown("Click 'Start Meeting' to begin")
             
-            with gr.Accordion("🤖 AI Summary (Intelligent Analysis)", open=False):
-                ai_summary_output = gr.Markdown("Click 'Generate AI Summary' for AI-powered insights")
+                with gr.Accordion("🤖 AI Summary (Intelligent Analysis)", open=False):
+                    ai_summary_output = gr.Markdown("Click 'Generate AI Summary' for AI-powered insights")
+                    summary_file = gr.File(label="📦 Meeting JSON", interactive=False)
         
-        # RIGHT SIDE: AI Conversation Practice
-        with gr.Column(scale=1):
-            gr.Markdown("## 🗣️ AI Conversation Practice")
+            # RIGHT SIDE: AI Conversation Practice
+            with gr.Column(scale=1):
+                gr.Markdown("## 🗣️ AI Conversation Practice")
             
-            with gr.Row():
-                conv_start_btn = gr.Button("▶️ Start Practice", variant="primary", size="sm")
-                conv_stop_btn = gr.Button("⏹️ Stop", variant="stop", size="sm")
+                with gr.Row():
+                    conv_start_btn = gr.Button("▶️ Start Practice", variant="primary", size="sm")
+                    conv_stop_btn = gr.Button("⏹️ Stop", variant="stop", size="sm")
             
-            conv_listen_btn = gr.Button("🎤 Start/Stop Listening", variant="secondary", size="sm")
-            conv_listen_status = gr.Textbox(label="Listening", value="⏸️ Not listening", interactive=False)
+                conv_listen_btn = gr.Button("🎤 Start/Stop Listening", variant="secondary", size="sm")
+                conv_listen_status = gr.Textbox(label="Listening", value="⏸️ Not listening", interactive=False)
             
-            conv_status = gr.Textbox(label="Status", value="⚪ Not started", interactive=False)
+                conv_status = gr.Textbox(label="Status", value="⚪ Not started", interactive=False)
             
-            conv_level = gr.Radio(
-                label="Difficulty Level",
-                choices=["beginner", "intermediate", "advanced"],
-                value="beginner",
-                interactive=True
-            )
+                conv_level = gr.Radio(
+                    label="Difficulty Level",
+                    choices=["beginner", "intermediate", "advanced"],
+                    value="beginner",
+                    interactive=True
+                )
             
-            conv_history = gr.Markdown(
-                label="Conversation",
-                value="Click 'Start Practice' to begin your conversation with AI...",
-            )
+                conv_history = gr.Markdown(
+                    label="Conversation",
+                    value="Click 'Start Practice' to begin your conversation with AI...",
+                )
             
-            conv_stats = gr.Markdown(
-                label="Session Stats",
-                value="**Session Stats:**\n- Not started yet"
-            )
+                conv_stats = gr.Markdown(
+                    label="Session Stats",
+                    value="**Session Stats:**\n- Not started yet"
+                )
             
-            conv_message = gr.Textbox(
-                label="Latest Message",
-                value="",
-                interactive=False,
-                visible=False
-            )
-    
-    # ============================================================================
-    # EVENT HANDLERS
-    # ============================================================================
-    
-    # Meeting Transcription Events
-    start_btn.click(
-        fn=start_meeting,
-        outputs=[status_text, english_output, bangla_output, status_display]
-    )
+                conv_message = gr.Textbox(
+                    label="Latest Message",
+                    value="",
+                    interactive=False,
+                    visible=False
+                )
     
-    stop_btn.click(
-        fn=stop_meeting,
-        outputs=status_text
-    )
+        # ============================================================================
+        # EVENT HANDLERS
+        # ============================================================================
     
-    summary_btn.click(
-        fn=show_basic_summary,
-        outputs=summary_output
-    )
+        # Meeting Transcription Events
+        start_btn.click(
+            fn=start_meeting,
+            inputs=meeting_id_box,
+            outputs=[status_text, english_output, bangla_output, status_display]
+        )
     
-    ai_summary_btn.click(
-        fn=generate_ai_summary_ui,
-        outputs=ai_summary_output
-    )
+        stop_btn.click(
+            fn=stop_meeting,
+            inputs=meeting_id_box,
+            outputs=status_text
+        )
     
-    # AI Conversation Events
-    conv_start_btn.click(
-        fn=start_ai_conversation,
-        outputs=[conv_status, conv_history, conv_stats, conv_message]
-    )
+        summary_btn.click(
+            fn=show_basic_summary,
+            inputs=meeting_id_box,
+            outputs=summary_output
+        )
     
-    conv_stop_btn.click(
-        fn=stop_ai_conversation,
-        outputs=[conv_status, conv_history, conv_stats, conv_message]
-    )
+        ai_summary_btn.click(
+            fn=generate_ai_summary_ui,
+            inputs=meeting_id_box,
+            outputs=ai_summary_output
+        )
     
-    conv_listen_btn.click(
-        fn=toggle_conversation_listening,
-        outputs=conv_listen_status
-    )
+        export_btn.click(
+            fn=export_summary,
+            inputs=meeting_id_box,
+            outputs=summary_file
+        )
     
-    conv_level.change(
-        fn=change_level,
-        inputs=conv_level,
-        outputs=conv_message
-    )
+        # AI Conversation Events
+        conv_start_btn.click(
+            fn=start_ai_conversation,
+            outputs=[conv_status, conv_history, conv_stats, conv_message]
+        )
     
-    # Continuous polling for live updates
-    demo.load(
-        fn=get_current_captions,
-        outputs=[english_output, bangla_output, status_display],
-        show_progress=False
-    )
+        conv_stop_btn.click(
+            fn=stop_ai_conversation,
+            outputs=[conv_status, conv_history, conv_stats, conv_message]
+        )
     
-    # Refresh meeting captions every 200ms
-    caption_refresh = gr.Timer(0.2)
-    caption_refresh.tick(
-        fn=get_current_captions,
-        outputs=[english_output, bangla_output, status_display]
-    )
+        conv_listen_btn.click(
+            fn=toggle_conversation_listening,
+            outputs=conv_listen_status
+        )
     
-    # Refresh meeting transcript every 2 seconds
-    transcript_refresh = gr.Timer(2)
-    transcript_refresh.tick(
-        fn=get_transcript_history,
-        outputs=transcript_display
-    )
+        conv_level.change(
+            fn=change_level,
+            inputs=conv_level,
+            outputs=conv_message
+        )
     
-    # Refresh conversation every 1 second
-    conversation_refresh = gr.Timer(1)
-    conversation_refresh.tick(
-        fn=get_conversation_update,
-        outputs=[conv_history, conv_stats, conv_status]
-    )
+        # Continuous polling for live updates
+        demo.load(
+            fn=get_current_captions,
+            inputs=meeting_id_box,
+            outputs=[english_output, bangla_output, status_display],
+            show_progress=False
+        )
+    
+        # Refresh meeting captions every 200ms
+        caption_refresh = gr.Timer(0.2)
+        caption_refresh.tick(
+            fn=get_current_captions,
+            inputs=meeting_id_box,
+            outputs=[english_output, bangla_output, status_display]
+        )
+    
+        # Refresh meeting transcript every 2 seconds
+        transcript_refresh = gr.Timer(2)
+        transcript_refresh.tick(
+            fn=get_transcript_history,
+            inputs=meeting_id_box,
+            outputs=transcript_display
+        )
+    
+        # Refresh live summary every 5 seconds
+        rolling_summary_refresh = gr.Timer(5)
+        rolling_summary_refresh.tick(
+            fn=get_rolling_summary,
+            inputs=meeting_id_box,
+            outputs=rolling_summary_output
+        )
+    
+        # Refresh conversation every 0.5 seconds (AI replies stream into the history)
+        conversation_refresh = gr.Timer(0.5)
+        conversation_refresh.tick(
+            fn=get_conversation_update,
+            outputs=[conv_history, conv_stats, conv_status]
+        )
+    
+    return demo
 
 if __name__ == "__main__":
     print("\n" + "="*60)
@@ -989,9 +867,33 @@ if __name__ == "__main__":
     print("📝 Meeting Transcription (Left)")
     print("🗣️ AI Conversation Practice (Right)")
     print("🌐 Access at: http://localhost:7860")
+    
+    # Live caption stream for external displays (CAPTION_API_PORT=0 disables)
+    caption_port = int(os.getenv("CAPTION_API_PORT", "7861"))
+    if caption_port:
+        start_caption_server(port=caption_port)
+        print(f"📡 Caption stream at: http://localhost:{caption_port}/events")
+    
+    # Network audio ingest for thin capture clients (disabled unless AUDIO_INGEST_PORT is set)
+    ingest_port = int(os.getenv("AUDIO_INGEST_PORT", "0"))
+    if ingest_port:
+        start_ingest_server(session_manager, port=ingest_port)
+        print(f"🌐 Audio ingest at: tcp://localhost:{ingest_port}")
     print("="*60 + "\n")
     
-    demo.launch(
+    # Load Whisper in the background so the UI is served immediately
+    # (MEETINGAI_PRELOAD_MODELS=0 defers it to the first transcription)
+    if inference_pool is None and os.getenv("MEETINGAI_PRELOAD_MODELS", "1") == "1":
+        def preload_models():
+            try:
+                import transcriber
+                transcriber.get_model()
+            except Exception as e:
+                print(f"⚠️ Model preload failed: {e}")
+        
+        threading.Thread(target=preload_models, daemon=True).start()
+    
+    build_ui().launch(
         server_name="0.0.0.0",
         server_port=7860,
         share=False,
@@ -0,0 +1,372 @@
+# acoustic_scorer.py - Pronunciation scoring from the captured audio
+"""
+Acoustic pronunciation scoring (goodness of pronunciation)
+
+The text scorer (pronunciation_checker.py) only compares the Whisper
+transcript with the reference, which mostly measures Whisper's spelling.
+This scorer listens to the audio instead:
+
+1. a CTC phoneme recogniser (wav2vec2 espeak-phoneme model exported to
+   ONNX, run on CPU with onnxruntime) gives per-frame phoneme
+   log-probabilities
+2. the reference phonemes (espeak, same inventory as the model) are
+   force-aligned to the frames with CTC Viterbi
+3. each phoneme's GOP is the mean log-probability margin of the expected
+   phoneme over the best competing one in its frames
+
+Utterances queued together run as one padded ONNX batch. The model is
+loaded once per process. Scoring is optional: without onnxruntime or a
+model (MEETINGAI_PHONEME_MODEL) available() is False.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+try:
+    from pronunciation_checker import PronunciationChecker, WORD_PATTERN, STRIP_MARKS
+except ImportError:  # Imported as ai_converstion_practise.acoustic_scorer
+    from ai_converstion_practise.pronunciation_checker import PronunciationChecker, WORD_PATTERN, STRIP_MARKS
+
+MODEL_PATH = os.getenv("MEETINGAI_PHONEME_MODEL", "")
+VOCAB_PATH = os.getenv("MEETINGAI_PHONEME_VOCAB", "")       # Default: vocab.json next to the model
+MODEL_THREADS = int(os.getenv("MEETINGAI_PHONEME_THREADS", str(min(4, os.cpu_count() or 1))))
+
+SAMPLERATE = 16000
+BATCH_SIZE = 8                  # Utterances per ONNX run
+BLANK_TOKENS = ("<pad>", "<blank>", "_")
+WEAK_PHONEME_SCORE = 50         # Phonemes below this are reported
+# wav2vec2 feature encoder: (kernel, stride) per conv layer, 20 ms per output frame
+CONV_LAYERS = [(10, 5), (3, 2), (3, 2), (3, 2), (3, 2), (2, 2), (2, 2)]
+
+_models = {}                    # model path -> (session, vocab, blank id)
+_models_lock = threading.Lock()
+
+
+def available(model_path=None):
+    """True if onnxruntime is installed and the phoneme model exists (nothing is loaded)"""
+    import importlib.util
+
+    path = model_path or MODEL_PATH
+    return bool(path) and os.path.exists(path) and importlib.util.find_spec("onnxruntime") is not None
+
+
+def load_model(model_path=None, vocab_path=None):
+    """
+    ONNX session + vocabulary, loaded once per process
+
+    Returns:
+        tuple: (onnxruntime.InferenceSession, {phoneme: id}, blank id)
+    """
+    path = model_path or MODEL_PATH
+    with _models_lock:
+        if path not in _models:
+            import onnxruntime as ort  # Imported on first acoustic check
+
+            vocab_file = vocab_path or VOCAB_PATH or os.path.join(os.path.dirname(path), "vocab.json")
+            with open(vocab_file, encoding="utf-8") as f:
+                vocab = json.load(f)
+            blank = next((vocab[t] for t in BLANK_TOKENS if t in vocab), 0)
+
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = MODEL_THREADS
+            start = time.time()
+            session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+            print(f"✅ Phoneme model loaded in {time.time() - start:.1f}s ({len(vocab)} tokens)")
+            _models[path] = (session, vocab, blank)
+        return _models[path]
+
+
+def num_frames(samples):
+    """Output frames of the wav2vec2 encoder for `samples` input samples"""
+    for kernel, stride in CONV_LAYERS:
+        samples = (samples - kernel) // stride + 1
+    return max(int(samples), 0)
+
+
+def log_softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    return logits - np.log(np.exp(logits).sum(axis=-1, keepdims=True))
+
+
+def ctc_force_align(log_probs, labels, blank=0):
+    """
+    CTC Viterbi alignment of a label sequence to frames
+
+    The state loop is vectorised: each frame updates all 2L+1 states
+    (blank-interleaved labels) with NumPy.
+
+    Args:
+        log_probs: (frames, vocab) log-probabilities
+        labels: Token ids of the reference
+        blank: Blank token id
+
+    Returns:
+        list: (start_frame, end_frame) per label (end exclusive), or None if
+            the audio is too short for the reference
+    """
+    frames, count = len(log_probs), len(labels)
+    if count == 0 or frames < count:
+        return None
+
+    states = np.full(2 * count + 1, blank, dtype=np.int64)
+    states[1::2] = labels
+    size = len(states)
+    # A label may follow the previous label directly (skipping the blank) unless they repeat
+    can_skip = np.zeros(size, dtype=bool)
+    can_skip[3::2] = states[3::2] != states[1:-2:2]
+
+    alpha = np.full(size, -np.inf)
+    alpha[0] = log_probs[0, blank]
+    alpha[1] = log_probs[0, states[1]]
+    back = np.zeros((frames, size), dtype=np.int8)
+
+    for t in range(1, frames):
+        stay = alpha
+        step = np.concatenate(([-np.inf], alpha[:-1]))
+        skip = np.where(can_skip, np.concatenate(([-np.inf, -np.inf], alpha[:-2])), -np.inf)
+        candidates = np.stack([stay, step, skip])
+        back[t] = candidates.argmax(axis=0)
+        alpha = candidates.max(axis=0) + log_probs[t, states]
+
+    state = size - 1 if alpha[size - 1] >= alpha[size - 2] else size - 2
+    if not np.isfinite(alpha[state]):
+        return None
+
+    path = np.empty(frames, dtype=np.int64)
+    for t in range(frames - 1, -1, -1):
+        path[t] = state
+        state -= back[t, state]
+
+    segments = []
+    for k in range(count):
+        hits = np.flatnonzero(path == 2 * k + 1)
+        segments.append((int(hits[0]), int(hits[-1]) + 1))
+    return segments
+
+
+class AcousticScorer:
+    """
+    Forced-alignment GOP scorer with batching and a shared model
+    """
+
+    def __init__(self, model_path=None, vocab_path=None, checker=None, batch_size=BATCH_SIZE):
+        """
+        Args:
+            model_path: ONNX CTC phoneme model (default MEETINGAI_PHONEME_MODEL)
+            vocab_path: Token -> id JSON (default vocab.json next to the model)
+            checker: PronunciationChecker used for (cached, batched) reference phonemes
+            batch_size: Utterances per ONNX run
+        """
+        self.model_path = model_path or MODEL_PATH
+        self.vocab_path = vocab_path
+        self.checker = checker or PronunciationChecker()
+        self.batch_size = batch_size
+        self.stats = {'utterances': 0, 'batches': 0, 'audio_seconds': 0.0, 'compute_seconds': 0.0}
+
+        self._pending = []              # (audio, text, Future)
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        return available(self.model_path)
+
+    @property
+    def realtime_factor(self):
+        """Compute time / audio time (below 1.0 = faster than real time)"""
+        audio = self.stats['audio_seconds']
+        return self.stats['compute_seconds'] / audio if audio else 0.0
+
+    # ------------------------------------------------------------------
+    # Model
+    # ------------------------------------------------------------------
+
+    def _log_probs(self, audios):
+        """One padded ONNX run -> per-utterance (frames, vocab) log-probabilities"""
+        session, _, _ = load_model(self.model_path, self.vocab_path)
+        longest = max(len(a) for a in audios)
+        batch = np.zeros((len(audios), longest), dtype=np.float32)
+        mask = np.zeros((len(audios), longest), dtype=np.int64)
+        for row, audio in enumerate(audios):
+            # wav2vec2 expects zero-mean, unit-variance input
+            batch[row, :len(audio)] = (audio - audio.mean()) / (audio.std() + 1e-7)
+            mask[row, :len(audio)] = 1
+
+        inputs = {}
+        for spec in session.get_inputs():
+            if spec.name == "attention_mask":
+                inputs[spec.name] = mask
+            else:
+                inputs[spec.name] = batch
+        logits = session.run(None, inputs)[0]
+
+        return [
+            log_softmax(logits[row, :min(num_frames(len(audio)), logits.shape[1])].astype(np.float64))
+            for row, audio in enumerate(audios)
+        ]
+
+    def _token_ids(self, phones, vocab):
+        """
+        Reference phonemes -> model tokens; returns (ids, index of the phoneme each id scores)
+
+        espeak phones missing from the vocabulary are tried without stress
+        and length marks, then letter by letter; unknown ones are skipped.
+        """
+        ids, owners = [], []
+        for index, phone in enumerate(phones):
+            bare = "".join(ch for ch in phone if ch not in "ˈˌ")
+            base = "".join(ch for ch in phone if ch not in STRIP_MARKS)
+            for candidate in (phone, bare, base):
+                if candidate in vocab:
+                    ids.append(vocab[candidate])
+                    owners.append(index)
+                    break
+            else:
+                if base and all(ch in vocab for ch in base):
+                    ids.extend(vocab[ch] for ch in base)
+                    owners.extend([index] * len(base))
+        return ids, owners
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _score_one(self, log_probs, text, phonemes, vocab, blank):
+        words = WORD_PATTERN.findall(text.lower())
+        phones, word_of = [], []
+        for index, word in enumerate(words):
+            phones += phonemes[word]
+            word_of += [index] * len(phonemes[word])
+
+        ids, owners = self._token_ids(phones, vocab)
+        segments = ctc_force_align(log_probs, ids, blank)
+        if segments is None:
+            return None
+
+        # GOP: expected token vs the best non-blank token, averaged over its frames
+        competitors = log_probs.copy()
+        competitors[:, blank] = -np.inf
+        best = competitors.max(axis=1)
+        id_to_token = {i: t for t, i in vocab.items()}
+
+        phone_gop = {}
+        phone_heard = {}
+        for token, owner, (start, end) in zip(ids, owners, segments):
+            gop = float(np.mean(log_probs[start:end, token] - best[start:end]))
+            phone_gop.setdefault(owner, []).append(gop)
+            likely = int(competitors[start:end].sum(axis=0).argmax())
+            if likely != token:
+                phone_heard[owner] = id_to_token.get(likely, "?")
+
+        phone_results = []
+        for index, phone in enumerate(phones):
+            if index not in phone_gop:
+                continue  # Not in the model's inventory
+            score = int(round(100 * np.exp(np.mean(phone_gop[index]))))
+            phone_results.append({
+                'phone': phone,
+                'word': words[word_of[index]],
+                'word_index': word_of[index],
+                'score': score,
+                'heard': phone_heard.get(index, phone),
+            })
+
+        word_results = []
+        for index, word in enumerate(words):
+            scored = [p for p in phone_results if p['word_index'] == index]
+            if not scored:
+                continue
+            word_results.append({
+                'word': word,
+                'index': index,
+                'score': int(round(np.mean([p['score'] for p in scored]))),
+                'weak': [p['phone'] for p in scored if p['score'] < WEAK_PHONEME_SCORE],
+            })
+
+        score = int(round(np.mean([p['score'] for p in phone_results]))) if phone_results else 0
+        return {
+            'score': score,
+            'phonemes': phone_results,
+            'words': word_results,
+            'feedback': self.checker._get_feedback(score),
+            'pronunciation_grade': self.checker._get_grade(score),
+            'source': 'acoustic',
+        }
+
+    def score_many(self, items):
+        """
+        Score (audio, reference_text) pairs: one espeak run for the references,
+        one ONNX run per batch_size utterances
+
+        Args:
+            items: List of (16kHz float32 audio, reference text)
+
+        Returns:
+            list: Result dict per item (None if the audio is too short for the text)
+        """
+        if not items:
+            return []
+        start = time.time()
+        _, vocab, blank = load_model(self.model_path, self.vocab_path)
+
+        texts = [text for _, text in items]
+        phonemes = self.checker.phonemize_words(WORD_PATTERN.findall(" ".join(texts).lower()))
+
+        results = []
+        for offset in range(0, len(items), self.batch_size):
+            chunk = items[offset:offset + self.batch_size]
+            audios = [np.asarray(audio, dtype=np.float32).reshape(-1) for audio, _ in chunk]
+            for log_probs, (_, text) in zip(self._log_probs(audios), chunk):
+                results.append(self._score_one(log_probs, text, phonemes, vocab, blank))
+            self.stats['batches'] += 1
+
+        self.stats['utterances'] += len(items)
+        self.stats['audio_seconds'] += sum(len(audio) for audio, _ in items) / SAMPLERATE
+        self.stats['compute_seconds'] += time.time() - start
+        return results
+
+    def score(self, audio, reference_text):
+        """Score one utterance (see score_many)"""
+        return self.score_many([(audio, reference_text)])[0]
+
+    def submit(self, audio, reference_text):
+        """
+        Queue an utterance; everything queued while a batch runs is scored
+        in the next batch
+
+        Returns:
+            concurrent.futures.Future: Resolves to the result dict (or None)
+        """
+        future = Future()
+        with self._lock:
+            self._pending.append((audio, reference_text, future))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True, name="acoustic-scorer")
+                self._worker.start()
+        return future
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._worker = None
+                    return
+                batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+
+            try:
+                results = self.score_many([(audio, text) for audio, text, _ in batch])
+                for (_, _, future), result in zip(batch, results):
+                    future.set_result(result)
+                print(f"🗣️ Scored {len(batch)} utterance(s), real-time factor {self.realtime_factor:.2f}")
+            except Exception as e:
+                print(f"❌ Acoustic scoring failed: {e}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+
+
+# Shared scorer (the model is loaded on the first score)
+acoustic_scorer = AcousticScorer()
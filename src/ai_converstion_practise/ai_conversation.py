@@ -2,57 +2,70 @@
 """
 AI Conversation Practice Engine
 Week 1: Basic spoken conversation with voice input/output
-FIXED VERSION - Temp file handling corrected
+Replies are spoken from memory (no temp files)
 """
 
-import google.generativeai as genai
 import os
-from dotenv import load_dotenv
+import sys
 import time
-from gtts import gTTS
-import tempfile
-import pygame
-import threading
 
-load_dotenv()
+# Shared LLM client lives in src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-# Configure Gemini
-GENAI_API_KEY = os.getenv("GENAI_API_KEY")
-if not GENAI_API_KEY:
+from llm_client import get_model, iter_text
+from llm_gateway import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+
+try:
+    from tts_engine import tts_engine, SentenceSplitter, SpeechQueue
+    from duplex_controller import DuplexController
+    from conversation_memory import ConversationMemory
+    from acoustic_scorer import acoustic_scorer
+except ImportError:  # Imported as ai_converstion_practise.ai_conversation
+    from ai_converstion_practise.tts_engine import tts_engine, SentenceSplitter, SpeechQueue
+    from ai_converstion_practise.duplex_controller import DuplexController
+    from ai_converstion_practise.conversation_memory import ConversationMemory
+    from ai_converstion_practise.acoustic_scorer import acoustic_scorer
+
+# Gemini model (resolved lazily on the first reply - no network call here)
+model = get_model(PRIORITY_INTERACTIVE)  # Conversation turns go first in the LLM gateway
+memory_model = get_model(PRIORITY_BACKGROUND)  # Summaries of older turns
+if not model:
     print("❌ ERROR: GENAI_API_KEY not found in .env file")
     print("Get your free key: https://makersuite.google.com/app/apikey")
-    model = None
-else:
-    genai.configure(api_key=GENAI_API_KEY)
-    
-    # Try latest Gemini models
-    model = None
-    model_names = [
-        "models/gemini-2.5-flash",
-        "models/gemini-2.0-flash",
-        "models/gemini-flash-latest",
-    ]
-    
-    for model_name in model_names:
-        try:
-            model = genai.GenerativeModel(model_name)
-            # Quick test
-            test_response = model.generate_content("Hi")
-            print(f"✅ Conversation AI using: {model_name}")
-            break
-        except Exception as e:
-            print(f"⚠️ {model_name} not available, trying next...")
-            continue
-    
-    if not model:
-        print("❌ No Gemini model available")
 
-# Initialize pygame for audio playback
-try:
-    pygame.mixer.init()
-    print("✅ Pygame mixer initialized")
-except Exception as e:
-    print(f"⚠️ Pygame init warning: {e}")
+# Fixed phrases (pre-warmed in the TTS cache at session start)
+GREETING = "Hello! I'm your AI conversation partner. Let's practice English together! What would you like to talk about?"
+RETRY_PROMPT = "I didn't catch that. Could you please repeat?"
+ERROR_REPLY = "Sorry, I had a problem. Could you say that again?"
+FALLBACK_RESPONSES = [
+    "That's interesting! Can you tell me more?",
+    "I see. What else would you like to talk about?",
+    "Sounds good! What do you think about it?",
+    "Nice! Tell me more about that.",
+    "Great! What's your favorite part?"
+]
+FIXED_PHRASES = [GREETING, RETRY_PROMPT, ERROR_REPLY] + FALLBACK_RESPONSES
+
+
+def _summarize_turns(previous_summary, messages):
+    """Fold older messages into the running conversation summary (background priority)"""
+    lines = "\n".join(f"{'You' if m['role'] == 'user' else 'AI'}: {m['text']}" for m in messages)
+    prompt = f"""Update the running summary of an English practice conversation.
+Keep what matters for continuing it: facts about the learner (name, work,
+interests, plans), topics already covered and repeated mistakes.
+At most 80 words, plain text.
+
+Current summary: {previous_summary or "(none)"}
+
+New messages:
+{lines}
+
+Updated summary:"""
+    response = memory_model.generate_content(
+        prompt,
+        generation_config={'temperature': 0.2, 'max_output_tokens': 160}
+    )
+    return response.text.strip()
 
 
 class ConversationEngine:
@@ -62,10 +75,12 @@ class ConversationEngine:
     
     def __init__(self):
         self.model = model
-        self.conversation_history = []
+        self.memory = ConversationMemory(_summarize_turns if memory_model else None)
         self.is_active = False
         self.user_level = "beginner"  # beginner, intermediate, advanced
         self.current_topic = "general conversation"
+        self.partial_response = ""  # Reply being streamed (shown in history)
+        self.last_pronunciation = None  # Acoustic score of the last utterance
         
         # Stats
         self.stats = {
@@ -85,20 +100,22 @@ User level: {level}
 Current turns: {turns}
 """
     
+    @property
+    def conversation_history(self):
+        """Messages of this session (bounded, oldest dropped first)"""
+        return self.memory.messages
+    
     def start_session(self):
         """Start a new conversation session"""
         self.is_active = True
         self.stats['session_start'] = time.time()
-        self.conversation_history = []
+        self.memory.clear()
+        self.last_pronunciation = None
         
         # Initial greeting
-        greeting = "Hello! I'm your AI conversation partner. Let's practice English together! What would you like to talk about?"
+        greeting = GREETING
         
-        self.conversation_history.append({
-            'role': 'ai',
-            'text': greeting,
-            'timestamp': time.time()
-        })
+        self.memory.append('ai', greeting)
         
         print(f"🤖 AI: {greeting}")
         
@@ -119,12 +136,18 @@ Great practice session! Keep it up! 💪"""
         
         return summary
     
-    def process_user_speech(self, user_text):
+    def process_user_speech(self, user_text, on_partial=None, cancel=None):
         """
         Process user's spoken input and generate AI response
         
+        The reply is streamed: partial text is shown in the history (and
+        passed to on_partial) while Gemini is still generating.
+        
         Args:
             user_text: Transcribed user speech
+            on_partial: Optional callback(reply_so_far) per streamed chunk
+            cancel: Optional threading.Event; set when the user interrupts
+                (streaming stops, the reply is kept as far as it got)
             
         Returns:
             dict: {
@@ -143,24 +166,21 @@ Great practice session! Keep it up! 💪"""
         
         if not user_text or len(user_text.strip()) < 2:
             return {
-                'ai_response': "I didn't catch that. Could you please repeat?",
+                'ai_response': RETRY_PROMPT,
                 'should_speak': True,
                 'stats': self.stats
             }
         
         try:
             # Add user message to history
-            self.conversation_history.append({
-                'role': 'user',
-                'text': user_text,
-                'timestamp': time.time()
-            })
+            self.memory.append('user', user_text)
             
             # Build conversation context
             context = self._build_context()
             
             # Try to generate AI response
             ai_response = None
+            streamed = ""
             
             try:
                 # Generate AI response with safety settings disabled
@@ -178,22 +198,45 @@ Your response (1-2 sentences):"""
                 
                 response = self.model.generate_content(
                     prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.7,
-                        top_p=0.9,
-                        max_output_tokens=100,
-                    ),
+                    generation_config={
+                        'temperature': 0.7,
+                        'top_p': 0.9,
+                        'max_output_tokens': 100,
+                    },
                     safety_settings={
                         'HARM_CATEGORY_HARASSMENT': 'BLOCK_NONE',
                         'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_NONE',
                         'HARM_CATEGORY_SEXUALLY_EXPLICIT': 'BLOCK_NONE',
                         'HARM_CATEGORY_DANGEROUS_CONTENT': 'BLOCK_NONE',
-                    }
+                    },
+                    stream=True
                 )
                 
-                # Try to get response text
-                if response and response.text:
-                    ai_response = response.text.strip()
+                # Show the reply while it is being generated
+                for text in iter_text(response):
+                    if cancel is not None and cancel.is_set():
+                        break
+                    streamed += text
+                    self.partial_response = streamed
+                    if on_partial:
+                        on_partial(streamed)
+                
+                if cancel is not None and cancel.is_set():
+                    print("✋ AI reply interrupted by the user")
+                    interrupted = streamed.strip()
+                    if interrupted:
+                        self.memory.append('ai', interrupted + " …")
+                    return {
+                        'ai_response': interrupted,
+                        'should_speak': False,
+                        'interrupted': True,
+                        'stats': self.stats,
+                        'conversation_history': self._format_history()
+                    }
+                
+                # Check the complete response (blocked replies stream nothing)
+                if streamed.strip():
+                    ai_response = streamed.strip()
                     ai_response = ai_response.strip('"').strip("'")
                     print("✅ AI response generated successfully")
                 else:
@@ -202,28 +245,20 @@ Your response (1-2 sentences):"""
                     
             except Exception as gemini_error:
                 print(f"⚠️ Gemini API error: {gemini_error}")
-                ai_response = None
+                # Sentences already streamed have been heard: keep them, not a canned reply
+                ai_response = streamed.strip().strip('"').strip("'") or None
+            
+            finally:
+                self.partial_response = ""
             
             # Fallback responses if AI blocked
             if not ai_response:
-                fallback_responses = [
-                    "That's interesting! Can you tell me more?",
-                    "I see. What else would you like to talk about?",
-                    "Sounds good! What do you think about it?",
-                    "Nice! Tell me more about that.",
-                    "Great! What's your favorite part?"
-                ]
-                
                 import random
-                ai_response = random.choice(fallback_responses)
+                ai_response = random.choice(FALLBACK_RESPONSES)
                 print(f"🔄 Using fallback response: {ai_response}")
             
             # Add AI response to history
-            self.conversation_history.append({
-                'role': 'ai',
-                'text': ai_response,
-                'timestamp': time.time()
-            })
+            self.memory.append('ai', ai_response)
             
             # Update stats
             self.stats['total_turns'] += 1
@@ -244,31 +279,18 @@ Your response (1-2 sentences):"""
             print(f"❌ {error_msg}")
             
             return {
-                'ai_response': "Sorry, I had a problem. Could you say that again?",
+                'ai_response': ERROR_REPLY,
                 'should_speak': True,
                 'stats': self.stats
             }
     
     def _build_context(self):
-        """Build recent conversation context (last 4 turns)"""
-        recent = self.conversation_history[-4:] if len(self.conversation_history) > 4 else self.conversation_history
-        
-        context_lines = []
-        for msg in recent:
-            role = "You" if msg['role'] == 'user' else "AI"
-            context_lines.append(f"{role}: {msg['text']}")
-        
-        return "\n".join(context_lines)
+        """Build conversation context (running summary + recent turns within the token budget)"""
+        return self.memory.build_context()
     
     def _format_history(self):
-        """Format conversation history for display"""
-        formatted = []
-        for msg in self.conversation_history[-10:]:  # Last 10 messages
-            role_icon = "👤" if msg['role'] == 'user' else "🤖"
-            role_name = "You" if msg['role'] == 'user' else "AI"
-            formatted.append(f"{role_icon} **{role_name}:** {msg['text']}")
-        
-        return "\n\n".join(formatted)
+        """Format conversation history for display (cached, updated on each message)"""
+        return self.memory.format_history(self.partial_response)
     
     def suggest_topics(self):
         """Suggest conversation topics based on level"""
@@ -309,17 +331,33 @@ Your response (1-2 sentences):"""
 class VoiceManager:
     """
     Manages text-to-speech for AI responses
-    FIXED: Proper temp file handling
+    Synthesised in memory and played on a persistent stream (tts_engine.py);
+    sentences are queued and spoken back-to-back
     """
     
-    def __init__(self):
-        self.temp_files = []
-        self.is_speaking = False
+    def __init__(self, engine=None):
+        self.engine = engine or tts_engine
+        self.queue = SpeechQueue(self.engine)
+    
+    @property
+    def is_speaking(self):
+        return self.queue.is_busy()
+    
+    def say(self, text, lang='en'):
+        """
+        Queue text for speaking and return immediately
+        
+        Args:
+            text: Sentence (or whole reply) to speak
+            lang: Language code (default: 'en')
+        """
+        if text and text.strip():
+            print(f"🔊 TTS: Queued: '{text[:50]}'")
+            self.queue.say(text, lang)
     
     def speak(self, text, lang='en'):
         """
-        Convert text to speech and play it
-        FIXED VERSION with proper file handling
+        Convert text to speech and play it (blocks until spoken)
         
         Args:
             text: Text to speak
@@ -330,86 +368,22 @@ class VoiceManager:
             print("⚠️ TTS: No text to speak")
             return
         
-        temp_filename = None
-        
-        try:
-            print(f"🔊 TTS: Preparing to speak: '{text[:50]}...'")
-            self.is_speaking = True
-            
-            # Generate speech
-            print("🔊 TTS: Generating audio with gTTS...")
-            tts = gTTS(text=text, lang=lang, slow=False)
-            
-            # FIXED: Create temp file and close it before saving
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-            temp_filename = temp_file.name
-            temp_file.close()  # ✅ CRITICAL: Close file before saving
-            
-            print(f"🔊 TTS: Saving to temp file: {temp_filename}")
-            tts.save(temp_filename)
-            
-            # Verify file exists
-            if not os.path.exists(temp_filename):
-                print(f"❌ TTS: File not created: {temp_filename}")
-                self.is_speaking = False
-                return
-            
-            file_size = os.path.getsize(temp_filename)
-            print(f"✅ TTS: File saved successfully ({file_size} bytes)")
-            self.temp_files.append(temp_filename)
-            
-            # Play audio
-            print(f"🔊 TTS: Loading audio file...")
-            pygame.mixer.music.load(temp_filename)
-            print(f"🔊 TTS: Playing audio NOW... 🔊")
-            pygame.mixer.music.play()
-            
-            # Wait for audio to finish
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-            
-            print(f"✅ TTS: Finished speaking")
-            self.is_speaking = False
-            
-        except Exception as e:
-            print(f"❌ TTS Error: {e}")
-            import traceback
-            traceback.print_exc()
-            self.is_speaking = False
-        
-        finally:
-            # Unload audio to free the file
-            try:
-                pygame.mixer.music.unload()
-                time.sleep(0.1)  # Give it time to release the file
-            except:
-                pass
+        start = time.time()
+        self.say(text, lang)
+        self.queue.wait()
+        print(f"✅ TTS: Finished speaking ({time.time() - start:.1f}s)")
     
     def stop_speaking(self):
-        """Stop current speech"""
-        if self.is_speaking:
-            pygame.mixer.music.stop()
-            self.is_speaking = False
+        """Stop current speech and drop queued sentences"""
+        self.queue.cancel()
+    
+    def prewarm(self, phrases, lang='en'):
+        """Cache audio for fixed phrases in the background"""
+        return self.engine.prewarm(phrases, lang)
     
     def cleanup(self):
-        """Clean up temporary audio files"""
-        # Unload first
-        try:
-            pygame.mixer.music.unload()
-            time.sleep(0.2)
-        except:
-            pass
-        
-        # Then delete
-        for temp_file in self.temp_files:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                    print(f"🗑️ Cleaned up: {temp_file}")
-            except Exception as e:
-                print(f"⚠️ Could not delete {temp_file}: {e}")
-        
-        self.temp_files = []
+        """Stop playback (cached audio is kept for the next session)"""
+        self.stop_speaking()
 
 
 # Global instances
@@ -421,8 +395,9 @@ def start_conversation():
     """Start a new conversation session"""
     greeting = conversation_engine.start_session()
     
-    # Speak greeting in background thread
-    threading.Thread(target=voice_manager.speak, args=(greeting,), daemon=True).start()
+    # Speak greeting (queued, returns immediately), cache the other fixed phrases
+    voice_manager.say(greeting)
+    voice_manager.prewarm(FIXED_PHRASES)
     
     return {
         'status': '🟢 Active',
@@ -446,27 +421,39 @@ def stop_conversation():
     }
 
 
-def process_speech(user_text):
+def process_speech(user_text, cancel=None):
     """
     Process user's speech and generate AI response
     
     Args:
         user_text: Transcribed user speech
+        cancel: Optional threading.Event set on barge-in (stops LLM + TTS)
     
     Returns:
         dict with AI response and stats
     """
     
+    # Speak each sentence as soon as Gemini has streamed it
+    splitter = SentenceSplitter()
+    streamed = [""]
+    
+    def on_partial(reply_so_far):
+        streamed[0] = reply_so_far
+        for sentence in splitter.update(reply_so_far):
+            if cancel is None or not cancel.is_set():
+                voice_manager.say(sentence)
+    
     # Process with conversation engine
-    result = conversation_engine.process_user_speech(user_text)
+    result = conversation_engine.process_user_speech(user_text, on_partial=on_partial, cancel=cancel)
     
-    # Speak AI response in background
-    if result['should_speak']:
-        threading.Thread(
-            target=voice_manager.speak, 
-            args=(result['ai_response'],), 
-            daemon=True
-        ).start()
+    # Interrupted replies are not spoken (the controller already stopped the voice)
+    if result['should_speak'] and not (cancel is not None and cancel.is_set()):
+        spoken = streamed[0].strip().strip('"').strip("'")
+        if spoken and result['ai_response'] == spoken:
+            for sentence in splitter.flush(streamed[0]):
+                voice_manager.say(sentence)  # Last sentence (no trailing space yet)
+        else:
+            voice_manager.say(result['ai_response'])  # Fallback / canned reply
     
     return {
         'ai_response': result['ai_response'],
@@ -475,6 +462,50 @@ def process_speech(user_text):
     }
 
 
+def score_pronunciation(audio, user_text):
+    """
+    Queue acoustic pronunciation scoring of one utterance (runs beside the
+    reply; the result lands in conversation_engine.last_pronunciation)
+    
+    Args:
+        audio: Captured utterance (16kHz float32)
+        user_text: Its transcript (the reference the audio is aligned to)
+    
+    Returns:
+        Future, or None without the phoneme model
+    """
+    if not acoustic_scorer.available():
+        return None
+    
+    def on_done(future):
+        if future.exception() is None and future.result() is not None:
+            conversation_engine.last_pronunciation = future.result()
+    
+    future = acoustic_scorer.submit(audio, user_text)
+    future.add_done_callback(on_done)
+    return future
+
+
+def create_duplex_controller(transcribe_fn, on_state=None):
+    """
+    Full-duplex turn taking for this conversation (see duplex_controller.py)
+    
+    Args:
+        transcribe_fn: Callable(audio 16kHz float32) -> text
+        on_state: Optional callback(state) on every state change
+    
+    Returns:
+        DuplexController: feed() it every mic frame
+    """
+    return DuplexController(
+        transcribe_fn,
+        lambda user_text, cancel: process_speech(user_text, cancel=cancel),
+        voice_manager,
+        on_state=on_state,
+        on_transcript=score_pronunciation
+    )
+
+
 def _format_stats():
     """Format stats for display"""
     stats = conversation_engine.stats
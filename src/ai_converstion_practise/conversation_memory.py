@@ -0,0 +1,124 @@
+# conversation_memory.py - Bounded conversation history + prompt context
+"""
+Conversation memory for practice sessions
+
+- messages live in a bounded deque (long sessions use constant memory)
+- older turns are folded into a short running summary in the background
+  (rolling_summarizer.py), so the prompt keeps what the learner said
+  earlier without growing
+- the prompt context is the summary plus as many recent messages as fit
+  the token budget
+- the Markdown shown in the UI is updated on append, not rebuilt per tick
+"""
+
+import os
+import time
+from collections import deque
+
+try:
+    from rolling_summarizer import RollingSummarizer
+    from transcript_compactor import estimate_tokens
+except ImportError:  # Imported as src.ai_converstion_practise.conversation_memory
+    from src.rolling_summarizer import RollingSummarizer
+    from src.transcript_compactor import estimate_tokens
+
+MAX_MESSAGES = 200          # Messages kept verbatim per session
+CONTEXT_TOKEN_BUDGET = int(os.getenv("MEETINGAI_CONVERSATION_CONTEXT_TOKENS", "600"))
+SUMMARIZE_EVERY = 6         # Messages per background summary update
+DISPLAY_MESSAGES = 10       # Messages shown in the UI
+
+
+def _label(role):
+    return "You" if role == 'user' else "AI"
+
+
+class ConversationMemory:
+    """
+    History, running summary and prompt context of one conversation
+    """
+
+    def __init__(self, summarize_fn=None, max_messages=MAX_MESSAGES,
+                 token_budget=CONTEXT_TOKEN_BUDGET, display_messages=DISPLAY_MESSAGES):
+        """
+        Args:
+            summarize_fn: Optional callable(previous_summary, messages) -> summary
+                (None = no summary, only the most recent messages are sent)
+            max_messages: Messages kept in memory
+            token_budget: Estimated tokens for summary + recent messages
+            display_messages: Messages in format_history()
+        """
+        self.token_budget = token_budget
+        self.messages = deque(maxlen=max_messages)
+        self._display = deque(maxlen=display_messages)
+        self._display_text = ""
+        self.summarizer = (
+            RollingSummarizer(summarize_fn, every=SUMMARIZE_EVERY) if summarize_fn else None
+        )
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def append(self, role, text):
+        """Add a message ('user' or 'ai')"""
+        message = {'role': role, 'text': text, 'timestamp': time.time()}
+        self.messages.append(message)
+
+        icon = "👤" if role == 'user' else "🤖"
+        self._display.append(f"{icon} **{_label(role)}:** {text}")
+        self._display_text = "\n\n".join(self._display)
+
+        if self.summarizer is not None:
+            self.summarizer.add(message)
+        return message
+
+    def clear(self):
+        """Forget everything (new session)"""
+        self.messages.clear()
+        self._display.clear()
+        self._display_text = ""
+        if self.summarizer is not None:
+            self.summarizer.reset()
+
+    @property
+    def summary(self):
+        return self.summarizer.snapshot()['summary'] if self.summarizer is not None else ""
+
+    def build_context(self, token_budget=None):
+        """
+        Prompt context: running summary + the newest messages that fit
+
+        Messages already covered by the summary are only sent verbatim if
+        there is budget left after the summary.
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        lines = []
+
+        summary = self.summary
+        if summary:
+            header = f"Earlier in this conversation: {summary}"
+            budget -= estimate_tokens(header)
+
+        for message in reversed(self.messages):
+            line = f"{_label(message['role'])}: {message['text']}"
+            cost = estimate_tokens(line) + 2
+            if cost > budget and lines:
+                break
+            lines.append(line)
+            budget -= cost
+
+        lines.reverse()
+        if summary:
+            lines.insert(0, header)
+        return "\n".join(lines)
+
+    def format_history(self, partial=""):
+        """
+        Markdown of the last messages (cached) plus the reply being streamed
+        """
+        if partial:
+            streaming = f"🤖 **AI:** {partial} ▌"
+            return f"{self._display_text}\n\n{streaming}" if self._display_text else streaming
+        return self._display_text
@@ -0,0 +1,277 @@
+# duplex_controller.py - Full-duplex turn taking for conversation practice
+"""
+Full-duplex conversation controller
+
+The microphone stays open while the AI talks. Each mic frame is compared
+with an estimate of the AI's own voice leaking back into the mic (echo):
+
+- while the AI speaks (and shortly after), frames that could be echo are
+  dropped, so Whisper and Gemini never see the AI's own speech
+- a few consecutive frames clearly louder than the echo estimate are a
+  barge-in: playback stops and the running turn (LLM + TTS) is cancelled
+
+States: listening -> user_speaking -> thinking -> ai_speaking -> listening
+"""
+
+import threading
+import time
+
+import numpy as np
+
+LISTENING = "listening"
+USER_SPEAKING = "user_speaking"
+THINKING = "thinking"
+AI_SPEAKING = "ai_speaking"
+
+SAMPLERATE = 16000
+VAD_THRESHOLD = 0.01        # Peak amplitude counted as voice
+MIN_UTTERANCE = 16000       # 1 second at 16kHz
+MAX_UTTERANCE = 64000       # 4 seconds
+END_SILENCE_S = 0.6         # Silence that ends an utterance
+PRE_ROLL_S = 0.3            # Audio kept from before voice onset
+BARGE_IN_S = 0.25           # Voice above the echo estimate needed to interrupt
+ECHO_TAIL_S = 0.3           # Mic stays gated this long after playback (reverb)
+ECHO_MARGIN = 2.0           # Voice must be this much louder than the expected echo
+ECHO_COUPLING = 0.5         # Initial mic/speaker level ratio (learned while the AI talks)
+COUPLING_SMOOTHING = 0.05
+
+
+class Turn:
+    """One user utterance -> AI reply; cancel is set on barge-in"""
+
+    def __init__(self, number):
+        self.number = number
+        self.cancel = threading.Event()
+        self.started = time.time()
+
+
+class DuplexController:
+    """
+    Turn-taking state machine on top of a continuous mic stream
+
+    feed() is called with every mic frame (any size, float32, 16kHz). One
+    turn runs at a time on its own thread: transcribe -> respond -> speak.
+    """
+
+    def __init__(self, transcribe_fn, respond_fn, voice, samplerate=SAMPLERATE, on_state=None,
+                 on_transcript=None):
+        """
+        Args:
+            transcribe_fn: Callable(audio) -> text
+            respond_fn: Callable(user_text, cancel_event) -> result dict
+                (streams the reply into voice, stops when cancel is set)
+            voice: VoiceManager (is_speaking, stop_speaking(), engine.output)
+            samplerate: Mic sample rate
+            on_state: Optional callback(state) on every state change
+            on_transcript: Optional callback(audio, user_text) before the reply
+                (e.g. pronunciation scoring; must not block)
+        """
+        self.transcribe_fn = transcribe_fn
+        self.respond_fn = respond_fn
+        self.voice = voice
+        self.samplerate = samplerate
+        self.on_state = on_state
+        self.on_transcript = on_transcript
+
+        self.state = LISTENING
+        self.coupling = ECHO_COUPLING
+        self.stats = {
+            'turns': 0,
+            'barge_ins': 0,
+            'echo_frames_dropped': 0,
+            'cancelled_turns': 0,
+        }
+
+        self._utterance = []          # Frames of the current user utterance
+        self._utterance_samples = 0
+        self._pre_roll = []
+        self._silence_s = 0.0
+        self._loud_s = 0.0            # Consecutive voice above the echo gate
+        self._last_playback = 0.0     # When the AI was last heard
+        self._turn = None
+        self._turn_counter = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            print(f"🔁 [DUPLEX] {state}")
+            if self.on_state is not None:
+                self.on_state(state)
+
+    def _ai_audible(self):
+        """True while the AI is speaking or its echo may still be in the room"""
+        if self.voice.is_speaking:
+            self._last_playback = time.time()
+            return True
+        return time.time() - self._last_playback < ECHO_TAIL_S
+
+    def _echo_gate(self, out_level):
+        """Mic level that could still be echo of the current playback"""
+        return max(VAD_THRESHOLD, out_level * self.coupling * ECHO_MARGIN)
+
+    # ------------------------------------------------------------------
+    # Audio
+    # ------------------------------------------------------------------
+
+    def feed(self, frame):
+        """Process one mic frame"""
+        frame = np.asarray(frame, dtype=np.float32).reshape(-1)
+        if not len(frame):
+            return
+        duration = len(frame) / self.samplerate
+        level = float(np.max(np.abs(frame)))
+
+        with self._lock:
+            turn_running = self._turn is not None and not self._turn.cancel.is_set()
+
+            if self._ai_audible():
+                self._feed_during_playback(frame, level, duration)
+                return
+
+            if self.state == AI_SPEAKING:
+                self._set_state(THINKING if turn_running else LISTENING)
+            self._feed_listening(frame, level, duration, turn_running)
+
+    def _feed_during_playback(self, frame, level, duration):
+        if self.state != USER_SPEAKING:
+            self._set_state(AI_SPEAKING)
+
+        out_level = getattr(self.voice.engine.output, 'level', 0.0)
+        if level > self._echo_gate(out_level):
+            self._loud_s += duration
+            self._pre_roll.append(frame)
+            if self._loud_s >= BARGE_IN_S:
+                self._barge_in()
+            return
+
+        # Echo (or silence): learn how loud the speaker is in the mic, drop the frame
+        self._loud_s = 0.0
+        self._pre_roll = []
+        self.stats['echo_frames_dropped'] += 1
+        if out_level > VAD_THRESHOLD:
+            ratio = min(1.0, level / out_level)
+            self.coupling += COUPLING_SMOOTHING * (ratio - self.coupling)
+
+    def _feed_listening(self, frame, level, duration, turn_running):
+        if turn_running and self.state != USER_SPEAKING:
+            # Reply still being prepared: only sustained voice interrupts it (a click must not)
+            if level > VAD_THRESHOLD:
+                self._loud_s += duration
+                self._pre_roll.append(frame)
+                if self._loud_s >= BARGE_IN_S:
+                    self._barge_in()  # User talks before the reply is audible
+                return
+            self._loud_s = 0.0
+
+        if level > VAD_THRESHOLD:
+            if self.state != USER_SPEAKING:
+                self._set_state(USER_SPEAKING)
+                self._utterance = list(self._pre_roll)
+                self._utterance_samples = sum(len(f) for f in self._utterance)
+                self._pre_roll = []
+            self._silence_s = 0.0
+        elif self.state == USER_SPEAKING:
+            self._silence_s += duration
+        else:
+            # Keep a little audio from before voice onset
+            self._pre_roll.append(frame)
+            while sum(len(f) for f in self._pre_roll) > PRE_ROLL_S * self.samplerate:
+                self._pre_roll.pop(0)
+            return
+
+        self._utterance.append(frame)
+        self._utterance_samples += len(frame)
+
+        ended = self._silence_s >= END_SILENCE_S and self._utterance_samples >= MIN_UTTERANCE
+        if ended or self._utterance_samples >= MAX_UTTERANCE:
+            audio = np.concatenate(self._utterance)
+            self._utterance = []
+            self._utterance_samples = 0
+            self._pre_roll = []
+            self._silence_s = 0.0
+            self._start_turn(audio)
+        elif self._silence_s >= END_SILENCE_S:
+            # Too short to be speech (click, cough) - back to listening
+            self._utterance = []
+            self._utterance_samples = 0
+            self._silence_s = 0.0
+            self._set_state(LISTENING)
+
+    # ------------------------------------------------------------------
+    # Turns
+    # ------------------------------------------------------------------
+
+    def _barge_in(self):
+        """User interrupts: stop the voice, cancel the running turn (caller holds the lock)"""
+        print("✋ [BARGE-IN] User started talking - stopping AI")
+        self.stats['barge_ins'] += 1
+        self._cancel_turn()
+        self.voice.stop_speaking()
+        self._last_playback = 0.0
+        self._loud_s = 0.0
+
+        self._set_state(USER_SPEAKING)
+        self._utterance = list(self._pre_roll)
+        self._utterance_samples = sum(len(f) for f in self._utterance)
+        self._pre_roll = []
+        self._silence_s = 0.0
+
+    def _cancel_turn(self):
+        if self._turn is not None and not self._turn.cancel.is_set():
+            self._turn.cancel.set()
+            self.stats['cancelled_turns'] += 1
+
+    def _start_turn(self, audio):
+        self._cancel_turn()
+        self._turn_counter += 1
+        turn = Turn(self._turn_counter)
+        self._turn = turn
+        self._set_state(THINKING)
+        threading.Thread(target=self._run_turn, args=(turn, audio), daemon=True,
+                         name=f"duplex-turn-{turn.number}").start()
+
+    def _run_turn(self, turn, audio):
+        try:
+            print(f"🔄 [TURN {turn.number}] Transcribing {len(audio) / self.samplerate:.1f}s...")
+            start = time.time()
+            user_text = self.transcribe_fn(audio)
+            print(f"✅ [TURN {turn.number}] Transcribed in {time.time() - start:.2f}s: '{user_text}'")
+
+            if turn.cancel.is_set():
+                return
+            if not user_text or len(user_text.strip()) <= 2:
+                print(f"⚠️ [SKIPPED] Transcription too short: '{user_text}'")
+                return
+
+            if self.on_transcript is not None:
+                self.on_transcript(audio, user_text)
+            self.respond_fn(user_text, turn.cancel)
+            if not turn.cancel.is_set():
+                self.stats['turns'] += 1
+                print(f"✅ [TURN {turn.number}] Reply ready in {time.time() - start:.2f}s")
+
+        except Exception as e:
+            print(f"❌ [ERROR] Conversation turn failed: {e}")
+
+        finally:
+            with self._lock:
+                if self._turn is turn:
+                    self._turn = None
+                    if self.state == THINKING:
+                        self._set_state(LISTENING)
+
+    def stop(self):
+        """Cancel the running turn and stop speaking"""
+        with self._lock:
+            self._cancel_turn()
+            self._turn = None
+            self._utterance = []
+            self._utterance_samples = 0
+            self._pre_roll = []
+        self.voice.stop_speaking()
+        self._set_state(LISTENING)
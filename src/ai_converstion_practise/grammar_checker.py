@@ -1,45 +1,437 @@
 # grammar_checker.py
+"""
+Grammar feedback for conversation practice
+
+1. Local pre-pass: rule-based checks for common learner mistakes, plus
+   LanguageTool run locally whenever language_tool_python is installed
+   (MEETINGAI_GRAMMAR_LANGUAGETOOL=0 turns it off). With LanguageTool a
+   clean sentence is accepted without an API call, so Gemini is only asked
+   about sentences that have errors. Without it the built-in rules catch
+   too little to decide anything: every sentence goes to Gemini, and the
+   rules are only the offline fallback.
+2. Sentences that need Gemini are sent several per request as one
+   structured JSON call. Utterances that arrive while a request runs form
+   the next batch, so a single turn never waits for others.
+3. Results are cached by normalised sentence (LRU).
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from importlib.util import find_spec
+
+# Shared LLM client lives in src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from llm_client import get_model
+from llm_gateway import PRIORITY_BACKGROUND
+
+GRAMMAR_BATCH_SIZE = 5          # Sentences per Gemini request
+GRAMMAR_BATCH_WINDOW = 0.0      # Extra seconds submit() waits to collect more utterances
+GRAMMAR_CACHE_SIZE = 512
+# Used whenever installed (checked without importing it - it starts a Java server)
+USE_LANGUAGETOOL = (
+    os.getenv("MEETINGAI_GRAMMAR_LANGUAGETOOL", "1") == "1" and find_spec("language_tool_python") is not None
+)
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+
+# Words before "he go" etc. that make the base form correct ("does he go", "can she have")
+AUXILIARIES = frozenset("do does did don't doesn't didn't can can't could would should will won't must may might let make help to".split())
+THIRD_PERSON = {'go': 'goes', 'do': 'does', 'have': 'has', 'watch': 'watches', 'wash': 'washes', 'try': 'tries', 'study': 'studies'}
+BASE_FORMS = {'went': 'go', 'saw': 'see', 'ate': 'eat', 'came': 'come', 'did': 'do', 'had': 'have', 'made': 'make',
+              'took': 'take', 'bought': 'buy', 'gone': 'go', 'got': 'get', 'said': 'say', 'wrote': 'write'}
+UNCOUNTABLE = {'informations': 'information', 'advices': 'advice', 'furnitures': 'furniture',
+               'equipments': 'equipment', 'homeworks': 'homework', 'knowledges': 'knowledge'}
+COMPARATIVES = "better|worse|easier|harder|bigger|smaller|faster|slower|happier|cheaper|larger|older|younger"
+COMMON_VERBS = "go|do|have|want|like|need|make|take|say|come|know|think|work|live|play|watch|study|try|eat|speak"
+AN_EXCEPTIONS = ("one", "once", "uni", "use", "usu", "eu", "ewe")
+# Words before "it go" etc. that make he/she/it an object or an inverted subject
+# ("saw it go", "made it work", "what is it like") - the base form is correct there
+OBJECT_VERBS = frozenset(
+    "is was are were am be been being see sees hear hears feel feels watch watches watched get gets "
+    "let lets letting have has makes making helps helped want wants need needs like likes".split()
+) | frozenset(COMMON_VERBS.split("|")) | frozenset(BASE_FORMS) | frozenset(BASE_FORMS.values())
+
+
+def normalize_sentence(text):
+    """Cache key: collapsed whitespace, straight quotes"""
+    text = (text or "").replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
+    return " ".join(text.split())
+
+
+def _error(kind, incorrect, correct, explanation):
+    return {'type': kind, 'incorrect': incorrect, 'correct': correct, 'explanation': explanation}
+
+
+def _third_person(verb):
+    return THIRD_PERSON.get(verb, verb + "s")
+
+
+def _check_agreement(sentence):
+    errors = []
+    for match in re.finditer(rf"\b(\w+'?\w*)?\s*\b(he|she|it)\s+(don't|{COMMON_VERBS})\b", sentence, re.IGNORECASE):
+        before, subject, verb = match.group(1), match.group(2), match.group(3)
+        if before and (before.lower() in AUXILIARIES or before.lower() in OBJECT_VERBS):
+            continue
+        fixed = "doesn't" if verb.lower() == "don't" else _third_person(verb.lower())
+        errors.append(_error("subject-verb agreement", f"{subject} {verb}", f"{subject} {fixed}",
+                             f"With he/she/it the verb takes -s: \"{subject} {fixed}\"."))
+
+    for pattern, fixed in ((r"\b(I)\s+(is|are)\b", "am"), (r"\b(you|we|they)\s+(is)\b", "are"),
+                           (r"\b(you|we|they)\s+(was)\b", "were"), (r"\b(he|she|it)\s+(are)\b", "is"),
+                           (r"\b(he|she|it)\s+(were)\b", "was")):
+        for match in re.finditer(pattern, sentence, re.IGNORECASE):
+            errors.append(_error("subject-verb agreement", match.group(0), f"{match.group(1)} {fixed}",
+                                 f"Use \"{match.group(1)} {fixed}\"."))
+    return errors
+
+
+def _is_acronym(word):
+    return len(word) > 1 and word.isupper()
+
+
+def _check_articles(sentence):
+    errors = []
+    for match in re.finditer(r"\b(a)\s+([aeiou]\w*)", sentence, re.IGNORECASE):
+        if not match.group(2).lower().startswith(AN_EXCEPTIONS) and not _is_acronym(match.group(2)):
+            errors.append(_error("article", match.group(0), f"an {match.group(2)}",
+                                 "Use \"an\" before a vowel sound."))
+    for match in re.finditer(r"\b(an)\s+([bcdfgjklmnpqrstvwxyz]\w*)", sentence, re.IGNORECASE):
+        if _is_acronym(match.group(2)):
+            continue  # Spelled out letter by letter: "an MBA", "a USB"
+        errors.append(_error("article", match.group(0), f"a {match.group(2)}",
+                             "Use \"a\" before a consonant sound."))
+    return errors
+
+
+def _check_verb_forms(sentence):
+    errors = []
+    for match in re.finditer(r"\b(did|didn't|does|doesn't|do|don't)\s+(\w+)\b", sentence, re.IGNORECASE):
+        verb = match.group(2).lower()
+        if verb in BASE_FORMS:
+            errors.append(_error("verb form", match.group(0), f"{match.group(1)} {BASE_FORMS[verb]}",
+                                 f"After \"{match.group(1)}\" use the base verb: \"{BASE_FORMS[verb]}\"."))
+    for match in re.finditer(r"\b(should|could|would|must)\s+of\b", sentence, re.IGNORECASE):
+        errors.append(_error("verb form", match.group(0), f"{match.group(1)} have",
+                             f"It is \"{match.group(1)} have\", not \"{match.group(1)} of\"."))
+    return errors
+
+
+def _check_word_choice(sentence):
+    errors = []
+    for match in re.finditer(rf"\bmore\s+({COMPARATIVES})\b", sentence, re.IGNORECASE):
+        errors.append(_error("comparative", match.group(0), match.group(1),
+                             f"\"{match.group(1)}\" is already a comparative - drop \"more\"."))
+    for match in re.finditer(r"\b(" + "|".join(UNCOUNTABLE) + r")\b", sentence, re.IGNORECASE):
+        singular = UNCOUNTABLE[match.group(1).lower()]
+        errors.append(_error("uncountable noun", match.group(0), singular,
+                             f"\"{singular}\" is uncountable and has no plural."))
+    for match in re.finditer(r"\b(\w+)\s+\1\b", sentence, re.IGNORECASE):
+        if match.group(1).lower() not in ("that", "had", "is"):
+            errors.append(_error("repeated word", match.group(0), match.group(1), "The word is repeated."))
+    for match in re.finditer(r"(?<![\w'])i(?![\w'])", sentence):
+        errors.append(_error("capitalization", "i", "I", "The pronoun \"I\" is always a capital letter."))
+        break
+    return errors
+
+
+LOCAL_RULES = [_check_agreement, _check_articles, _check_verb_forms, _check_word_choice]
+
+
+def _extract_json(text):
+    """First JSON object/array in model output (tolerates fences and surrounding text)"""
+    text = FENCE_PATTERN.sub("", text or "").strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"[\[{]", text):
+        try:
+            return decoder.raw_decode(text, match.start())[0]
+        except ValueError:
+            continue
+    return None
+
+
+def _clean_result(data, sentence):
+    """Normalise one result dict to the documented shape"""
+    if not isinstance(data, dict):
+        return None
+    errors = []
+    for error in data.get('errors') or []:
+        if isinstance(error, dict) and (error.get('incorrect') or error.get('correct')):
+            errors.append(_error(str(error.get('type', 'grammar')), str(error.get('incorrect', '')),
+                                 str(error.get('correct', '')), str(error.get('explanation', ''))))
+    is_correct = data.get('is_correct')
+    if not isinstance(is_correct, bool):
+        is_correct = not errors
+    return {
+        'is_correct': is_correct and not errors,
+        'errors': errors,
+        'corrected_sentence': str(data.get('corrected_sentence') or sentence),
+        'suggestion': str(data.get('suggestion') or ""),
+    }
 
-import google.generativeai as genai
 
 class GrammarChecker:
-    def __init__(self, model):
-        self.model = model
-    
-    def check(self, text):
-        prompt = f"""Analyze this sentence for grammar errors:
-        
-        Sentence: "{text}"
-        
-        Respond in JSON format:
-        {{
-            "is_correct": true/false,
-            "errors": [
-                {{
-                    "type": "verb tense/subject-verb agreement/etc",
-                    "incorrect": "the wrong part",
-                    "correct": "the correct version",
-                    "explanation": "simple explanation"
-                }}
-            ],
-            "corrected_sentence": "fully corrected sentence",
-            "suggestion": "friendly tip for improvement"
-        }}
+    """
+    Local pre-pass + batched, cached Gemini grammar check
+    """
+
+    def __init__(self, model=None, cache_size=GRAMMAR_CACHE_SIZE, batch_size=GRAMMAR_BATCH_SIZE,
+                 batch_window=GRAMMAR_BATCH_WINDOW, use_languagetool=USE_LANGUAGETOOL):
+        # Grammar feedback yields to conversation replies in the LLM gateway
+        self.model = model if model is not None else get_model(PRIORITY_BACKGROUND)
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.use_languagetool = use_languagetool
+        self.stats = {'sentences': 0, 'cache_hits': 0, 'local_pass': 0, 'llm_sentences': 0, 'llm_requests': 0}
+
+        self._cache = OrderedDict()     # normalised sentence -> result
+        self._language_tool = None
+        self._pending = []              # (text, Future) waiting for a batch
+        self._worker = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+
+    # ------------------------------------------------------------------
+    # Local pre-pass
+    # ------------------------------------------------------------------
+
+    def _languagetool_errors(self, sentence):
+        if self._language_tool is None:
+            try:
+                import language_tool_python  # Optional, runs LanguageTool locally (Java)
+                self._language_tool = language_tool_python.LanguageTool('en-US')
+            except Exception as e:
+                print(f"⚠️ LanguageTool not available, using built-in rules only: {e}")
+                self.use_languagetool = False
+                return []
+
+        errors = []
+        for match in self._language_tool.check(sentence):
+            wrong = sentence[match.offset:match.offset + match.errorLength]
+            errors.append(_error(match.ruleIssueType or "grammar", wrong,
+                                 match.replacements[0] if match.replacements else wrong, match.message))
+        return errors
+
+    def local_check(self, sentence):
         """
-        
-        response = self.model.generate_content(prompt)
-        return self._parse_response(response.text)
-    
-    def _parse_response(self, response_text):
-        try:
-            # Extract JSON from response
-            import json
-            import re
-            
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
+        Rule-based check (no network)
+
+        Returns:
+            list: Errors found (empty = sentence passes)
+        """
+        errors = [error for rule in LOCAL_RULES for error in rule(sentence)]
+        if self.use_languagetool:
+            errors += self._languagetool_errors(sentence)
+        return errors
+
+    @staticmethod
+    def _local_result(sentence, errors):
+        corrected = sentence
+        for error in errors:
+            if error['incorrect'] and error['incorrect'] in corrected:
+                corrected = corrected.replace(error['incorrect'], error['correct'], 1)
+        return {
+            'is_correct': not errors,
+            'errors': errors,
+            'corrected_sentence': corrected,
+            'suggestion': errors[0]['explanation'] if errors else "",
+        }
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _cached(self, key):
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Gemini
+    # ------------------------------------------------------------------
+
+    def _llm_check(self, sentences):
+        """One structured request for several sentences -> {index: result}"""
+        numbered = "\n".join(f'{i}. "{sentence}"' for i, sentence in enumerate(sentences))
+        prompt = f"""Analyze each numbered sentence from an English learner for grammar errors.
+
+Sentences:
+{numbered}
+
+Respond with a JSON array, one object per sentence, in this format:
+[
+  {{
+    "id": 0,
+    "is_correct": true/false,
+    "errors": [
+      {{
+        "type": "verb tense/subject-verb agreement/etc",
+        "incorrect": "the wrong part",
+        "correct": "the correct version",
+        "explanation": "simple explanation"
+      }}
+    ],
+    "corrected_sentence": "fully corrected sentence",
+    "suggestion": "friendly tip for improvement"
+  }}
+]
+"""
+        self.stats['llm_requests'] += 1
+        self.stats['llm_sentences'] += len(sentences)
+        response = self.model.generate_content(
+            prompt,
+            generation_config={
+                'temperature': 0.1,
+                'max_output_tokens': 300 * len(sentences),
+                'response_mime_type': 'application/json',
+            }
+        )
+        data = _extract_json(response.text)
+        if isinstance(data, dict):
+            data = data.get('results', [data])
+        if not isinstance(data, list):
+            return {}
+
+        results = {}
+        for position, item in enumerate(data):
+            if not isinstance(item, dict):
+                continue
+            index = item.get('id', position)
+            if isinstance(index, int) and 0 <= index < len(sentences):
+                result = _clean_result(item, sentences[index])
+                if result is not None:
+                    results[index] = result
+        return results
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def check_many(self, texts):
+        """
+        Check several utterances with at most one Gemini request per batch
+
+        Args:
+            texts: List of user utterances
+
+        Returns:
+            list: One result dict per text: {
+                'is_correct': bool,
+                'errors': [{'type', 'incorrect', 'correct', 'explanation'}],
+                'corrected_sentence': str,
+                'suggestion': str
+            }
+        """
+        split = [[s for s in SENTENCE_SPLIT.split(normalize_sentence(text)) if s] for text in texts]
+
+        results = {}        # sentence -> result
+        flagged = {}        # sentence -> local errors (need Gemini; may be empty)
+        for sentence in {s for sentences in split for s in sentences}:
+            self.stats['sentences'] += 1
+            cached = self._cached(sentence)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                results[sentence] = cached
+                continue
+
+            errors = self.local_check(sentence)
+            if not errors and self.use_languagetool:
+                # LanguageTool ran and found nothing: trusted without Gemini
+                self.stats['local_pass'] += 1
+                results[sentence] = self._local_result(sentence, [])
+                self._remember(sentence, results[sentence])
             else:
-                return {"is_correct": True, "errors": []}
-        except:
-            return {"is_correct": True, "errors": []}
\ No newline at end of file
+                flagged[sentence] = errors
+
+        pending = list(flagged)
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            llm_results = {}
+            if self.model:
+                try:
+                    llm_results = self._llm_check(batch)
+                except Exception as e:
+                    print(f"⚠️ Grammar check via Gemini failed, using local rules: {e}")
+
+            for index, sentence in enumerate(batch):
+                result = llm_results.get(index)
+                if result is None:
+                    result = self._local_result(sentence, flagged[sentence])
+                else:
+                    self._remember(sentence, result)  # Local-only fallbacks are retried next time
+                results[sentence] = result
+
+        return [self._merge([results[s] for s in sentences], " ".join(sentences)) for sentences in split]
+
+    @staticmethod
+    def _merge(sentence_results, text):
+        if not sentence_results:
+            return {'is_correct': True, 'errors': [], 'corrected_sentence': text, 'suggestion': ""}
+        return {
+            'is_correct': all(r['is_correct'] for r in sentence_results),
+            'errors': [error for r in sentence_results for error in r['errors']],
+            'corrected_sentence': " ".join(r['corrected_sentence'] for r in sentence_results),
+            'suggestion': next((r['suggestion'] for r in sentence_results if r['suggestion']), ""),
+        }
+
+    def check(self, text):
+        """Check one utterance (see check_many)"""
+        return self.check_many([text])[0]
+
+    def submit(self, text):
+        """
+        Queue an utterance; utterances arriving within the batch window are
+        checked together
+
+        Returns:
+            concurrent.futures.Future: Resolves to the result dict
+        """
+        future = Future()
+        with self._wakeup:
+            self._pending.append((text, future))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True, name="grammar-batch")
+                self._worker.start()
+            self._wakeup.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if not self._pending:
+                    self._worker = None  # Under the lock: the next submit() starts a new worker
+                    return
+                deadline = time.time() + self.batch_window
+                while len(self._pending) < self.batch_size and time.time() < deadline:
+                    self._wakeup.wait(deadline - time.time())
+                batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+
+            try:
+                results = self.check_many([text for text, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
@@ -1,41 +1,271 @@
 # pronunciation_checker.py
+"""
+Pronunciation scoring by phoneme alignment
+
+Words are phonemized with espeak (phonemizer) - all uncached words of a
+batch in one call - and kept in a bounded LRU. The heard and reference
+phoneme sequences are aligned with a weighted edit distance (NumPy DP:
+similar phonemes such as p/b or i/ɪ cost less), which also tells which
+reference words were mispronounced.
+"""
+
+import re
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+PHONEME_CACHE_SIZE = 4096       # Words
+WORD_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)*")   # A lone "'" is not a word
+STRIP_MARKS = "ˈˌː"             # Stress and length marks (compared separately)
+
+INSERT_COST = 1.0
+DELETE_COST = 1.0
+SIMILAR_COST = 0.5              # Same class / voicing pair
+LENGTH_STRESS_COST = 0.2        # Same phoneme, only stress or length differs
+
+VOWELS = set("aeiouæɑɒɔəɛɜɪʊʌɐɚɝʏøœɘɵɤɯy")
+# Pairs that learners commonly swap (voicing, place)
+SIMILAR_PAIRS = [
+    ("p", "b"), ("t", "d"), ("k", "ɡ"), ("k", "g"), ("f", "v"), ("s", "z"), ("θ", "ð"), ("ʃ", "ʒ"),
+    ("tʃ", "dʒ"), ("θ", "t"), ("ð", "d"), ("θ", "s"), ("ð", "z"), ("v", "w"), ("l", "ɹ"), ("r", "ɹ"),
+    ("n", "ŋ"), ("s", "ʃ"), ("ɾ", "t"), ("ɾ", "d"),
+]
+
+
+def _base(phone):
+    return "".join(ch for ch in phone if ch not in STRIP_MARKS)
+
+
+def _is_vowel(phone):
+    base = _base(phone)
+    return bool(base) and all(ch in VOWELS for ch in base)
 
-from phonemizer import phonemize
-from difflib import SequenceMatcher
 
 class PronunciationChecker:
-    def __init__(self):
-        self.phoneme_cache = {}
-    
-    def check(self, user_text, reference_text):
-        # Convert to lowercase for comparison
-        user_text = user_text.lower()
-        reference_text = reference_text.lower()
-        
-        # Get phonemes
-        user_phonemes = self._get_phonemes(user_text)
-        reference_phonemes = self._get_phonemes(reference_text)
-        
-        # Calculate similarity
-        similarity = SequenceMatcher(None, user_phonemes, reference_phonemes).ratio()
-        score = int(similarity * 100)
-        
+    def __init__(self, cache_size=PHONEME_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.phoneme_cache = OrderedDict()   # word -> tuple of phonemes (LRU)
+        self.phonemize_calls = 0
+        self._phone_ids = {}                 # phoneme -> row in self._costs
+        self._costs = np.zeros((0, 0))
+
+    # ------------------------------------------------------------------
+    # Phonemes
+    # ------------------------------------------------------------------
+
+    def _cached(self, word):
+        phones = self.phoneme_cache.get(word)
+        if phones is not None:
+            self.phoneme_cache.move_to_end(word)
+        return phones
+
+    def _remember(self, word, phones):
+        self.phoneme_cache[word] = phones
+        self.phoneme_cache.move_to_end(word)
+        while len(self.phoneme_cache) > self.cache_size:
+            self.phoneme_cache.popitem(last=False)
+
+    def phonemize_words(self, words):
+        """
+        Phonemes of each word; all uncached words go to espeak in one run
+
+        Returns:
+            dict: word -> tuple of phonemes
+        """
+        result = {}
+        for word in words:
+            phones = self._cached(word)
+            if phones is not None:
+                result[word] = phones
+
+        missing = sorted({w for w in words if w not in result})
+        if missing:
+            from phonemizer import phonemize  # Imported on first check (starts espeak)
+            from phonemizer.separator import Separator
+
+            self.phonemize_calls += 1
+            # One word per line: no word separator (phonemizer rejects it equal
+            # to the phone separator), and empty lines are kept so the output
+            # stays aligned with `missing`
+            output = phonemize(
+                missing, language='en-us', backend='espeak',
+                separator=Separator(phone=' ', word='', syllable=''), strip=True,
+                preserve_empty_lines=True
+            )
+            if len(output) != len(missing):
+                raise RuntimeError(f"phonemize returned {len(output)} lines for {len(missing)} words")
+            for word, phones in zip(missing, output):
+                result[word] = tuple(phones.split())
+                self._remember(word, result[word])
+        return result
+
+    def _get_phonemes(self, text):
+        """Phoneme string of a text (kept for callers of the old API)"""
+        words = WORD_PATTERN.findall(text.lower())
+        phonemes = self.phonemize_words(words)
+        return " ".join(" ".join(phonemes[w]) for w in words)
+
+    # ------------------------------------------------------------------
+    # Alignment
+    # ------------------------------------------------------------------
+
+    def _ids(self, phones):
+        """Phoneme ids; grows the substitution cost table for new phonemes"""
+        new = [p for p in dict.fromkeys(phones) if p not in self._phone_ids]
+        if new:
+            for phone in new:
+                self._phone_ids[phone] = len(self._phone_ids)
+            inventory = sorted(self._phone_ids, key=self._phone_ids.get)
+            size = len(inventory)
+            similar = {frozenset(pair) for pair in SIMILAR_PAIRS}
+
+            costs = np.ones((size, size))
+            for i, a in enumerate(inventory):
+                for j, b in enumerate(inventory):
+                    if a == b:
+                        costs[i, j] = 0.0
+                    elif _base(a) == _base(b):
+                        costs[i, j] = LENGTH_STRESS_COST
+                    elif frozenset((_base(a), _base(b))) in similar or (_is_vowel(a) and _is_vowel(b)):
+                        costs[i, j] = SIMILAR_COST
+            self._costs = costs
+        return np.array([self._phone_ids[p] for p in phones], dtype=np.int64)
+
+    def align(self, reference, heard):
+        """
+        Weighted edit distance between two phoneme sequences
+
+        Rows are filled with NumPy: deletions and substitutions in one vector
+        step, insertions with a running minimum along the row.
+
+        Returns:
+            tuple: (distance, operations [(op, ref_index, heard_index)])
+                op is 'match', 'sub', 'del' (reference phoneme missing) or
+                'ins' (extra phoneme heard)
+        """
+        n, m = len(reference), len(heard)
+        ref_ids, heard_ids = self._ids(reference), self._ids(heard)
+        sub = self._costs[np.ix_(ref_ids, heard_ids)] if n and m else np.zeros((n, m))
+
+        dist = np.zeros((n + 1, m + 1))
+        dist[0] = np.arange(m + 1) * INSERT_COST
+        offsets = np.arange(m + 1) * INSERT_COST
+        for i in range(1, n + 1):
+            row = np.empty(m + 1)
+            row[0] = dist[i - 1, 0] + DELETE_COST
+            row[1:] = np.minimum(dist[i - 1, 1:] + DELETE_COST, dist[i - 1, :-1] + sub[i - 1])
+            # row[j] = min over k <= j of row[k] + (j - k) * INSERT_COST
+            dist[i] = np.minimum.accumulate(row - offsets) + offsets
+
+        # Trace back from the end; on ties take gaps first, so a missing or
+        # extra word is reported at the end instead of smeared over its neighbours
+        operations = []
+        i, j = n, m
+        while i > 0 or j > 0:
+            if i > 0 and np.isclose(dist[i, j], dist[i - 1, j] + DELETE_COST):
+                operations.append(('del', i - 1, None))
+                i -= 1
+            elif j > 0 and np.isclose(dist[i, j], dist[i, j - 1] + INSERT_COST):
+                operations.append(('ins', i, j - 1))
+                j -= 1
+            else:
+                operations.append(('match' if sub[i - 1, j - 1] == 0 else 'sub', i - 1, j - 1))
+                i, j = i - 1, j - 1
+        operations.reverse()
+        return float(dist[n, m]), operations
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _score(self, user_text, reference_text, phonemes):
+        ref_words = WORD_PATTERN.findall(reference_text.lower())
+        user_words = WORD_PATTERN.findall(user_text.lower())
+
+        reference, ref_word_of = [], []
+        for index, word in enumerate(ref_words):
+            reference += phonemes[word]
+            ref_word_of += [index] * len(phonemes[word])
+        heard, heard_word_of = [], []
+        for index, word in enumerate(user_words):
+            heard += phonemes[word]
+            heard_word_of += [index] * len(phonemes[word])
+
+        distance, operations = self.align(reference, heard)
+        score = int(round(100 * max(0.0, 1.0 - distance / max(len(reference), 1))))
+
+        # A heard word made only of insertions is an extra word: it lowers the
+        # overall score but is not a mispronunciation of its neighbour
+        inserted = Counter(heard_word_of[j] for op, _, j in operations if op == 'ins')
+        extra = {index for index, count in inserted.items() if count == len(phonemes[user_words[index]])}
+
+        # Per-word errors: substitutions/deletions belong to their reference
+        # word, other insertions to the word they follow
+        per_word = {}
+        for op, ref_index, heard_index in operations:
+            if op == 'match':
+                continue
+            if op == 'ins':
+                if not ref_word_of or heard_word_of[heard_index] in extra:
+                    continue
+                word = ref_word_of[min(max(ref_index - 1, 0), len(ref_word_of) - 1)]
+            else:
+                word = ref_word_of[ref_index]
+            entry = per_word.setdefault(word, {'expected': [], 'heard': [], 'cost': 0.0})
+            if op in ('sub', 'del'):
+                entry['expected'].append(reference[ref_index])
+            if op in ('sub', 'ins'):
+                entry['heard'].append(heard[heard_index])
+            entry['cost'] += (
+                self._costs[self._phone_ids[reference[ref_index]], self._phone_ids[heard[heard_index]]]
+                if op == 'sub' else (DELETE_COST if op == 'del' else INSERT_COST)
+            )
+
+        word_errors = []
+        for index, entry in sorted(per_word.items()):
+            word_phones = phonemes[ref_words[index]]
+            word_score = int(round(100 * max(0.0, 1.0 - entry['cost'] / max(len(word_phones), 1))))
+            word_errors.append({
+                'word': ref_words[index],
+                'index': index,
+                'expected': " ".join(entry['expected']),
+                'heard': " ".join(entry['heard']),
+                'score': word_score,
+            })
+
         return {
             'score': score,
-            'user_phonemes': user_phonemes,
-            'reference_phonemes': reference_phonemes,
+            'user_phonemes': " ".join(heard),
+            'reference_phonemes': " ".join(reference),
+            'distance': distance,
+            'word_errors': word_errors,
+            'extra_words': [user_words[index] for index in sorted(extra)],
             'feedback': self._get_feedback(score),
             'pronunciation_grade': self._get_grade(score)
         }
-    
-    def _get_phonemes(self, text):
-        if text in self.phoneme_cache:
-            return self.phoneme_cache[text]
-        
-        phonemes = phonemize(text, language='en-us', backend='espeak')
-        self.phoneme_cache[text] = phonemes
-        return phonemes
-    
+
+    def check_batch(self, pairs):
+        """
+        Score many (user_text, reference_text) pairs with one espeak run
+
+        Returns:
+            list: check() result per pair
+        """
+        words = [w for user, ref in pairs for w in WORD_PATTERN.findall(f"{user} {ref}".lower())]
+        phonemes = self.phonemize_words(words)
+        return [self._score(user, ref, phonemes) for user, ref in pairs]
+
+    def check(self, user_text, reference_text):
+        """
+        Score one utterance against its reference text
+
+        Returns:
+            dict: score, grade, feedback, phoneme strings, 'word_errors'
+                [{'word', 'index', 'expected', 'heard', 'score'}] and
+                'extra_words' (said but not in the reference)
+        """
+        return self.check_batch([(user_text, reference_text)])[0]
+
     def _get_feedback(self, score):
         if score >= 95:
             return "Perfect pronunciation! 🌟"
@@ -47,7 +277,7 @@ class PronunciationChecker:
             return "Keep practicing. Listen again. 🔄"
         else:
             return "Let's work on this together. 💪"
-    
+
     def _get_grade(self, score):
         if score >= 90:
             return "A"
@@ -58,4 +288,4 @@ class PronunciationChecker:
         elif score >= 60:
             return "D"
         else:
-            return "F"
\ No newline at end of file
+            return "F"
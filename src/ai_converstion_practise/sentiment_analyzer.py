@@ -1,27 +1,288 @@
 # sentiment_analyzer.py
+"""
+Sentiment scoring and tracking
+
+- Scoring works on batches: the default lexicon backend tokenises all
+  texts at once and scores them with NumPy (negation and intensifiers
+  included), so a whole meeting is one pass. TextBlob is optional
+  (MEETINGAI_SENTIMENT_BACKEND=textblob).
+- Every speaker has an exponentially weighted trend, updated in O(1)
+  per message (a batch is filtered in one lfilter call).
+- Only the last messages are kept in sentiment_history.
+"""
+
+import os
+import re
+from collections import deque
+
+import numpy as np
+
+SENTIMENT_BACKEND = os.getenv("MEETINGAI_SENTIMENT_BACKEND", "lexicon")   # lexicon / textblob
+LEXICON_FILE = os.getenv("MEETINGAI_SENTIMENT_LEXICON", "")   # Optional "word<TAB>score" file (e.g. VADER's)
+HISTORY_SIZE = 100              # Messages kept in sentiment_history
+TREND_SPAN = 5                  # EWMA span in messages (alpha = 2 / (span + 1))
+TREND_THRESHOLD = 0.2
+DEFAULT_SPEAKER = "user"
+
+TOKEN_PATTERN = re.compile(r"[a-z']+")
+NORMALIZE_ALPHA = 15.0          # polarity = sum / sqrt(sum^2 + alpha), as in VADER
+NEGATION_SCALE = -0.7           # Sentiment of the next words after "not", "never", ...
+NEGATION_WINDOW = 3
+INTENSIFIER_SCALE = 1.5
+
+NEGATORS = frozenset("not no never nothing nobody none neither nor without cannot".split())
+INTENSIFIERS = frozenset("very really so extremely totally absolutely quite super too incredibly".split())
+
+# Valence on a -4..4 scale (VADER convention)
+LEXICON = {
+    # Positive
+    'good': 1.9, 'great': 3.1, 'excellent': 3.2, 'amazing': 2.8, 'awesome': 3.1, 'wonderful': 2.7,
+    'fantastic': 2.6, 'perfect': 2.7, 'nice': 1.8, 'fine': 0.8, 'ok': 0.9, 'okay': 0.9, 'cool': 1.3,
+    'love': 3.2, 'loved': 2.9, 'like': 1.5, 'liked': 1.8, 'enjoy': 2.2, 'enjoyed': 2.3, 'fun': 2.3,
+    'happy': 2.7, 'glad': 2.0, 'pleased': 1.9, 'excited': 1.9, 'interesting': 1.7, 'beautiful': 2.9,
+    'best': 3.2, 'better': 1.9, 'easy': 1.9, 'helpful': 1.8, 'useful': 1.9, 'clear': 1.6,
+    'thanks': 1.9, 'thank': 1.5, 'agree': 1.5, 'agreed': 1.1, 'success': 2.7, 'successful': 2.8,
+    'win': 2.8, 'progress': 1.8, 'improve': 1.9, 'improved': 2.1, 'hope': 1.9, 'welcome': 2.0,
+    'yes': 1.7, 'sure': 1.3, 'right': 0.6, 'correct': 1.3, 'well': 1.1, 'proud': 2.1, 'relaxed': 2.2,
+    'confident': 2.2, 'impressive': 2.3, 'brilliant': 2.8, 'delighted': 2.9, 'lucky': 2.2,
+    # Negative
+    'bad': -2.5, 'terrible': -2.1, 'awful': -2.0, 'horrible': -2.5, 'worst': -3.1, 'worse': -2.1,
+    'hate': -2.7, 'hated': -3.2, 'dislike': -1.6, 'sad': -2.1, 'unhappy': -1.8, 'angry': -2.3,
+    'upset': -1.6, 'annoyed': -1.6, 'annoying': -1.7, 'boring': -1.3, 'bored': -1.1, 'tired': -1.9,
+    'difficult': -1.5, 'hard': -0.4, 'problem': -1.7, 'problems': -1.7, 'issue': -0.6, 'issues': -0.8,
+    'wrong': -2.1, 'fail': -2.5, 'failed': -2.3, 'failure': -2.3, 'broken': -1.7, 'bug': -0.9,
+    'bugs': -0.9, 'delay': -1.3, 'delayed': -0.9, 'late': -0.5, 'worried': -1.2, 'worry': -1.9,
+    'afraid': -2.2, 'scared': -2.2, 'stress': -1.8, 'stressed': -1.4, 'confused': -1.3,
+    'confusing': -0.9, 'sorry': -0.3, 'unfortunately': -1.5, 'disappointed': -1.9, 'frustrated': -2.4,
+    'frustrating': -1.9, 'lost': -1.3, 'sick': -2.3, 'pain': -2.3, 'expensive': -1.1, 'slow': -0.7,
+    'risk': -1.1, 'concern': -1.0, 'concerned': -1.2, 'disagree': -1.6,
+    'lonely': -1.8, 'miss': -0.6, 'missed': -1.2, 'ugly': -2.3, 'stupid': -2.4, 'useless': -1.8,
+}
+
+
+def load_lexicon(path):
+    """Extra lexicon entries from a 'word<TAB>score' file (extra columns ignored)"""
+    entries = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) >= 2:
+                try:
+                    entries[parts[0].lower()] = float(parts[1])
+                except ValueError:
+                    continue
+    return entries
+
+
+def _lexicon_scores(texts, lexicon):
+    """
+    Vectorised lexicon scoring of many texts
+
+    Returns:
+        tuple: (polarity array in [-1, 1], subjectivity array in [0, 1])
+    """
+    tokenized = [TOKEN_PATTERN.findall(text.lower()) for text in texts]
+    counts = np.array([len(tokens) for tokens in tokenized], dtype=np.int64)
+    if not counts.sum():
+        return np.zeros(len(texts)), np.zeros(len(texts))
+
+    tokens = np.array([token for tokens in tokenized for token in tokens])
+    doc = np.repeat(np.arange(len(texts)), counts)
+
+    # Dictionary lookups only for distinct tokens
+    unique, inverse = np.unique(tokens, return_inverse=True)
+    valence = np.array([lexicon.get(t, 0.0) for t in unique])[inverse]
+    negator = np.array([t in NEGATORS or t.endswith("n't") for t in unique])[inverse]
+    intensifier = np.array([t in INTENSIFIERS for t in unique])[inverse]
+
+    negated = np.zeros(len(tokens), dtype=bool)
+    for k in range(1, NEGATION_WINDOW + 1):
+        negated[k:] |= negator[:-k] & (doc[k:] == doc[:-k])
+    boosted = np.zeros(len(tokens), dtype=bool)
+    boosted[1:] = intensifier[:-1] & (doc[1:] == doc[:-1])
+
+    # Negators are handled through the words they modify
+    valence = np.where(negator, 0.0, valence)
+    valence = valence * np.where(boosted, INTENSIFIER_SCALE, 1.0) * np.where(negated, NEGATION_SCALE, 1.0)
+
+    totals = np.bincount(doc, weights=valence, minlength=len(texts))
+    hits = np.bincount(doc, weights=(valence != 0).astype(float), minlength=len(texts))
+    polarity = totals / np.sqrt(totals * totals + NORMALIZE_ALPHA)
+    subjectivity = np.divide(hits, counts, out=np.zeros(len(texts)), where=counts > 0)
+    return polarity, subjectivity
+
+
+def _textblob_scores(texts, lexicon=None):
+    from textblob import TextBlob  # Optional backend (slower, one parse per text)
+
+    sentiments = [TextBlob(text).sentiment for text in texts]
+    return (np.array([s.polarity for s in sentiments], dtype=float),
+            np.array([s.subjectivity for s in sentiments], dtype=float))
+
+
+BACKENDS = {
+    'lexicon': _lexicon_scores,
+    'textblob': _textblob_scores,
+}
+
+
+class SentimentTrack:
+    """Exponentially weighted sentiment of one speaker (O(1) per message)"""
+
+    def __init__(self, span=TREND_SPAN):
+        self.alpha = 2.0 / (span + 1)
+        self.ewma = 0.0
+        self.count = 0
+        self.last = None
+
+    def update(self, polarity):
+        self.ewma = polarity if self.count == 0 else self.ewma + self.alpha * (polarity - self.ewma)
+        self.count += 1
+        self.last = polarity
+
+    def update_many(self, polarities):
+        """Same as update() per value, in one filter call"""
+        polarities = np.asarray(polarities, dtype=float)
+        if not len(polarities):
+            return
+        from scipy.signal import lfilter
+
+        previous = polarities[0] if self.count == 0 else self.ewma
+        # y[n] = alpha * x[n] + (1 - alpha) * y[n-1], starting from the previous average
+        smoothed, _ = lfilter([self.alpha], [1.0, self.alpha - 1.0], polarities,
+                              zi=[(1.0 - self.alpha) * previous])
+        self.ewma = float(smoothed[-1])
+        self.count += len(polarities)
+        self.last = float(polarities[-1])
+
+    @property
+    def trend(self):
+        if self.count < 2:
+            return "stable"
+        if self.ewma > TREND_THRESHOLD:
+            return "improving"
+        elif self.ewma < -TREND_THRESHOLD:
+            return "declining"
+        return "stable"
 
-from textblob import TextBlob
 
 class SentimentAnalyzer:
-    def __init__(self):
-        self.sentiment_history = []
-    
-    def analyze(self, text):
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
-        
-        sentiment = {
+    def __init__(self, backend=SENTIMENT_BACKEND, history_size=HISTORY_SIZE, span=TREND_SPAN):
+        """
+        Args:
+            backend: 'lexicon' (default, fast) or 'textblob'
+            history_size: Messages kept in sentiment_history
+            span: EWMA span of the per-speaker trends
+        """
+        if backend == 'textblob':
+            import importlib.util
+            if importlib.util.find_spec("textblob") is None:
+                print("⚠️ textblob not installed - using the built-in sentiment lexicon")
+                backend = 'lexicon'
+        self.backend = backend if backend in BACKENDS else 'lexicon'
+        self.span = span
+        self.lexicon = dict(LEXICON)
+        if LEXICON_FILE and os.path.exists(LEXICON_FILE):
+            self.lexicon.update(load_lexicon(LEXICON_FILE))
+
+        self.sentiment_history = deque(maxlen=history_size)
+        self.tracks = {}                # speaker -> SentimentTrack
+
+    def score_texts(self, texts):
+        """
+        Polarity and subjectivity of many texts in one pass (no tracking)
+
+        Returns:
+            tuple: (polarity array, subjectivity array)
+        """
+        return BACKENDS[self.backend](list(texts), self.lexicon)
+
+    def _result(self, polarity, subjectivity, speaker):
+        polarity = float(polarity)
+        return {
             'polarity': polarity,
-            'subjectivity': subjectivity,
+            'subjectivity': float(subjectivity),
             'label': self._get_label(polarity),
             'emoji': self._get_emoji(polarity),
-            'confidence': abs(polarity)
+            'confidence': abs(polarity),
+            'speaker': speaker,
         }
-        
+
+    def _track(self, speaker):
+        track = self.tracks.get(speaker)
+        if track is None:
+            track = self.tracks[speaker] = SentimentTrack(self.span)
+        return track
+
+    def analyze_many(self, texts, speakers=None):
+        """
+        Score and track many messages at once
+
+        Args:
+            texts: List of texts
+            speakers: Speaker per text (None = DEFAULT_SPEAKER for all)
+
+        Returns:
+            list: Sentiment dict per text
+        """
+        texts = list(texts)
+        speakers = list(speakers) if speakers is not None else [DEFAULT_SPEAKER] * len(texts)
+        polarity, subjectivity = self.score_texts(texts)
+
+        results = [self._result(p, s, speaker) for p, s, speaker in zip(polarity, subjectivity, speakers)]
+        self.sentiment_history.extend(results)
+
+        # One filter call per speaker, in message order
+        order = {}
+        for index, speaker in enumerate(speakers):
+            order.setdefault(speaker, []).append(index)
+        for speaker, indices in order.items():
+            self._track(speaker).update_many(polarity[indices])
+        return results
+
+    def analyze(self, text, speaker=DEFAULT_SPEAKER):
+        polarity, subjectivity = self.score_texts([text])
+        sentiment = self._result(polarity[0], subjectivity[0], speaker)
         self.sentiment_history.append(sentiment)
+        self._track(speaker).update(sentiment['polarity'])
         return sentiment
-    
+
+    def annotate_transcripts(self, segments):
+        """
+        Sentiment of every meeting segment ({'speaker', 'text', ...}) in one pass
+
+        Returns:
+            list: Sentiment dict per segment (segments are not modified)
+        """
+        return self.analyze_many(
+            [segment.get('text') or "" for segment in segments],
+            [segment.get('speaker') or "Unknown" for segment in segments]
+        )
+
+    def get_trend(self, speaker=DEFAULT_SPEAKER):
+        """Sentiment trend (EWMA over the last ~TREND_SPAN messages)"""
+        track = self.tracks.get(speaker)
+        return track.trend if track is not None else "stable"
+
+    def speaker_summary(self):
+        """
+        Returns:
+            dict: speaker -> {'average', 'trend', 'messages', 'emoji'}
+        """
+        return {
+            speaker: {
+                'average': track.ewma,
+                'trend': track.trend,
+                'messages': track.count,
+                'emoji': self._get_emoji(track.ewma),
+            }
+            for speaker, track in self.tracks.items()
+        }
+
+    def reset(self):
+        self.sentiment_history.clear()
+        self.tracks.clear()
+
     def _get_label(self, polarity):
         if polarity > 0.3:
             return "positive"
@@ -29,7 +290,7 @@ class SentimentAnalyzer:
             return "negative"
         else:
             return "neutral"
-    
+
     def _get_emoji(self, polarity):
         if polarity > 0.5:
             return "😄"
@@ -41,18 +302,3 @@ class SentimentAnalyzer:
             return "😕"
         else:
             return "😔"
-    
-    def get_trend(self):
-        """Get sentiment trend over last 5 messages"""
-        if len(self.sentiment_history) < 2:
-            return "stable"
-        
-        recent = self.sentiment_history[-5:]
-        avg = sum(s['polarity'] for s in recent) / len(recent)
-        
-        if avg > 0.2:
-            return "improving"
-        elif avg < -0.2:
-            return "declining"
-        else:
-            return "stable"
\ No newline at end of file
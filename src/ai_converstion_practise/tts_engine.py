@@ -0,0 +1,613 @@
+# tts_engine.py - In-memory text-to-speech for the conversation partner
+"""
+Text-to-speech without temp files
+
+Speech is synthesised into an in-memory buffer, decoded once into float32
+PCM and played through one persistent output stream, so there is no
+file write/stat/load and no fixed sleeps between replies.
+
+Streaming replies are cut into sentences (SentenceSplitter); each sentence
+is synthesised as soon as it is complete and queued on the output
+(SpeechQueue), so speech starts after the first sentence, not the reply.
+
+Backends (MEETINGAI_TTS_BACKEND = auto | gtts | espeak):
+- gtts:   Google TTS (network, MP3)
+- espeak: espeak-ng / espeak on this machine (offline, WAV)
+With "auto" gTTS is tried first and espeak is used when it fails (offline).
+
+Synthesised audio is cached by (text, language, voice): decoded PCM in a
+memory LRU, encoded audio on disk up to a size cap, least recently used
+files removed first (TTSCache). Fixed phrases are pre-warmed
+at session start, so they play instantly and work without any backend.
+"""
+
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+TTS_BACKEND = os.getenv("MEETINGAI_TTS_BACKEND", "auto")
+OUTPUT_RATE = 24000        # Hz, output stream rate (gTTS native rate)
+OUTPUT_BLOCKSIZE = 1024    # Frames per output callback
+ESPEAK_WPM = 160           # Speaking rate of the offline voice
+TTS_CACHE_DIR = os.path.join(
+    os.getenv("MEETINGAI_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "meetingai")), "tts"
+)
+TTS_CACHE_MEMORY_MB = int(os.getenv("MEETINGAI_TTS_CACHE_MB", "64"))   # Decoded audio kept in memory
+TTS_CACHE_DISK_MB = int(os.getenv("MEETINGAI_TTS_CACHE_DISK_MB", "200"))  # Encoded audio kept on disk
+LEVEL_DECAY = 0.8          # Per block; output level seen by echo gating
+MIN_SENTENCE_CHARS = 12    # Shorter sentences ("Oh.", "Yes!") are joined to the next one
+
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*(?=\s)|\n+")
+ABBREVIATIONS = frozenset("mr mrs ms dr prof st vs etc e.g i.e a.m p.m".split())
+
+
+class TTSError(RuntimeError):
+    """No backend could synthesise the text"""
+
+
+class GTTSBackend:
+    """Google TTS, written straight into a BytesIO"""
+
+    name = "gtts"
+    voice = "gtts"
+
+    def available(self):
+        return importlib.util.find_spec("gtts") is not None
+
+    def synthesize(self, text, lang="en"):
+        """
+        Returns:
+            tuple: (encoded audio bytes, format)
+        """
+        from gtts import gTTS  # Imported on first reply (keeps app startup fast)
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+        return buffer.getvalue(), "mp3"
+
+
+class EspeakBackend:
+    """Offline espeak-ng / espeak, WAV read from stdout"""
+
+    name = "espeak"
+
+    def __init__(self, wpm=ESPEAK_WPM):
+        self.wpm = wpm
+        self.executable = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    @property
+    def voice(self):
+        return f"espeak:{self.wpm}"
+
+    def available(self):
+        return self.executable is not None
+
+    def synthesize(self, text, lang="en"):
+        result = subprocess.run(
+            [self.executable, "-v", lang, "-s", str(self.wpm), "--stdout", text],
+            capture_output=True, timeout=30, check=True
+        )
+        return result.stdout, "wav"
+
+
+BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+}
+
+
+def _decode_wav(data):
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        rate = wav.getframerate()
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise TTSError(f"Unsupported WAV sample width: {width}")
+    return samples.reshape(-1, channels).mean(axis=1), rate
+
+
+def _decode_compressed(data, fmt):
+    from pydub import AudioSegment  # Decodes via ffmpeg (pipes, no temp file)
+
+    segment = AudioSegment.from_file(io.BytesIO(data), format=fmt)
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    samples /= float(1 << (8 * segment.sample_width - 1))
+    return samples.reshape(-1, segment.channels).mean(axis=1), segment.frame_rate
+
+
+def decode_audio(data, fmt, samplerate=OUTPUT_RATE):
+    """
+    Decode encoded audio once into mono float32 PCM
+
+    Args:
+        data: Encoded bytes (WAV / MP3)
+        fmt: "wav" or "mp3"
+        samplerate: Rate to resample to
+
+    Returns:
+        np.ndarray: float32 samples in [-1, 1] at `samplerate`
+    """
+    if fmt == "wav":
+        samples, rate = _decode_wav(data)
+    else:
+        samples, rate = _decode_compressed(data, fmt)
+
+    if rate != samplerate and len(samples):
+        from math import gcd
+        from scipy.signal import resample_poly
+
+        divisor = gcd(rate, samplerate)
+        samples = resample_poly(samples, samplerate // divisor, rate // divisor)
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+class TTSCache:
+    """
+    Content-addressed TTS cache: (text, lang, voice) -> audio
+
+    Decoded samples live in a memory LRU bounded by size; the encoded audio
+    is stored as one file per key on disk and decoded again on first use.
+    The disk store is capped too: when it grows past max_disk_bytes the
+    files used least recently (mtime, refreshed on every load) are removed.
+    get_or_synthesize() coalesces concurrent requests for the same phrase.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MEMORY_MB * 1024 * 1024,
+                 max_disk_bytes=TTS_CACHE_DISK_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._disk_bytes = None        # Size of the disk store, scanned on first write
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()   # key -> samples
+        self._memory_bytes = 0
+        self._inflight = {}            # key -> Future
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text, lang, voice):
+        data = json.dumps([" ".join(text.split()), lang, voice], ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _remember(self, key, samples):
+        """Add to the memory LRU (caller holds the lock)"""
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key).nbytes
+        self._memory[key] = samples
+        self._memory_bytes += samples.nbytes
+        while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def _load(self, key, samplerate):
+        """Encoded audio from disk -> samples (None if not cached)"""
+        for fmt in ("mp3", "wav"):
+            path = os.path.join(self.directory, f"{key}.{fmt}")
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)  # Recently used: evicted last
+            except OSError:
+                continue
+            try:
+                return decode_audio(data, fmt, samplerate)
+            except Exception as e:
+                print(f"⚠️ Corrupt TTS cache entry {os.path.basename(path)}: {e}")
+        return None
+
+    def get(self, key, samplerate=OUTPUT_RATE):
+        """Cached samples for `key` (memory, then disk) or None"""
+        with self._lock:
+            samples = self._memory.get(key)
+            if samples is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return samples
+
+        samples = self._load(key, samplerate)
+        if samples is not None:
+            with self._lock:
+                self._remember(key, samples)
+                self.hits += 1
+        return samples
+
+    def put(self, key, samples, data=None, fmt=None):
+        """Store decoded samples (and the encoded audio on disk)"""
+        with self._lock:
+            self._remember(key, samples)
+        if data is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{key}.{fmt}")
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write TTS cache: {e}")
+            return
+        self._prune_disk(len(data))
+
+    def _disk_entries(self):
+        """[(mtime, size, path)] of the cached audio files"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith((".mp3", ".wav")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _prune_disk(self, written):
+        """Remove least recently used files once the disk store is over its cap"""
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+            else:
+                self._disk_bytes += written
+            if self._disk_bytes <= self.max_disk_bytes:
+                return
+
+            entries = sorted(self._disk_entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries[:-1]:  # Never the file just written
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            self._disk_bytes = total
+
+    def get_or_synthesize(self, key, synthesize, samplerate=OUTPUT_RATE):
+        """
+        Cached samples for `key`, or synthesize() -> (encoded bytes, format)
+
+        Returns:
+            np.ndarray: float32 samples at `samplerate`
+        """
+        samples = self.get(key, samplerate)
+        if samples is not None:
+            return samples
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+
+        if not owner:
+            return future.result()  # Same phrase is being synthesised right now
+
+        try:
+            data, fmt = synthesize()
+            samples = decode_audio(data, fmt, samplerate)
+            self.put(key, samples, data, fmt)
+            future.set_result(samples)
+            return samples
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class SentenceSplitter:
+    """
+    Cuts streamed text into complete sentences
+
+    update() takes the text received so far and returns the sentences that
+    were completed since the last call; flush() returns the rest.
+    """
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._consumed = 0    # Characters already returned
+
+    def update(self, text):
+        sentences = []
+        start = self._consumed
+        for match in SENTENCE_END.finditer(text, self._consumed):
+            end = match.end()
+            candidate = text[start:end].strip()
+            last_word = candidate.rsplit(None, 1)[-1].rstrip(".").lower() if candidate else ""
+            if last_word in ABBREVIATIONS or len(candidate) < self.min_chars:
+                continue  # "Dr. Smith", or too short to be worth a TTS request
+            sentences.append(self._clean(candidate))
+            start = end
+        self._consumed = start
+        return [sentence for sentence in sentences if sentence]
+
+    def flush(self, text):
+        """Everything after the last returned sentence"""
+        rest = self._clean(text[self._consumed:])
+        self._consumed = len(text)
+        return [rest] if rest else []
+
+    @staticmethod
+    def _clean(sentence):
+        return sentence.strip().strip('"').strip("'").strip()
+
+
+class AudioOutput:
+    """
+    One persistent output stream; queued clips are copied into it from the callback
+
+    The stream is opened on first playback and then stays open (playing
+    silence between clips), so starting a clip costs nothing and queued
+    clips play back-to-back without gaps.
+    """
+
+    def __init__(self, samplerate=OUTPUT_RATE, blocksize=OUTPUT_BLOCKSIZE):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self._stream = None
+        self._clips = deque()
+        self._position = 0    # Frames of self._clips[0] already played
+        self.level = 0.0      # Recent peak output level (decays between clips)
+        self._idle = threading.Event()
+        self._idle.set()
+        self._lock = threading.Lock()
+
+    def _ensure_stream(self):
+        with self._lock:
+            if self._stream is None:
+                import sounddevice as sd  # Imported on first playback
+
+                self._stream = sd.OutputStream(
+                    samplerate=self.samplerate, channels=1, dtype='float32',
+                    blocksize=self.blocksize, callback=self._callback
+                )
+                self._stream.start()
+                print(f"✅ Audio output stream opened ({self.samplerate} Hz)")
+
+    def _callback(self, outdata, frames, time_info, status):
+        with self._lock:
+            filled = 0
+            while filled < frames and self._clips:
+                clip = self._clips[0]
+                chunk = clip[self._position:self._position + frames - filled]
+                outdata[filled:filled + len(chunk), 0] = chunk
+                filled += len(chunk)
+                self._position += len(chunk)
+                if self._position >= len(clip):
+                    self._clips.popleft()
+                    self._position = 0
+
+            outdata[filled:] = 0
+            peak = float(np.max(np.abs(outdata[:filled]))) if filled else 0.0
+            self.level = max(peak, self.level * LEVEL_DECAY)
+            if not self._clips:
+                self._idle.set()
+
+    def enqueue(self, samples):
+        """Queue float32 samples after whatever is playing"""
+        if samples is None or not len(samples):
+            return
+        self._ensure_stream()
+        with self._lock:
+            self._clips.append(samples)
+            self._idle.clear()
+
+    def play(self, samples, wait=True):
+        """
+        Play float32 samples now (replaces anything still playing or queued)
+
+        Args:
+            samples: Mono float32 array at self.samplerate
+            wait: Block until playback finished or stop() was called
+        """
+        self.stop()
+        self.enqueue(samples)
+        if wait:
+            self.wait()
+
+    def wait(self, timeout=None):
+        """Block until the queue has played out; False on timeout"""
+        return self._idle.wait(timeout)
+
+    def is_playing(self):
+        return not self._idle.is_set()
+
+    def stop(self):
+        """Drop the current and queued clips (the stream keeps running)"""
+        with self._lock:
+            self._clips.clear()
+            self._position = 0
+            self._idle.set()
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            if self._stream is not None:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+
+
+class TTSEngine:
+    """
+    Backend chain + decoder + output stream
+    """
+
+    def __init__(self, backend=None, output=None, cache=None):
+        """
+        Args:
+            backend: "auto", "gtts" or "espeak" (default: TTS_BACKEND)
+            output: AudioOutput to play on (default: a new one)
+            cache: TTSCache (default: a new one)
+        """
+        backend = backend or TTS_BACKEND
+        names = list(BACKENDS)
+        if backend in BACKENDS:
+            names.remove(backend)
+            names.insert(0, backend)  # Preferred first, others as fallback
+        self.backends = [BACKENDS[name]() for name in names]
+        self.output = output or AudioOutput()
+        self.cache = cache or TTSCache()
+
+    def synthesize(self, text, lang="en"):
+        """
+        Text -> decoded samples: any backend's cached audio first, then
+        each available backend in turn
+
+        Returns:
+            np.ndarray: float32 samples at self.output.samplerate
+
+        Raises:
+            TTSError: If no backend succeeded
+        """
+        rate = self.output.samplerate
+        for backend in self.backends:
+            samples = self.cache.get(self.cache.make_key(text, lang, backend.voice), rate)
+            if samples is not None:
+                return samples
+
+        errors = []
+        for backend in self.backends:
+            if not backend.available():
+                continue
+            try:
+                key = self.cache.make_key(text, lang, backend.voice)
+                return self.cache.get_or_synthesize(key, lambda: backend.synthesize(text, lang), rate)
+            except Exception as e:
+                print(f"⚠️ TTS backend '{backend.name}' failed: {e}")
+                errors.append(f"{backend.name}: {e}")
+        raise TTSError("No TTS backend available" + (f" ({'; '.join(errors)})" if errors else ""))
+
+    def speak(self, text, lang="en", wait=True):
+        """Synthesise and play `text`"""
+        self.output.play(self.synthesize(text, lang), wait=wait)
+
+    def stop(self):
+        self.output.stop()
+
+    def prewarm(self, phrases, lang="en"):
+        """
+        Synthesise fixed phrases into the cache in the background
+
+        Returns:
+            threading.Thread: The warming thread
+        """
+        def run():
+            start = time.time()
+            warmed = 0
+            for phrase in phrases:
+                try:
+                    self.synthesize(phrase, lang)
+                    warmed += 1
+                except TTSError as e:
+                    print(f"⚠️ TTS pre-warm stopped: {e}")
+                    break
+            print(f"🔥 TTS cache warmed: {warmed}/{len(phrases)} phrases ({time.time() - start:.1f}s)")
+
+        thread = threading.Thread(target=run, daemon=True, name="tts-prewarm")
+        thread.start()
+        return thread
+
+
+class SpeechQueue:
+    """
+    Sentence playback queue
+
+    say() returns immediately; one worker synthesises the queued sentences
+    in order (running ahead of playback) and appends the audio to the
+    output queue. cancel() drops everything not yet spoken.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._texts = queue.Queue()
+        self._generation = 0      # Bumped by cancel() to drop queued / in-flight sentences
+        self._pending = 0         # Sentences waiting for or in synthesis
+        self._synthesized = threading.Event()
+        self._synthesized.set()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def say(self, text, lang="en"):
+        """Queue one sentence (or any text) for speaking"""
+        text = (text or "").strip()
+        if not text:
+            return
+        with self._lock:
+            self._pending += 1
+            self._synthesized.clear()
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, daemon=True, name="tts-queue")
+                self._worker.start()
+            self._texts.put((self._generation, text, lang))
+
+    def _run(self):
+        while True:
+            generation, text, lang = self._texts.get()
+            try:
+                if generation == self._generation:
+                    samples = self.engine.synthesize(text, lang)
+                    with self._lock:
+                        if generation == self._generation:
+                            self.engine.output.enqueue(samples)
+            except Exception as e:
+                print(f"❌ TTS Error: {e}")
+            finally:
+                with self._lock:
+                    if generation == self._generation:
+                        self._pending -= 1
+                        if self._pending == 0:
+                            self._synthesized.set()
+
+    def is_busy(self):
+        """True while sentences are being synthesised or played"""
+        return not self._synthesized.is_set() or self.engine.output.is_playing()
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been spoken"""
+        self._synthesized.wait(timeout)
+        self.engine.output.wait(timeout)
+
+    def cancel(self):
+        """Stop speaking and forget queued sentences"""
+        with self._lock:
+            self._generation += 1
+            self._pending = 0
+            self._synthesized.set()
+            self.engine.output.stop()
+
+
+# Global instance (nothing is imported or opened until the first reply)
+tts_engine = TTSEngine()
@@ -1,11 +1,15 @@
 """
 Audio Listener with AUTO AMPLIFICATION
 Captures system audio and automatically boosts quiet signals
+(the stream and auto-gain live in capture_engine.py)
 """
 import sounddevice as sd
-import numpy as np
 import queue
-import time
+
+try:
+    from capture_engine import get_capture_engine, pump_to_queue
+except ImportError:  # Imported as src.audio_listener
+    from src.capture_engine import get_capture_engine, pump_to_queue
 
 # Global queue for audio data
 combined_queue = queue.Queue(maxsize=100)
@@ -36,63 +40,29 @@ def find_loopback_device():
     print("⚠️ No loopback device found. Using default input.")
     return None
 
-def start_listening(samplerate=16000, blocksize=320):  # EXTREME LOW LATENCY (20ms blocks!)
-    """Captures system audio with extreme low latency"""
+def start_listening(samplerate=16000, blocksize=320, out_queue=None, stop_event=None):  # EXTREME LOW LATENCY (20ms blocks!)
+    """
+    Captures system audio with extreme low latency
+    
+    The device stream is owned by the shared capture engine; this only
+    subscribes to it, so other consumers can read the same audio.
+    
+    Args:
+        samplerate: Sample rate in Hz (the capture engine runs at 16 kHz)
+        blocksize: Samples per queued block
+        out_queue: Queue receiving audio blocks (default: combined_queue)
+        stop_event: Optional threading.Event that ends the recording loop
+    """
+    if out_queue is None:
+        out_queue = combined_queue
     
     def record_loop():
-        """Main recording loop with optimized settings"""
+        """Copy loopback audio from the capture engine into the queue"""
         
         try:
-            device_id = find_loopback_device()
-            
-            if device_id is None:
-                device_id = sd.default.device[0]
-                devices = sd.query_devices()
-                print(f"📢 Using default input: {devices[device_id]['name']}")
-            
-            def audio_callback(indata, frames, time_info, status):
-                """Process each audio block with minimal latency"""
-                if status:
-                    print(f"⚠️ Audio status: {status}")
-                
-                audio_data = indata.copy().astype(np.float32)
-                
-                # Calculate current amplitude
-                max_amplitude = np.max(np.abs(audio_data))
-                
-                # AUTO AMPLIFICATION (optimized)
-                if max_amplitude > 0.00001:
-                    target_amplitude = 0.1
-                    amplification_factor = min(target_amplitude / max_amplitude, 50.0)
-                    audio_data = audio_data * amplification_factor
-                    audio_data = np.clip(audio_data, -1.0, 1.0)
-                
-                # Add to queue (non-blocking)
-                if not combined_queue.full():
-                    combined_queue.put(audio_data)
-                else:
-                    try:
-                        combined_queue.get_nowait()
-                        combined_queue.put(audio_data)
-                    except queue.Empty:
-                        pass
-            
-            print(f"🎙️ Starting LOW LATENCY audio stream")
-            print(f"📊 Device ID: {device_id}, Block size: {blocksize}")
-            
-            with sd.InputStream(
-                samplerate=samplerate,
-                channels=1,
-                device=device_id,
-                callback=audio_callback,
-                blocksize=blocksize,  # Smaller = lower latency
-                dtype='float32',
-                latency='low'  # Request low latency mode
-            ):
-                print("✅ Audio stream started - LOW LATENCY mode")
-                
-                while True:
-                    time.sleep(0.01)  # Very fast polling
+            subscription = get_capture_engine().subscribe("loopback")
+            print(f"🎙️ Listening to system audio (block size: {blocksize})")
+            pump_to_queue(subscription, out_queue, stop_event, blocksize=blocksize)
                     
         except Exception as e:
             print(f"❌ Audio stream error: {e}")
@@ -0,0 +1,259 @@
+# caption_server.py - Live caption stream for external consumers
+"""
+Lightweight asyncio HTTP service for live captions (Server-Sent Events)
+
+Endpoints:
+    GET /events  - SSE stream of caption events (partial, final, speaker, translation)
+    GET /health  - JSON status
+
+One pipeline publishes, every connected client gets its own bounded buffer.
+Slow clients lose their oldest events instead of slowing the pipeline down.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse, parse_qs
+
+EVENT_TYPES = ("partial", "final", "speaker", "translation", "status", "summary")
+
+# Captions are live meeting transcripts: local only unless exposed on purpose
+# (CAPTION_API_HOST=0.0.0.0 serves the LAN, there is no authentication)
+CAPTION_HOST = os.getenv("CAPTION_API_HOST", "127.0.0.1")
+# Origin allowed to read the stream from a browser page (CORS); unset = none
+CAPTION_ALLOW_ORIGIN = os.getenv("CAPTION_API_ALLOW_ORIGIN", "")
+
+
+class CaptionSubscriber:
+    """One connected client with a bounded event buffer"""
+
+    def __init__(self, maxsize=100, meeting_id=None):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.meeting_id = meeting_id
+        self.dropped = 0
+
+    def offer(self, event):
+        """Add an event, dropping the oldest one if the client is behind"""
+        if self.meeting_id and event.get('meeting') not in (None, self.meeting_id):
+            return
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+
+class CaptionBroadcaster:
+    """
+    Fan-out of caption events from the transcription pipeline to many clients
+
+    publish() is thread-safe and never blocks - it is called from the
+    meeting loop / translation threads.
+    """
+
+    def __init__(self, buffer_size=100, replay_size=20):
+        self.buffer_size = buffer_size
+        self.subscribers = set()
+        self.recent_finals = deque(maxlen=replay_size)  # Replayed to new clients
+        self.loop = None
+        self.event_counter = 0
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, data, meeting_id=None):
+        """
+        Publish a caption event to all subscribers
+
+        Args:
+            event_type: One of EVENT_TYPES
+            data: JSON-serializable dict
+            meeting_id: Optional meeting the event belongs to
+        """
+        with self._lock:
+            self.event_counter += 1
+            event = {
+                'id': self.event_counter,
+                'type': event_type,
+                'meeting': meeting_id,
+                'timestamp': time.time(),
+                'data': data
+            }
+            if event_type == "final":
+                self.recent_finals.append(event)
+
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return  # Server not running - nothing to deliver
+
+        try:
+            loop.call_soon_threadsafe(self._fan_out, event)
+        except RuntimeError:
+            pass  # Loop shutting down
+
+    def _fan_out(self, event):
+        for subscriber in list(self.subscribers):
+            subscriber.offer(event)
+
+    def subscribe(self, meeting_id=None):
+        """Register a new client (must run on the server loop)"""
+        subscriber = CaptionSubscriber(self.buffer_size, meeting_id)
+        with self._lock:
+            replay = list(self.recent_finals)
+        for event in replay:
+            subscriber.offer(event)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+
+def _format_sse(event):
+    """Encode one event in SSE wire format"""
+    payload = json.dumps(event, ensure_ascii=False)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n".encode('utf-8')
+
+
+class CaptionServer:
+    """
+    Minimal HTTP/1.1 server built on asyncio streams (no extra dependencies)
+    """
+
+    def __init__(self, broadcaster, host=None, port=7861, heartbeat=15.0, allow_origin=None):
+        self.broadcaster = broadcaster
+        self.host = host or CAPTION_HOST
+        self.allow_origin = CAPTION_ALLOW_ORIGIN if allow_origin is None else allow_origin
+        self.port = port
+        self.heartbeat = heartbeat
+        self.server = None
+
+    async def start(self):
+        self.broadcaster.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        print(f"📡 Caption API listening on http://{self.host}:{self.port}/events")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            if not request_line:
+                return
+
+            # Drain headers
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=10)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != "GET":
+                await self._send_simple(writer, 405, {"error": "method not allowed"})
+                return
+
+            url = urlparse(parts[1])
+            query = parse_qs(url.query)
+
+            if url.path == "/events":
+                meeting_id = query.get('meeting', [None])[0]
+                await self._stream_events(writer, meeting_id)
+            elif url.path == "/health":
+                await self._send_simple(writer, 200, {
+                    'status': 'ok',
+                    'subscribers': len(self.broadcaster.subscribers),
+                    'events': self.broadcaster.event_counter
+                })
+            else:
+                await self._send_simple(writer, 404, {"error": "not found"})
+
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"⚠️ Caption API client error: {e}")
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def _cors_header(self):
+        return f"Access-Control-Allow-Origin: {self.allow_origin}\r\n" if self.allow_origin else ""
+
+    async def _send_simple(self, writer, status, body):
+        reasons = {200: "OK", 404: "Not Found", 405: "Method Not Allowed"}
+        payload = json.dumps(body).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {reasons.get(status, 'OK')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"{self._cors_header()}"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode('latin-1') + payload
+        )
+        await writer.drain()
+
+    async def _stream_events(self, writer, meeting_id):
+        writer.write(
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: text/event-stream; charset=utf-8\r\n"
+            "Cache-Control: no-cache\r\n"
+            f"{self._cors_header()}"
+            "Connection: keep-alive\r\n\r\n"
+            "retry: 2000\n\n".encode('latin-1')
+        )
+        await writer.drain()
+
+        subscriber = self.broadcaster.subscribe(meeting_id)
+        print(f"📡 Caption client connected ({len(self.broadcaster.subscribers)} total)")
+
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat)
+                    writer.write(_format_sse(event))
+                except asyncio.TimeoutError:
+                    writer.write(b": ping\n\n")  # Keep proxies from closing the stream
+                await writer.drain()
+        finally:
+            self.broadcaster.unsubscribe(subscriber)
+            print(f"📡 Caption client disconnected (dropped {subscriber.dropped} events)")
+
+
+# Global broadcaster instance
+caption_broadcaster = CaptionBroadcaster()
+
+
+def publish_caption(event_type, data, meeting_id=None):
+    """Publish a caption event (no-op when the caption server is not running)"""
+    caption_broadcaster.publish(event_type, data, meeting_id)
+
+
+def start_caption_server(host=None, port=7861):
+    """
+    Run the caption server in a background thread with its own event loop
+
+    Args:
+        host: Bind address (default CAPTION_API_HOST, 127.0.0.1)
+        port: TCP port
+
+    Returns:
+        threading.Thread
+    """
+    server = CaptionServer(caption_broadcaster, host, port)
+
+    def run():
+        try:
+            asyncio.run(server.serve_forever())
+        except Exception as e:
+            print(f"❌ Caption API error: {e}")
+
+    thread = threading.Thread(target=run, daemon=True, name="caption-server")
+    thread.start()
+    return thread
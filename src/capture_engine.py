@@ -0,0 +1,288 @@
+# capture_engine.py - One input stream per device, shared by all consumers
+"""
+Shared audio capture
+
+Each device is opened once (16 kHz mono float32) and written into a
+fixed-size ring buffer. Consumers - the meeting segmenter, the
+conversation controller, level meters - subscribe with their own read
+cursor, so they never copy audio for each other and memory stays bounded.
+The ring holds raw audio and the level meter runs once per block in the
+device callback; auto-gain is applied per subscription when it reads, so
+consumers sharing a device each get the levels they asked for.
+
+Sources:
+- "loopback":   system audio (VB-Cable / Stereo Mix, see find_loopback_device)
+- "microphone": default input device
+- an int:       sounddevice device index
+"""
+
+import queue
+import threading
+
+import numpy as np
+
+SAMPLERATE = 16000
+DEVICE_BLOCKSIZE = 320      # 20 ms per callback (low latency)
+RING_SECONDS = 30           # Audio kept per device for slow readers
+
+# Default auto-gain per source: (target peak, max factor); None = raw audio
+# The microphone stays raw: the conversation controller's VAD and echo gate need real levels
+AUTO_GAIN = {
+    "loopback": (0.1, 50.0),
+    "microphone": None,
+}
+
+
+class RingBuffer:
+    """
+    Fixed-size float32 ring addressed by absolute sample positions
+
+    One writer, any number of readers; a reader that falls more than
+    `capacity` samples behind skips ahead and is told how much it lost.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self.write_pos = 0        # Total samples ever written
+        self._cond = threading.Condition()
+
+    def write(self, samples):
+        total = len(samples)
+        samples = samples[-self.capacity:]  # Only the newest `capacity` samples can be kept
+        n = len(samples)
+        with self._cond:
+            start = (self.write_pos + total - n) % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            self._data[:n - first] = samples[first:]
+            self.write_pos += total
+            self._cond.notify_all()
+
+    def read(self, cursor, frames=None, timeout=None):
+        """
+        Read from absolute position `cursor`
+
+        Args:
+            cursor: Reader's position
+            frames: Exact number of samples wanted (None = whatever is available)
+            timeout: Seconds to wait for data (None = forever)
+
+        Returns:
+            tuple: (samples or None on timeout, new cursor, samples skipped)
+        """
+        needed = frames or 1
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.write_pos - cursor >= needed, timeout):
+                return None, cursor, 0
+
+            skipped = 0
+            oldest = self.write_pos - self.capacity
+            if cursor < oldest:
+                skipped = oldest - cursor
+                cursor = oldest
+
+            count = min(frames or self.write_pos - cursor, self.write_pos - cursor)
+            start = cursor % self.capacity
+            first = min(count, self.capacity - start)
+            out = np.empty(count, dtype=np.float32)
+            out[:first] = self._data[start:start + first]
+            out[first:] = self._data[:count - first]
+            return out, cursor + count, skipped
+
+
+def apply_gain(samples, gain):
+    """
+    Auto-gain one block
+
+    Args:
+        samples: 1-D float32 audio
+        gain: (target peak, max factor) or None for raw audio
+
+    Returns:
+        np.ndarray: Amplified (and clipped) copy, or `samples` unchanged
+    """
+    if gain is None or not len(samples):
+        return samples
+    peak = float(np.max(np.abs(samples)))
+    if peak <= 0.00001:
+        return samples
+    target, max_factor = gain
+    return np.clip(samples * min(target / peak, max_factor), -1.0, 1.0)
+
+
+class Subscription:
+    """One consumer's read cursor on a device (+ its own auto-gain)"""
+
+    def __init__(self, device, cursor, gain=None):
+        self.device = device
+        self.cursor = cursor
+        self.gain = gain
+        self.dropped = 0          # Samples lost because the reader fell behind
+        self.closed = False
+
+    def read(self, frames=None, timeout=None):
+        """
+        Next block of audio (1-D float32), or None on timeout
+
+        Args:
+            frames: Exact block size (None = everything new)
+            timeout: Seconds to wait
+        """
+        if self.closed:
+            return None
+        samples, self.cursor, skipped = self.device.ring.read(self.cursor, frames, timeout)
+        if skipped:
+            self.dropped += skipped
+            print(f"⚠️ Capture reader fell behind on '{self.device.name}': skipped {skipped / SAMPLERATE:.1f}s")
+        if samples is None:
+            return None
+        return apply_gain(samples, self.gain)
+
+    @property
+    def level(self):
+        """Peak level of the latest block (level meters need no audio copy)"""
+        return self.device.level
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.device.release(self)
+
+
+class DeviceStream:
+    """
+    One sounddevice InputStream feeding a ring buffer
+
+    Opened by the first subscriber and closed when the last one leaves.
+    """
+
+    def __init__(self, name, device_id, samplerate=SAMPLERATE, blocksize=DEVICE_BLOCKSIZE):
+        self.name = name
+        self.device_id = device_id
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.ring = RingBuffer(int(RING_SECONDS * samplerate))
+        self.level = 0.0
+        self.subscribers = set()
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"⚠️ Audio status ({self.name}): {status}")
+
+        audio = indata[:, 0].astype(np.float32)
+        self.level = float(np.max(np.abs(audio))) if len(audio) else 0.0
+        self.ring.write(audio)  # Raw: gain belongs to each subscription
+
+    def subscribe(self, gain=None):
+        with self._lock:
+            if self._stream is None:
+                import sounddevice as sd  # Imported on first capture
+
+                self._stream = sd.InputStream(
+                    samplerate=self.samplerate, channels=1, dtype='float32',
+                    device=self.device_id, blocksize=self.blocksize,
+                    latency='low', callback=self._callback
+                )
+                self._stream.start()
+                print(f"✅ Capture started: {self.name} (device {self.device_id}, {self.samplerate} Hz)")
+            subscription = Subscription(self, self.ring.write_pos, gain)
+            self.subscribers.add(subscription)
+            return subscription
+
+    def release(self, subscription):
+        with self._lock:
+            self.subscribers.discard(subscription)
+            if not self.subscribers and self._stream is not None:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+                print(f"🛑 Capture stopped: {self.name}")
+
+
+class CaptureEngine:
+    """
+    Owns every capture device; hands out subscriptions
+    """
+
+    def __init__(self, samplerate=SAMPLERATE):
+        self.samplerate = samplerate
+        self.devices = {}         # resolved device id -> DeviceStream
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _resolve(source):
+        """Source name -> sounddevice device index (None = default input)"""
+        if isinstance(source, int):
+            return source
+        if source == "loopback":
+            try:
+                from audio_listener import find_loopback_device
+            except ImportError:  # Imported as src.capture_engine
+                from src.audio_listener import find_loopback_device
+            return find_loopback_device()
+        return None
+
+    def subscribe(self, source="microphone", gain="auto"):
+        """
+        Start reading a source
+
+        Args:
+            source: "loopback", "microphone" or a device index
+            gain: (target peak, max factor), None for raw audio, or "auto"
+                  for the source's AUTO_GAIN entry
+
+        Returns:
+            Subscription: read() blocks of audio, close() when done
+        """
+        if gain == "auto":
+            gain = AUTO_GAIN.get(source) if isinstance(source, str) else None
+        device_id = self._resolve(source)
+        with self._lock:
+            # Keyed by device: if "loopback" falls back to the default input it
+            # shares the microphone stream, but keeps its own gain
+            device = self.devices.get(device_id)
+            if device is None:
+                name = source if isinstance(source, str) else f"device {source}"
+                device = DeviceStream(name, device_id, self.samplerate)
+                self.devices[device_id] = device
+        return device.subscribe(gain)
+
+    def active_streams(self):
+        return {device.name: len(device.subscribers) for device in self.devices.values() if device.subscribers}
+
+
+def pump_to_queue(subscription, out_queue, stop_event=None, blocksize=DEVICE_BLOCKSIZE):
+    """
+    Copy fixed-size blocks from a subscription into a bounded queue
+    (drops the oldest block when the queue is full) until stop_event is set
+
+    Blocks are (blocksize, 1) arrays, the shape sounddevice callbacks deliver.
+    """
+    try:
+        while stop_event is None or not stop_event.is_set():
+            block = subscription.read(blocksize, timeout=0.1)
+            if block is None:
+                continue
+            block = block.reshape(-1, 1)
+            try:
+                out_queue.put_nowait(block)
+            except queue.Full:
+                try:
+                    out_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                out_queue.put_nowait(block)
+    finally:
+        subscription.close()
+
+
+# Shared engine (no device is opened until the first subscription)
+capture_engine = CaptureEngine()
+
+
+def get_capture_engine():
+    """Shared capture engine"""
+    return capture_engine
@@ -0,0 +1,315 @@
+# extractive_summarizer.py - Local (offline) meeting summary
+"""
+Extractive meeting summary on the CPU - no API key, no network
+
+Sentences are scored with TextRank over a TF-IDF sentence graph (sparse
+matrices), keywords come from the TF-IDF weights and action items /
+decisions from phrase patterns. The output has the same sections as the
+Gemini summary; 'elapsed_ms' reports how long it took.
+"""
+
+import re
+import time
+
+import numpy as np
+
+try:
+    from text_utils import (
+        STOPWORDS, TOKEN_PATTERN, SENTENCE_SPLIT, ACTION_PATTERN, DECISION_PATTERN, normalize, is_duplicate
+    )
+except ImportError:  # Imported as src.extractive_summarizer
+    from src.text_utils import (
+        STOPWORDS, TOKEN_PATTERN, SENTENCE_SPLIT, ACTION_PATTERN, DECISION_PATTERN, normalize, is_duplicate
+    )
+
+DUE_PATTERN = re.compile(
+    r"\b(?:by|before|until|on|next|this)\s+(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"tomorrow|tonight|week|month|quarter|meeting|end of (?:the )?(?:day|week|month|quarter))\b|\btomorrow\b|\btoday\b",
+    re.IGNORECASE
+)
+MIN_CONTENT_WORDS = 3      # Shorter sentences ("Yeah.", "Right.") are never picked
+DAMPING = 0.85
+ITERATIONS = 30
+
+
+class ExtractiveSummarizer:
+    """
+    TextRank + pattern based meeting summarizer
+    """
+
+    def __init__(self, executive_sentences=3, key_points=7, keywords=10):
+        self.executive_sentences = executive_sentences
+        self.key_points = key_points
+        self.keywords = keywords
+
+    @staticmethod
+    def _sentences(transcripts_list):
+        """Split segments into sentences -> [(speaker, time, sentence)]"""
+        sentences = []
+        for t in transcripts_list:
+            if isinstance(t, str):
+                t = {'en': t}
+            text = (t.get('en') or "").strip()
+            for sentence in SENTENCE_SPLIT.split(text):
+                sentence = sentence.strip()
+                if sentence:
+                    sentences.append((t.get('speaker', ''), t.get('time', ''), sentence))
+        return sentences
+
+    @staticmethod
+    def _tfidf(token_lists):
+        """
+        Build an L2-normalised TF-IDF matrix
+
+        Returns:
+            (scipy.sparse.csr_matrix, vocabulary list, idf array)
+        """
+        from scipy import sparse  # Imported on first summary (keeps app startup fast)
+
+        vocabulary = {}
+        rows, cols = [], []
+        for row, tokens in enumerate(token_lists):
+            for token in tokens:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+        n_docs = len(token_lists)
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(n_docs, max(len(vocabulary), 1))
+        )
+        counts.sum_duplicates()
+
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1.0
+        tfidf = counts.multiply(idf).tocsr()
+
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        tfidf = sparse.diags(1.0 / norms) @ tfidf
+
+        terms = [None] * len(vocabulary)
+        for term, index in vocabulary.items():
+            terms[index] = term
+        return tfidf.tocsr(), terms, idf
+
+    @staticmethod
+    def _textrank(tfidf):
+        """PageRank over the cosine-similarity graph of the sentences"""
+        from scipy import sparse
+
+        n = tfidf.shape[0]
+        similarity = (tfidf @ tfidf.T).tocsr()
+        similarity.setdiag(0)
+        similarity.eliminate_zeros()
+
+        out_weight = np.asarray(similarity.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        out_weight[dangling] = 1.0
+
+        # Column-stochastic transition: rank flows along normalised edges
+        transition = (sparse.diags(1.0 / out_weight) @ similarity).T.tocsr()
+
+        rank = np.full(n, 1.0 / n)
+        for _ in range(ITERATIONS):
+            new_rank = (1 - DAMPING) / n + DAMPING * (transition @ rank + rank[dangling].sum() / n)
+            if np.abs(new_rank - rank).sum() < 1e-6:
+                rank = new_rank
+                break
+            rank = new_rank
+        return rank
+
+    def summarize(self, transcripts_list):
+        """
+        Summarize a meeting
+
+        Args:
+            transcripts_list: Transcript dicts ('speaker', 'en', 'time') or plain strings
+
+        Returns:
+            dict: {
+                'executive_summary': str,
+                'key_points': [(speaker, time, sentence)],
+                'keywords': [str],
+                'action_items': [{'owner', 'time', 'text', 'due'}],
+                'decisions': [(speaker, time, sentence)],
+                'next_steps': [str],
+                'suggestions': [str],
+                'elapsed_ms': float
+            }
+        """
+        start = time.perf_counter()
+        sentences = self._sentences(transcripts_list)
+
+        result = {
+            'executive_summary': "",
+            'key_points': [],
+            'keywords': [],
+            'action_items': [],
+            'decisions': [],
+            'next_steps': [],
+            'suggestions': [],
+            'elapsed_ms': 0.0
+        }
+        if not sentences:
+            return result
+
+        token_lists = [
+            [w for w in TOKEN_PATTERN.findall(sentence.lower()) if w not in STOPWORDS]
+            for _, _, sentence in sentences
+        ]
+        eligible = np.array([len(tokens) >= MIN_CONTENT_WORDS for tokens in token_lists])
+
+        # Sentence ranking
+        if eligible.any():
+            tfidf, terms, idf = self._tfidf(token_lists)
+            scores = np.where(eligible, self._textrank(tfidf), -1.0)
+
+            # Best sentences, skipping repeats (Whisper re-transcribing the same audio)
+            wanted = self.executive_sentences + self.key_points
+            picked, picked_norm = [], []
+            for i in np.argsort(-scores):
+                if len(picked) >= wanted or not eligible[i]:
+                    break
+                norm = normalize(sentences[i][2])
+                if not any(is_duplicate(norm, other) for other in picked_norm):
+                    picked.append(i)
+                    picked_norm.append(norm)
+            executive = sorted(picked[:self.executive_sentences])
+            key_points = sorted(picked[self.executive_sentences:])
+
+            result['executive_summary'] = " ".join(sentences[i][2] for i in executive)
+            result['key_points'] = [sentences[i] for i in key_points]
+
+            term_weights = np.asarray(tfidf.sum(axis=0)).ravel()
+            top_terms = np.argsort(-term_weights)[:self.keywords]
+            result['keywords'] = [terms[i] for i in top_terms if term_weights[i] > 0]
+
+        # Action items / decisions (statements only, no questions)
+        seen = set()
+        for (speaker, when, sentence), tokens in zip(sentences, token_lists):
+            if sentence.endswith("?") or len(tokens) < 2:
+                continue
+            key = sentence.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+
+            if DECISION_PATTERN.search(sentence):
+                result['decisions'].append((speaker, when, sentence))
+            elif ACTION_PATTERN.search(sentence):
+                due = DUE_PATTERN.search(sentence)
+                result['action_items'].append({
+                    'owner': speaker or "Unassigned",
+                    'time': when,
+                    'text': sentence,
+                    'due': due.group(0) if due else ""
+                })
+
+        result['next_steps'] = self._next_steps(result['action_items'])
+        result['suggestions'] = self._suggestions(transcripts_list, result)
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        return result
+
+    @staticmethod
+    def _next_steps(action_items):
+        dated = [item for item in action_items if item['due']]
+        steps = [f"{item['owner']}: {item['text']} ({item['due']})" for item in dated[:5]]
+        if not steps:
+            steps = [f"{item['owner']}: {item['text']}" for item in action_items[:3]]
+        if not steps:
+            steps = ["Agree on owners and deadlines for the topics above in a follow-up."]
+        return steps
+
+    @staticmethod
+    def _suggestions(transcripts_list, result):
+        suggestions = []
+
+        if not result['action_items']:
+            suggestions.append("No clear action items were captured - assign owners and deadlines before closing.")
+        else:
+            undated = sum(1 for item in result['action_items'] if not item['due'])
+            if undated:
+                suggestions.append(f"{undated} action item(s) have no deadline - add dates.")
+
+        if not result['decisions']:
+            suggestions.append("No explicit decisions were recorded - restate agreements at the end of the meeting.")
+
+        words = {}
+        for t in transcripts_list:
+            if isinstance(t, dict):
+                speaker = t.get('speaker', 'Unknown')
+                words[speaker] = words.get(speaker, 0) + len((t.get('en') or "").split())
+        total = sum(words.values())
+        if len(words) > 1 and total:
+            speaker, count = max(words.items(), key=lambda item: item[1])
+            share = count / total
+            if share > 0.6:
+                suggestions.append(f"{speaker} spoke {share:.0%} of the words - invite more input from others.")
+
+        if not suggestions:
+            suggestions.append("Meeting looks well structured - share this summary with the participants.")
+        return suggestions
+
+    @staticmethod
+    def to_markdown(result, title="## 📋 Meeting Summary (Local)"):
+        """Render summarize() output with the same sections as the AI summary"""
+
+        def quote(item):
+            speaker, when, sentence = item
+            prefix = f"[{when}] " if when else ""
+            return f"- {prefix}**{speaker}:** {sentence}" if speaker else f"- {prefix}{sentence}"
+
+        lines = [
+            title,
+            f"*Extractive summary generated offline in {result['elapsed_ms']:.0f} ms*",
+            "",
+            "### 1. Executive Summary",
+            result['executive_summary'] or "Not enough content to summarize yet.",
+            "",
+            "### 2. Key Discussion Points",
+        ]
+        lines += [quote(item) for item in result['key_points']] or ["- (none)"]
+        if result['keywords']:
+            lines += ["", f"**Keywords:** {', '.join(result['keywords'])}"]
+
+        lines += ["", "### 3. Action Items"]
+        lines += [
+            f"- [ ] **{item['owner']}**" + (f" ({item['time']})" if item['time'] else "") +
+            f": {item['text']}" + (f" - *due {item['due']}*" if item['due'] else "")
+            for item in result['action_items']
+        ] or ["- (none detected)"]
+
+        lines += ["", "### 4. Important Decisions"]
+        lines += [quote(item) for item in result['decisions']] or ["- (none detected)"]
+
+        lines += ["", "### 5. Next Steps"]
+        lines += [f"- {step}" for step in result['next_steps']] or ["- (none identified)"]
+
+        lines += ["", "### 6. Suggestions"]
+        lines += [f"- {suggestion}" for suggestion in result['suggestions']] or ["- (none identified)"]
+
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+extractive_summarizer = ExtractiveSummarizer()
+
+
+def summarize_locally(transcripts_list):
+    """Structured local summary (see ExtractiveSummarizer.summarize)"""
+    return extractive_summarizer.summarize(transcripts_list)
+
+
+def generate_local_summary(transcripts_list, title="## 📋 Meeting Summary (Local)"):
+    """
+    Markdown summary without any LLM
+
+    Args:
+        transcripts_list: Transcript dicts or plain strings
+        title: Heading of the summary block
+
+    Returns:
+        str: Markdown with the six summary sections
+    """
+    return ExtractiveSummarizer.to_markdown(extractive_summarizer.summarize(transcripts_list), title=title)
@@ -0,0 +1,280 @@
+# inference_pool.py - Process-pool inference workers
+"""
+Runs transcription, speaker identification and translation in worker
+processes so CPU-heavy stages don't compete with the UI for the GIL.
+
+Audio is handed over through multiprocessing.shared_memory (no pickling of
+large arrays), results come back over a single result queue. Each meeting is
+pinned to one worker because speaker identification keeps per-meeting state.
+
+Workers start lazily on the first job. With the "spawn" start method each
+worker re-imports the main script, so entry points should keep heavy work
+out of module level. A worker that dies (e.g. out of memory) is restarted;
+its outstanding jobs fail right away and their shared memory is freed.
+"""
+
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Seconds a caller waits for a job (includes loading the model on first use)
+RESULT_TIMEOUT = float(os.getenv("MEETINGAI_INFERENCE_TIMEOUT", "120"))
+WORKER_CHECK_INTERVAL = 1.0   # Seconds between liveness checks of the workers
+
+# ----------------------------------------------------------------------
+# Worker process
+# ----------------------------------------------------------------------
+
+def _attach_audio(spec):
+    """Attach to a shared-memory audio buffer -> (shm, array view)"""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    audio = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return shm, audio
+
+
+def _worker_main(task_queue, result_queue):
+    """Worker loop - models are loaded on first use inside the worker"""
+    speakers = {}  # meeting id -> speaker identifier
+    modules = {}
+
+    def module(name):
+        if name not in modules:
+            modules[name] = __import__(name)
+        return modules[name]
+
+    print(f"⚙️ Inference worker started (pid {os.getpid()})")
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        job_id, kind, session_id, payload = task
+        try:
+            if kind == "process":
+                shm, audio = _attach_audio(payload)
+                try:
+                    identifier = speakers.get(session_id)
+                    if identifier is None:
+                        identifier = module('speaker_identifier').ImprovedSpeakerIdentifier()
+                        speakers[session_id] = identifier
+                    speaker = identifier.identify_speaker(audio, samplerate=16000)
+                    text = module('transcriber').transcribe(audio)
+                finally:
+                    del audio
+                    shm.close()
+                result = (speaker, text)
+
+            elif kind == "transcribe":
+                shm, audio = _attach_audio(payload)
+                try:
+                    result = module('transcriber').transcribe(audio)
+                finally:
+                    del audio
+                    shm.close()
+
+            elif kind == "translate":
+                result = module('translator').translate_to_bangla(payload)
+
+            elif kind == "reset":
+                speakers.pop(session_id, None)
+                result = None
+
+            else:
+                raise ValueError(f"Unknown task: {kind}")
+
+            result_queue.put((job_id, True, result))
+
+        except Exception as e:
+            result_queue.put((job_id, False, f"{type(e).__name__}: {e}"))
+
+
+# ----------------------------------------------------------------------
+# Parent side
+# ----------------------------------------------------------------------
+
+class InferencePool:
+    """
+    Pool of inference worker processes
+
+    Every call returns a concurrent.futures.Future; wait on it with
+    result(RESULT_TIMEOUT) so a stuck worker can't block the caller forever.
+    """
+
+    def __init__(self, processes=2):
+        self.processes = processes
+        self._ctx = mp.get_context("spawn")
+        self._workers = []
+        self._task_queues = []
+        self._result_queue = None
+        self._futures = {}        # job id -> (Future, SharedMemory or None, worker index)
+        self._affinity = {}       # meeting id -> worker index
+        self._load = []           # in-flight jobs per worker
+        self._job_ids = itertools.count()
+        self._next_worker = itertools.count()
+        self._lock = threading.Lock()
+
+    def _start_worker(self, index):
+        """Start (or replace) worker `index` with a fresh task queue (caller holds the lock)"""
+        task_queue = self._ctx.Queue()
+        worker = self._ctx.Process(
+            target=_worker_main,
+            args=(task_queue, self._result_queue),
+            daemon=True,
+            name=f"inference-{index}"
+        )
+        worker.start()
+        if index < len(self._workers):
+            self._workers[index] = worker
+            self._task_queues[index] = task_queue
+            self._load[index] = 0
+        else:
+            self._workers.append(worker)
+            self._task_queues.append(task_queue)
+            self._load.append(0)
+
+    def _ensure_started(self):
+        if self._workers:
+            return
+
+        self._result_queue = self._ctx.Queue()
+        self._load = []
+        for i in range(self.processes):
+            self._start_worker(i)
+
+        threading.Thread(target=self._collect_results, daemon=True, name="inference-results").start()
+        print(f"✅ Inference pool started ({self.processes} processes)")
+
+    def _reap_dead_workers(self):
+        """
+        Restart workers that died (caller holds the lock)
+
+        Returns:
+            list: (Future, error) of the dead workers' jobs, to fail outside the lock
+        """
+        failed = []
+        for index, worker in enumerate(self._workers):
+            if worker.is_alive():
+                continue
+            print(f"⚠️ Inference worker {index} died (exit code {worker.exitcode}), restarting")
+            error = RuntimeError(f"Inference worker {index} died (exit code {worker.exitcode})")
+            for job_id in [j for j, entry in self._futures.items() if entry[2] == index]:
+                future, shm, _ = self._futures.pop(job_id)
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+                failed.append((future, error))
+            self._start_worker(index)  # Pinned meetings continue there (speaker state starts over)
+        return failed
+
+    @staticmethod
+    def _fail(failed):
+        for future, error in failed:
+            if not future.done():
+                future.set_exception(error)
+
+    def _collect_results(self):
+        last_check = time.monotonic()
+        while True:
+            try:
+                job_id, ok, value = self._result_queue.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                job_id = None
+
+            if time.monotonic() - last_check >= WORKER_CHECK_INTERVAL:
+                last_check = time.monotonic()
+                with self._lock:
+                    failed = self._reap_dead_workers() if self._workers else []
+                self._fail(failed)
+            if job_id is None:
+                continue
+
+            with self._lock:
+                future, shm, worker = self._futures.pop(job_id, (None, None, None))
+                if worker is not None:
+                    self._load[worker] -= 1
+
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+            if future is None:
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RuntimeError(value))
+
+    @staticmethod
+    def _share_audio(audio):
+        """Copy audio into a new shared-memory block"""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        view = np.ndarray(audio.shape, dtype=audio.dtype, buffer=shm.buf)
+        view[:] = audio
+        del view
+        return shm, (shm.name, audio.shape, audio.dtype.str)
+
+    def _submit(self, kind, session_id, payload, worker=None, shm=None):
+        future = Future()
+        with self._lock:
+            self._ensure_started()
+            failed = self._reap_dead_workers()
+            if worker is None:
+                # Least loaded worker (ties broken round-robin)
+                start = next(self._next_worker) % self.processes
+                order = [(start + i) % self.processes for i in range(self.processes)]
+                worker = min(order, key=lambda i: self._load[i])
+            job_id = next(self._job_ids)
+            self._futures[job_id] = (future, shm, worker)
+            self._load[worker] += 1
+            task_queue = self._task_queues[worker]
+        self._fail(failed)
+        task_queue.put((job_id, kind, session_id, payload))
+        return future
+
+    def _worker_for(self, session_id):
+        """Meetings are pinned to one worker (speaker state lives there)"""
+        with self._lock:
+            if session_id not in self._affinity:
+                self._affinity[session_id] = next(self._next_worker) % self.processes
+            return self._affinity[session_id]
+
+    def process_audio(self, session_id, audio):
+        """Identify speaker + transcribe -> Future[(speaker, text)]"""
+        shm, spec = self._share_audio(audio)
+        return self._submit("process", session_id, spec, worker=self._worker_for(session_id), shm=shm)
+
+    def transcribe(self, audio):
+        """Transcribe only -> Future[str]"""
+        shm, spec = self._share_audio(audio)
+        return self._submit("transcribe", None, spec, shm=shm)
+
+    def translate(self, text):
+        """English -> Bangla -> Future[str]"""
+        return self._submit("translate", None, text)
+
+    def reset_session(self, session_id):
+        """Forget speaker state of a meeting"""
+        if not self._workers or session_id not in self._affinity:
+            return None
+        return self._submit("reset", session_id, None, worker=self._worker_for(session_id))
+
+    def shutdown(self):
+        with self._lock:
+            # Cleared first so the result collector doesn't restart exiting workers
+            workers, task_queues = self._workers, self._task_queues
+            self._workers = []
+            self._task_queues = []
+        for task_queue in task_queues:
+            task_queue.put(None)
+        for worker in workers:
+            worker.join(timeout=5)
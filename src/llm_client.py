@@ -0,0 +1,445 @@
+# llm_client.py - Shared, lazily initialised Gemini client
+"""
+Single LLM client for the whole app
+
+Nothing here touches the network at import time. The model is resolved on
+the first real request (trying candidates in order), and the working model
+name is cached on disk with a TTL so later starts skip the fallback loop.
+Use health_check() for an explicit connectivity probe.
+
+Requests go through the shared LLMGateway (rate limit, priorities, retries);
+get_model(priority) returns a view of the shared model for one priority.
+
+ResponseCache stores generated text by content hash (model, prompt
+template version, input segments), in memory and on disk, and lets
+concurrent identical requests share one API call.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from dotenv import load_dotenv
+
+try:
+    from llm_gateway import get_gateway, PRIORITY_INTERACTIVE, PRIORITY_SUMMARY
+except ImportError:  # Imported as src.llm_client
+    from src.llm_gateway import get_gateway, PRIORITY_INTERACTIVE, PRIORITY_SUMMARY
+
+load_dotenv()
+
+# Latest Gemini models, in order of preference
+MODEL_CANDIDATES = [
+    "models/gemini-2.5-flash",           # Latest, fastest
+    "models/gemini-2.0-flash",           # Stable, fast
+    "models/gemini-flash-latest",        # Auto-updated
+    "models/gemini-pro-latest",          # High quality
+    "models/gemini-2.5-pro",             # Most powerful
+]
+
+CACHE_DIR = os.getenv("MEETINGAI_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "meetingai"))
+MODEL_CACHE_FILE = os.path.join(CACHE_DIR, "llm_model.json")
+MODEL_CACHE_TTL = int(os.getenv("MEETINGAI_MODEL_CACHE_TTL", str(24 * 3600)))  # seconds
+RESPONSE_CACHE_DIR = os.path.join(CACHE_DIR, "responses")
+RESPONSE_CACHE_TTL = int(os.getenv("MEETINGAI_RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def get_api_key():
+    return os.getenv("GENAI_API_KEY")
+
+
+def get_genai():
+    """Import and configure google.generativeai on first use"""
+    global _genai
+    with _genai_lock:
+        if _genai is None:
+            import google.generativeai as genai
+            genai.configure(api_key=get_api_key())
+            _genai = genai
+    return _genai
+
+
+def _load_cached_model_name():
+    """Resolved model name from disk, or None if missing/expired"""
+    try:
+        with open(MODEL_CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if time.time() - data.get('resolved_at', 0) < MODEL_CACHE_TTL:
+            return data.get('model')
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _save_cached_model_name(model_name):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(MODEL_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'model': model_name, 'resolved_at': time.time()}, f)
+    except OSError as e:
+        print(f"⚠️ Could not cache model name: {e}")
+
+
+def _is_model_unavailable(error):
+    """True if the error means 'this model does not exist / is not allowed' (try the next one)"""
+    name = type(error).__name__
+    message = str(error).lower()
+    return (
+        name in ("NotFound", "PermissionDenied") or
+        "404" in message or
+        "not found" in message or
+        "is not supported" in message
+    )
+
+
+class LazyModel:
+    """
+    Drop-in stand-in for genai.GenerativeModel
+
+    The concrete model is chosen on the first generate_content() call.
+    Falsy when no API key is configured, so existing `if not model:`
+    checks keep working without any network call.
+    """
+
+    def __init__(self, candidates=None):
+        self.candidates = list(candidates or MODEL_CANDIDATES)
+        self.model_name = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(get_api_key())
+
+    def _candidate_order(self):
+        cached = _load_cached_model_name()
+        if cached in self.candidates:
+            return [cached] + [c for c in self.candidates if c != cached]
+        return self.candidates
+
+    def generate_content(self, *args, **kwargs):
+        """Same signature as GenerativeModel.generate_content"""
+        if self._model is not None:
+            return self._model.generate_content(*args, **kwargs)
+
+        with self._lock:
+            if self._model is not None:
+                return self._model.generate_content(*args, **kwargs)
+
+            genai = get_genai()
+            last_error = None
+
+            for model_name in self._candidate_order():
+                model = genai.GenerativeModel(model_name)
+                try:
+                    response = model.generate_content(*args, **kwargs)
+                except Exception as e:
+                    if not _is_model_unavailable(e):
+                        raise  # Quota, network, ... - not the model's fault
+                    print(f"⚠️ {model_name} not available: {str(e)[:50]}")
+                    last_error = e
+                    continue
+
+                self._model = model
+                self.model_name = model_name
+                _save_cached_model_name(model_name)
+                print(f"✅ Using Gemini: {model_name}")
+                return response
+
+            raise RuntimeError(f"No Gemini model available: {last_error}")
+
+    def reset(self):
+        """Forget the resolved model (next request resolves again)"""
+        with self._lock:
+            self._model = None
+            self.model_name = None
+
+
+def iter_text(response):
+    """
+    Text pieces of a response as they arrive
+
+    Works for stream=True responses and plain ones; blocked or empty
+    chunks are skipped (check the finish reason after the loop).
+    """
+    chunks = response if hasattr(response, '__iter__') else [response]
+    for chunk in chunks:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue  # Blocked chunk raises on .text
+        if text:
+            yield text
+
+
+class GatewayModel:
+    """
+    The shared model seen at one priority
+
+    generate_content() is queued in the LLM gateway, so it is rate limited,
+    retried on 429/5xx and ordered behind more urgent requests.
+    """
+
+    def __init__(self, model, priority):
+        self.model = model
+        self.priority = priority
+
+    def __bool__(self):
+        return bool(self.model)
+
+    @property
+    def model_name(self):
+        return self.model.model_name
+
+    def generate_content(self, *args, timeout=None, **kwargs):
+        """Same signature as GenerativeModel.generate_content (+ optional gateway timeout)"""
+        gateway = get_gateway()
+        timeout = gateway.timeout_for(self.priority, timeout)
+        # The SDK enforces the per-attempt deadline, so a timed-out request really stops
+        request_options = dict(kwargs.pop('request_options', None) or {})
+        request_options.setdefault('timeout', timeout)
+        return gateway.call(
+            self.model.generate_content, *args, request_options=request_options,
+            priority=self.priority, key=_rate_limit_key(), timeout=timeout, **kwargs
+        )
+
+
+def _rate_limit_key():
+    """One rate-limit bucket per API key (without keeping the key itself around)"""
+    api_key = get_api_key() or ""
+    return api_key[-6:] or "default"
+
+
+# Shared model instance (+ one gateway view per priority)
+_shared_model = LazyModel()
+_views = {}
+
+
+def get_model(priority=PRIORITY_SUMMARY):
+    """
+    Shared lazily-resolved Gemini model
+
+    Args:
+        priority: PRIORITY_INTERACTIVE (conversation), PRIORITY_SUMMARY or
+                  PRIORITY_BACKGROUND (rolling summaries, grammar, ...)
+
+    Returns:
+        GatewayModel: Model with generate_content(), falsy without an API key
+    """
+    if priority not in _views:
+        _views[priority] = GatewayModel(_shared_model, priority)
+    return _views[priority]
+
+
+def model_cache_key(llm):
+    """Model name for cache keys (resolved name, last known name, or class name for stubs)"""
+    if isinstance(llm, GatewayModel):
+        llm = llm.model
+    if isinstance(llm, LazyModel):
+        return llm.model_name or _load_cached_model_name() or llm.candidates[0]
+    return getattr(llm, 'model_name', None) or type(llm).__name__
+
+
+class ResponseCache:
+    """
+    Content-addressed cache for LLM responses
+
+    Entries live in a small in-memory LRU and as one JSON file per key on
+    disk. get_or_compute() coalesces concurrent requests for the same key:
+    the first caller makes the API call, the others wait for its result.
+    Callers that can't wrap their request in one function (e.g. streaming)
+    use claim() / finish() directly.
+    """
+
+    def __init__(self, directory=RESPONSE_CACHE_DIR, max_entries=256, ttl=RESPONSE_CACHE_TTL):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._memory = OrderedDict()   # key -> (text, created_at)
+        self._inflight = {}            # key -> Future
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts):
+        """SHA-256 of the JSON-encoded key parts"""
+        data = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key, text, created_at):
+        """Add to the memory LRU (caller holds the lock)"""
+        self._memory[key] = (text, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key):
+        """Memory, then disk (caller holds the lock)"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            if time.time() - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                return entry[0]
+            del self._memory[key]
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if time.time() - data.get('created_at', 0) < self.ttl:
+                self._remember(key, data['text'], data['created_at'])
+                return data['text']
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def get(self, key):
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key, text):
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, text, created_at)
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'text': text, 'created_at': created_at}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"⚠️ Could not write response cache: {e}")
+
+    def claim(self, key):
+        """
+        Look up `key` and register the caller's request if it is missing
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            tuple: (cached text or None, Future or None, owner) - on a miss
+                   the owner must make the request and call finish(); other
+                   callers wait on future.result()
+        """
+        with self._lock:
+            text = self._lookup(key)
+            if text is not None:
+                self.hits += 1
+                return text, None, False
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+            return None, future, owner
+
+    def finish(self, key, future, text="", error=None, store=True):
+        """
+        Publish the owner's result to waiting callers (and cache it)
+
+        Args:
+            key: Key passed to claim()
+            future: Future returned by claim()
+            text: Response text (empty results are not cached)
+            error: Exception to raise in waiting callers instead
+            store: False to hand `text` to waiters without caching it
+        """
+        try:
+            if error is None and text and store:
+                self.put(key, text)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(text)
+
+    def get_or_compute(self, key, compute, timeout=None):
+        """
+        Cached text for `key`, or the result of compute()
+
+        Args:
+            key: Cache key from make_key()
+            compute: Callable() -> str (empty results are not cached)
+            timeout: Seconds to wait for an identical request that is
+                     already running (None = no limit)
+
+        Returns:
+            str: Response text
+
+        Raises:
+            concurrent.futures.TimeoutError: The running request took too long
+        """
+        text, future, owner = self.claim(key)
+        if text is not None:
+            return text
+        if not owner:
+            return future.result(timeout)  # Same request already running
+
+        try:
+            text = compute()
+        except Exception as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, text)
+        return text
+
+    def clear(self):
+        """Drop all entries (memory and disk)"""
+        with self._lock:
+            self._memory.clear()
+        try:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+
+
+# Shared response cache
+response_cache = ResponseCache()
+
+
+def get_response_cache():
+    """Shared LLM response cache"""
+    return response_cache
+
+
+def health_check(timeout=10):
+    """
+    Explicit connectivity probe (the only place that sends a test prompt)
+
+    Returns:
+        dict: {'ok': bool, 'model': str or None, 'latency': float, 'error': str or None}
+    """
+    if not get_api_key():
+        return {'ok': False, 'model': None, 'latency': 0.0, 'error': "GENAI_API_KEY not set"}
+
+    start = time.time()
+    try:
+        get_model(PRIORITY_INTERACTIVE).generate_content("Hi", request_options={'timeout': timeout})
+        return {'ok': True, 'model': get_model().model_name, 'latency': time.time() - start, 'error': None}
+    except Exception as e:
+        return {'ok': False, 'model': get_model().model_name, 'latency': time.time() - start, 'error': str(e)}
+
+
+if __name__ == "__main__":
+    print(health_check())
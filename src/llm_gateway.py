@@ -0,0 +1,355 @@
+# llm_gateway.py - Rate-limited, prioritised gateway for LLM calls
+"""
+Asyncio LLM gateway
+
+Every Gemini request goes through one event loop (own thread) that:
+- rate limits per API key with a token bucket (free tier: 60 RPM)
+- dispatches by priority: interactive conversation > summaries > background
+- keeps a few tokens in reserve so background jobs can't starve conversation
+- retries rate-limit / transient errors with exponential backoff + jitter
+- bounds each attempt: the timeout goes to the SDK call itself (see
+  GatewayModel), a call still running after it is reported as timed out
+  but keeps its concurrency slot until its thread finishes, and is never
+  retried (that would send a duplicate request)
+- records latency, queue wait, retries and token usage per priority
+
+Synchronous code calls gateway.call(...); async code awaits gateway.generate(...).
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SUMMARY = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_SUMMARY: "summary",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Seconds allowed per attempt
+DEFAULT_TIMEOUTS = {
+    PRIORITY_INTERACTIVE: 20.0,
+    PRIORITY_SUMMARY: 120.0,
+    PRIORITY_BACKGROUND: 60.0,
+}
+
+LLM_RPM = float(os.getenv("MEETINGAI_LLM_RPM", "60"))                  # Requests per minute per key
+LLM_BURST = int(os.getenv("MEETINGAI_LLM_BURST", "5"))                 # Bucket size
+LLM_CONCURRENCY = int(os.getenv("MEETINGAI_LLM_CONCURRENCY", "8"))     # Requests in flight
+INTERACTIVE_RESERVE = 1    # Tokens background jobs must leave for interactive turns
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0         # Seconds, doubled per retry
+BACKOFF_MAX = 30.0
+TIMEOUT_GRACE = 5.0        # Seconds past the SDK deadline before a call counts as stuck
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, needed=1.0):
+        """Seconds until `needed` tokens are available (0 if available now)"""
+        self._refill()
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self, count=1.0):
+        self._refill()
+        self.tokens -= count
+
+    async def acquire(self):
+        """Wait for and take one token"""
+        while True:
+            delay = self.wait_time()
+            if delay <= 0:
+                self.take()
+                return
+            await asyncio.sleep(delay)
+
+
+def is_retryable(error):
+    """Rate limit, quota or transient server/network errors"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    name = type(error).__name__
+    message = str(error).lower()
+    return (
+        name in ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+                 "DeadlineExceeded", "InternalServerError") or
+        "429" in message or
+        "503" in message or
+        "quota" in message or
+        "rate limit" in message or
+        "temporarily" in message
+    )
+
+
+class _Stats:
+    """Metrics of one priority class"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.latencies = deque(maxlen=200)      # Request start -> response
+        self.queue_waits = deque(maxlen=200)    # Submit -> dispatch
+
+    def summary(self):
+        def percentile(values, p):
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'retries': self.retries,
+            'timeouts': self.timeouts,
+            'prompt_tokens': self.prompt_tokens,
+            'output_tokens': self.output_tokens,
+            'latency_p50': percentile(self.latencies, 0.5),
+            'latency_p95': percentile(self.latencies, 0.95),
+            'queue_wait_p95': percentile(self.queue_waits, 0.95),
+        }
+
+
+class _Request:
+    def __init__(self, fn, args, kwargs, priority, key, timeout, future):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.key = key
+        self.timeout = timeout
+        self.future = future
+        self.submitted = time.monotonic()
+
+
+class LLMGateway:
+    """
+    Priority dispatcher + rate limiter for blocking LLM calls
+
+    The loop runs in its own daemon thread (started on first use); the
+    blocking SDK call itself runs in the loop's default thread pool.
+    """
+
+    def __init__(self, rpm=LLM_RPM, burst=LLM_BURST, concurrency=LLM_CONCURRENCY,
+                 max_retries=MAX_RETRIES, timeouts=None):
+        self.rate = rpm / 60.0
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+
+        self.stats = {priority: _Stats() for priority in PRIORITY_NAMES}
+        self._buckets = {}        # key -> TokenBucket
+        self._heap = []           # (priority, seq, request)
+        self._seq = itertools.count()
+        self._loop = None
+        self._wakeup = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Loop thread
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+
+            ready = threading.Event()
+
+            def run():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                self._wakeup = asyncio.Event()
+                self._slots = asyncio.Semaphore(self.concurrency)
+                self._loop = loop
+                loop.create_task(self._dispatcher())
+                ready.set()
+                loop.run_forever()
+
+            threading.Thread(target=run, daemon=True, name="llm-gateway").start()
+            ready.wait()
+            return self._loop
+
+    def _bucket(self, key):
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(self.rate, self.burst)
+        return self._buckets[key]
+
+    async def _dispatcher(self):
+        """Start the highest-priority request as soon as a slot and a token are free"""
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            await self._slots.acquire()
+
+            priority, _, request = self._heap[0]
+            bucket = self._bucket(request.key)
+            needed = 1 + (INTERACTIVE_RESERVE if priority == PRIORITY_BACKGROUND else 0)
+            delay = bucket.wait_time(min(needed, bucket.capacity))
+            if delay > 0:
+                # Wait for tokens, but re-check early if a new (maybe more urgent) request arrives
+                self._slots.release()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            bucket.take()
+            asyncio.get_running_loop().create_task(self._execute(request))
+
+    async def _execute(self, request):
+        stats = self.stats[request.priority]
+        stats.queue_waits.append(time.monotonic() - request.submitted)
+        loop = asyncio.get_running_loop()
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    # Exponential backoff with full jitter, then a fresh token
+                    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+                    stats.retries += 1
+                    await asyncio.sleep(delay)
+                    await self._bucket(request.key).acquire()
+
+                start = time.monotonic()
+                call = loop.run_in_executor(None, lambda: request.fn(*request.args, **request.kwargs))
+                done, _ = await asyncio.wait({call}, timeout=request.timeout + TIMEOUT_GRACE)
+                if not done:
+                    # The call ignored its deadline: fail the request now, but hold the
+                    # slot until the thread returns and don't retry (it may still succeed)
+                    stats.timeouts += 1
+                    print(f"⚠️ LLM {PRIORITY_NAMES[request.priority]} call still running after {request.timeout:.0f}s")
+                    if not request.future.done():
+                        request.future.set_exception(
+                            TimeoutError(f"LLM call did not finish within {request.timeout:.0f}s")
+                        )
+                    try:
+                        await call
+                    except Exception:
+                        pass
+                    stats.errors += 1
+                    return
+
+                try:
+                    response = call.result()
+                except Exception as e:
+                    if type(e).__name__ == "DeadlineExceeded":
+                        stats.timeouts += 1  # SDK deadline (the call has returned, retrying is safe)
+                    if attempt < self.max_retries and is_retryable(e):
+                        print(f"⚠️ LLM {PRIORITY_NAMES[request.priority]} call failed ({type(e).__name__}), retrying...")
+                        continue
+                    raise
+
+                stats.calls += 1
+                stats.latencies.append(time.monotonic() - start)
+                usage = getattr(response, 'usage_metadata', None)
+                if usage is not None:
+                    stats.prompt_tokens += getattr(usage, 'prompt_token_count', 0) or 0
+                    stats.output_tokens += getattr(usage, 'candidates_token_count', 0) or 0
+                if not request.future.done():
+                    request.future.set_result(response)
+                return
+
+        except Exception as e:
+            stats.errors += 1
+            if not request.future.done():
+                request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, request):
+        heapq.heappush(self._heap, (request.priority, next(self._seq), request))
+        self._wakeup.set()
+
+    async def generate(self, fn, *args, priority=PRIORITY_SUMMARY, key="default", timeout=None, **kwargs):
+        """
+        Run a blocking LLM call through the gateway (from async code)
+
+        Args:
+            fn: Blocking callable, e.g. model.generate_content
+            priority: PRIORITY_INTERACTIVE / PRIORITY_SUMMARY / PRIORITY_BACKGROUND
+            key: Rate-limit key (one bucket per API key)
+            timeout: Seconds per attempt (default depends on priority); fn
+                should enforce it itself (GatewayModel passes it to the SDK)
+
+        Returns:
+            The callable's return value
+        """
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(
+            self._submit(fn, args, kwargs, priority, key, timeout), loop
+        )
+        return await asyncio.wrap_future(future)
+
+    async def _submit(self, fn, args, kwargs, priority, key, timeout):
+        future = asyncio.get_running_loop().create_future()
+        timeout = self.timeout_for(priority, timeout)
+        self._enqueue(_Request(fn, args, kwargs, priority, key, timeout, future))
+        return await future
+
+    def timeout_for(self, priority, timeout=None):
+        """Seconds per attempt for a request"""
+        return timeout or self.timeouts[priority]
+
+    def call(self, fn, *args, priority=PRIORITY_SUMMARY, key="default", timeout=None, **kwargs):
+        """Blocking version of generate() for synchronous code"""
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(
+            self._submit(fn, args, kwargs, priority, key, timeout), loop
+        )
+        return future.result()
+
+    def metrics(self):
+        """Per-priority metrics + queue length"""
+        return {
+            'queued': len(self._heap),
+            **{PRIORITY_NAMES[p]: stats.summary() for p, stats in self.stats.items()}
+        }
+
+
+# Shared gateway
+llm_gateway = LLMGateway()
+
+
+def get_gateway():
+    """Shared LLM gateway"""
+    return llm_gateway
@@ -0,0 +1,549 @@
+# meeting_session.py - Per-meeting pipeline state and session manager
+"""
+Multi-session meeting server
+
+Each meeting owns its capture source, segmenter, speaker identifier and
+transcript store. Model instances (Whisper, translator) are shared, and a
+scheduler hands out transcription capacity round-robin across meetings.
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+try:
+    from caption_server import publish_caption
+    from inference_pool import RESULT_TIMEOUT
+except ImportError:  # Imported as src.meeting_session
+    from src.caption_server import publish_caption
+    from src.inference_pool import RESULT_TIMEOUT
+
+# Seconds stop() waits for captured audio to be transcribed before saving
+STOP_DRAIN_TIMEOUT = float(os.getenv("MEETINGAI_STOP_DRAIN_TIMEOUT", "30"))
+# Seconds a stopped, unused meeting stays in memory (0 = until the process exits)
+SESSION_IDLE_TTL = float(os.getenv("MEETINGAI_SESSION_TTL", "3600"))
+
+
+# Saved meetings (transcript + structured summary), one JSON file per meeting
+MEETINGS_DIR = os.getenv(
+    "MEETINGAI_MEETINGS_DIR", os.path.join(os.path.expanduser("~"), ".cache", "meetingai", "meetings")
+)
+
+
+class AudioSegmenter:
+    """
+    Groups small capture blocks into utterance-sized chunks
+
+    A chunk is emitted after a pause (enough speech + a few silent blocks)
+    or when the maximum length is reached.
+    """
+
+    def __init__(self, min_samples=8000, max_samples=32000, silence_blocks=2, amplitude_threshold=0.005):
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.silence_blocks = silence_blocks
+        self.amplitude_threshold = amplitude_threshold
+        self.reset()
+
+    def reset(self):
+        self.buffer = []
+        self.total_samples = 0
+        self.silence_counter = 0
+
+    def feed(self, audio_chunk):
+        """
+        Add one capture block
+
+        Returns:
+            np.ndarray of combined audio when a segment is complete, else None
+        """
+        audio_np = np.squeeze(audio_chunk).astype(np.float32)
+        if audio_np.ndim == 0:
+            audio_np = audio_np.reshape(1)
+
+        if np.max(np.abs(audio_np)) > self.amplitude_threshold:
+            self.buffer.append(audio_np)
+            self.total_samples += len(audio_np)
+            self.silence_counter = 0
+        else:
+            self.silence_counter += 1
+
+        if not self.buffer:
+            return None
+
+        should_process = (
+            (self.total_samples >= self.min_samples and self.silence_counter >= self.silence_blocks) or
+            self.total_samples >= self.max_samples
+        )
+        if not should_process:
+            return None
+
+        combined_audio = np.concatenate(self.buffer)
+        self.reset()
+        return combined_audio
+
+    def flush(self):
+        """Remaining speech (end of capture), or None"""
+        if not self.buffer:
+            return None
+        combined_audio = np.concatenate(self.buffer)
+        self.reset()
+        return combined_audio
+
+
+class LocalCaptureSource:
+    """System audio capture (loopback device) feeding one session's queue"""
+
+    def __init__(self, audio_queue):
+        self.audio_queue = audio_queue
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        from audio_listener import start_listening
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=start_listening(out_queue=self.audio_queue, stop_event=self.stop_event),
+            daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class TranscriptionScheduler:
+    """
+    Shares transcription capacity fairly across meetings
+
+    Jobs are queued per session and workers serve sessions round-robin.
+    A session has at most one job in flight, so its segments stay in
+    order and one busy room cannot occupy every worker.
+    """
+
+    def __init__(self, workers=2, max_pending=20):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = {}       # session id -> deque of (fn, args)
+        self._ready = deque()    # session ids with pending work and nothing in flight
+        self._busy = set()
+        self._cond = threading.Condition()
+        self._threads = []
+        self.dropped = 0
+
+    def _ensure_workers(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True, name=f"transcribe-{i}")
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, session_id, fn, *args):
+        """Queue a job for a session (oldest job is dropped if the session is too far behind)"""
+        with self._cond:
+            self._ensure_workers()
+            jobs = self._pending.setdefault(session_id, deque())
+            if len(jobs) >= self.max_pending:
+                jobs.popleft()
+                self.dropped += 1
+                print(f"⚠️ [{session_id}] Transcription backlog full - dropped oldest segment")
+            jobs.append((fn, args))
+            if session_id not in self._busy and session_id not in self._ready:
+                self._ready.append(session_id)
+                self._cond.notify()
+
+    def cancel(self, session_id):
+        """Drop all pending jobs of a session"""
+        with self._cond:
+            self._pending.pop(session_id, None)
+            if session_id in self._ready:
+                self._ready.remove(session_id)
+
+    def pending(self, session_id):
+        with self._cond:
+            return len(self._pending.get(session_id, ()))
+
+    def drain(self, session_id, timeout=None):
+        """
+        Wait until a session's queued and running jobs are done
+
+        Returns:
+            bool: False on timeout (jobs still queued or running)
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: session_id not in self._pending and session_id not in self._busy, timeout
+            )
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._ready:
+                    self._cond.wait()
+                session_id = self._ready.popleft()
+                fn, args = self._pending[session_id].popleft()
+                self._busy.add(session_id)
+
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"❌ [{session_id}] {e}")
+            finally:
+                with self._cond:
+                    self._busy.discard(session_id)
+                    if self._pending.get(session_id):
+                        self._ready.append(session_id)
+                    else:
+                        self._pending.pop(session_id, None)
+                    self._cond.notify_all()  # Idle workers and drain()
+
+
+class MeetingSession:
+    """
+    State and pipeline of one meeting
+    """
+
+    def __init__(self, meeting_id, pipeline, scheduler, capture_factory=LocalCaptureSource):
+        """
+        Args:
+            meeting_id: Unique meeting id
+            pipeline: Dict of shared functions - 'transcribe', 'translate',
+                      'quick_translate' and 'speaker_factory', plus an optional
+                      'pool' (InferencePool) that runs speaker id + transcription
+                      in worker processes and an optional 'summarizer_factory'
+                      (Callable(on_update=) -> RollingSummarizer)
+            scheduler: Shared TranscriptionScheduler
+            capture_factory: Callable(audio_queue) -> capture source
+        """
+        self.meeting_id = meeting_id
+        self.pipeline = pipeline
+        self.scheduler = scheduler
+        self.capture_factory = capture_factory
+
+        self.running_flag = threading.Event()
+        self.audio_queue = queue.Queue(maxsize=100)
+        self.segmenter = AudioSegmenter()
+        self.speaker_identifier = pipeline['speaker_factory']()
+        self.capture = None
+        self.thread = None
+        self.caches = {}
+
+        summarizer_factory = pipeline.get('summarizer_factory')
+        self.rolling_summary = summarizer_factory(
+            on_update=lambda snapshot: self.publish("summary", snapshot)
+        ) if summarizer_factory else None
+
+        self.all_transcripts = []
+        self.transcript_counter = [0]
+        self.current_segment = self._empty_segment()
+        self.created_at = time.time()
+        self.last_used = time.time()  # Last get() / stop(), for idle eviction
+        self.summary = None           # Structured summary (summary_schema)
+        self.summary_segments = 0     # Segments covered by self.summary
+        self.saved_path = None
+
+    @staticmethod
+    def _empty_segment():
+        return {
+            "speaker": None,
+            "text": "",
+            "text_bn_temp": "",      # Phase 1: Word-by-word (temporary)
+            "text_bn_final": "",     # Phase 2: Context-aware (saved)
+            "is_translating": False  # Flag to show translation in progress
+        }
+
+    def get_cache(self, name, factory):
+        """Per-session render cache (created on first use)"""
+        if name not in self.caches:
+            self.caches[name] = factory()
+        return self.caches[name]
+
+    def publish(self, event_type, data):
+        publish_caption(event_type, data, meeting_id=self.meeting_id)
+
+    def has_current_summary(self):
+        """True if the stored summary covers every committed segment"""
+        return self.summary is not None and self.summary_segments == len(self.all_transcripts)
+
+    def save_summary(self, summary):
+        """
+        Store a structured summary with the meeting (memory + JSON file)
+
+        Returns:
+            str: Path of the saved meeting file (None if it couldn't be written)
+        """
+        self.summary = summary
+        self.summary_segments = len(self.all_transcripts)
+
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", self.meeting_id)
+        started = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.created_at))
+        path = os.path.join(MEETINGS_DIR, f"{safe_id}-{started}.json")
+        try:
+            os.makedirs(MEETINGS_DIR, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'meeting_id': self.meeting_id,
+                    'started_at': self.created_at,
+                    'saved_at': time.time(),
+                    'summary': summary,
+                    'transcripts': self.all_transcripts,
+                }, f, ensure_ascii=False, indent=2)
+            self.saved_path = path
+            print(f"💾 [{self.meeting_id}] Summary saved: {path}")
+        except OSError as e:
+            print(f"⚠️ [{self.meeting_id}] Could not save summary: {e}")
+            self.saved_path = None
+        return self.saved_path
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self, capture_factory=None):
+        """
+        Start capture and transcription
+        
+        Args:
+            capture_factory: Optional capture source for this run (e.g. network ingest)
+        
+        Returns:
+            bool: False if the meeting is already running
+        """
+        if self.thread is not None and self.thread.is_alive():
+            return False
+
+        if capture_factory is not None:
+            self.capture_factory = capture_factory
+
+        self.all_transcripts = []
+        self.transcript_counter[0] = 0
+        self.current_segment = self._empty_segment()
+        self.created_at = time.time()
+        self.summary = None
+        self.summary_segments = 0
+        self.saved_path = None
+        self.segmenter.reset()
+        self.speaker_identifier.reset()
+        if self.pipeline.get('pool') is not None:
+            self.pipeline['pool'].reset_session(self.meeting_id)
+        for cache in self.caches.values():
+            cache.invalidate()
+        if self.rolling_summary is not None:
+            self.rolling_summary.reset()
+
+        self.running_flag.set()
+        self.thread = threading.Thread(target=self._meeting_loop, daemon=True, name=f"meeting-{self.meeting_id}")
+        self.thread.start()
+        self.publish("status", {"running": True, "segments": 0})
+        return True
+
+    def stop(self, timeout=STOP_DRAIN_TIMEOUT):
+        """
+        Stop the meeting and save the open segment
+
+        Audio captured before the stop is still transcribed (up to `timeout`
+        seconds) so the end of the meeting is not lost.
+        """
+        self.running_flag.clear()
+        self.last_used = time.time()
+        deadline = time.time() + timeout
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)  # Loop hands its last audio to the scheduler
+        if not self.scheduler.drain(self.meeting_id, max(0.0, deadline - time.time())):
+            print(f"⚠️ [{self.meeting_id}] Transcription not finished after {timeout:.0f}s, dropping the rest")
+            self.scheduler.cancel(self.meeting_id)
+            # A job still running finishes into the open segment; give it the rest of a moment
+            self.scheduler.drain(self.meeting_id, 2.0)
+
+        segment = self.current_segment
+        if segment["text"]:
+            if segment["is_translating"]:
+                time.sleep(1)  # Wait for translation
+
+            self._commit(segment["speaker"], segment["text"], segment["text_bn_final"])
+            self.current_segment = self._empty_segment()
+
+        if self.rolling_summary is not None:
+            self.rolling_summary.flush()  # Final summary is ready shortly after stop
+
+        self.publish("status", {"running": False, "segments": len(self.all_transcripts)})
+
+    def _meeting_loop(self):
+        """Background thread: capture -> segmenter -> scheduler"""
+        print(f"🎙️ [{self.meeting_id}] Meeting loop started (2-PHASE TRANSLATION)")
+
+        self.capture = self.capture_factory(self.audio_queue)
+        self.capture.start()
+
+        while self.running_flag.is_set():
+            try:
+                audio_chunk = self.audio_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            try:
+                combined_audio = self.segmenter.feed(audio_chunk)
+                if combined_audio is not None:
+                    self.scheduler.submit(self.meeting_id, self.process_audio, combined_audio)
+            except Exception as e:
+                print(f"❌ [{self.meeting_id}] Segmenter error: {e}")
+
+        self.capture.stop()
+
+        # Audio captured before the stop still gets transcribed
+        try:
+            while True:
+                combined_audio = self.segmenter.feed(self.audio_queue.get_nowait())
+                if combined_audio is not None:
+                    self.scheduler.submit(self.meeting_id, self.process_audio, combined_audio)
+        except queue.Empty:
+            pass
+        except Exception as e:
+            print(f"❌ [{self.meeting_id}] Segmenter error: {e}")
+        combined_audio = self.segmenter.flush()
+        if combined_audio is not None:
+            self.scheduler.submit(self.meeting_id, self.process_audio, combined_audio)
+        print(f"🛑 [{self.meeting_id}] Stopped")
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+
+    def _commit(self, speaker, text, text_bn):
+        """Save a finished segment (ONLY the final context-aware translation)"""
+        segment = {
+            "id": self.transcript_counter[0],
+            "speaker": speaker,
+            "en": text,
+            "bn": text_bn if text_bn else "[Translation pending]",
+            "time": time.strftime("%H:%M:%S")
+        }
+        self.all_transcripts.append(segment)
+        self.transcript_counter[0] += 1
+        self.publish("final", segment)
+        if self.rolling_summary is not None:
+            self.rolling_summary.add(segment)
+        print(f"💾 [{self.meeting_id}] Saved segment {self.transcript_counter[0]}")
+        return segment
+
+    def _translate_async(self, segment, speaker, text):
+        """Phase 2: Background context-aware translation of the open segment"""
+        def translate():
+            final_bn = self.pipeline['translate'](text)
+            segment["text_bn_final"] = final_bn
+            segment["is_translating"] = False
+            self.publish("translation", {"speaker": speaker, "text": text, "text_bn": final_bn})
+
+        threading.Thread(target=translate, daemon=True).start()
+
+    def process_audio(self, audio):
+        """Identify speaker, transcribe and update the open segment"""
+        pool = self.pipeline.get('pool')
+        if pool is not None:
+            # Worker process does the CPU work, this thread just waits (bounded)
+            try:
+                speaker, text = pool.process_audio(self.meeting_id, audio).result(RESULT_TIMEOUT)
+            except FutureTimeoutError:
+                print(f"⚠️ [{self.meeting_id}] Inference worker timed out after {RESULT_TIMEOUT:.0f}s, chunk skipped")
+                return
+        else:
+            speaker = self.speaker_identifier.identify_speaker(audio, samplerate=16000)
+            text = self.pipeline['transcribe'](audio)
+
+        if not text or len(text.strip()) <= 2:
+            return
+
+        print(f"⚡ [{self.meeting_id}] [{speaker}] {text}")
+        segment = self.current_segment
+
+        if segment["speaker"] == speaker:
+            # Same speaker - keep appending
+            segment["text"] += " " + text
+        else:
+            if segment["text"]:
+                # Different speaker - save previous & start new
+                if segment["is_translating"]:
+                    time.sleep(0.5)  # Short wait for translation to complete
+                self._commit(segment["speaker"], segment["text"], segment["text_bn_final"])
+
+            if segment["speaker"] is not None:
+                self.publish("speaker", {"from": segment["speaker"], "to": speaker})
+
+            segment = self._empty_segment()
+            segment["speaker"] = speaker
+            segment["text"] = text
+            self.current_segment = segment
+
+        # Phase 1: Instant word-by-word (NOT SAVED)
+        segment["text_bn_temp"] = self.pipeline['quick_translate'](segment["text"])
+        segment["is_translating"] = True
+        self.publish("partial", {"speaker": speaker, "text": segment["text"], "text_bn": segment["text_bn_temp"]})
+
+        self._translate_async(segment, speaker, segment["text"])
+
+
+class SessionManager:
+    """
+    Owns all meetings of this process, keyed by meeting id
+
+    Stopped meetings that nobody has asked for in idle_ttl seconds are
+    dropped, so finished meetings don't stay in memory for the process's life.
+    """
+
+    def __init__(self, pipeline, workers=None, capture_factory=LocalCaptureSource, idle_ttl=SESSION_IDLE_TTL):
+        if workers is None:
+            workers = int(os.getenv("MEETINGAI_TRANSCRIBE_WORKERS", "2"))
+        self.pipeline = pipeline
+        self.idle_ttl = idle_ttl
+        self.capture_factory = capture_factory
+        self.scheduler = TranscriptionScheduler(workers=workers)
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, meeting_id, create=True):
+        """Get a meeting session (created on first use)"""
+        meeting_id = (meeting_id or "default").strip() or "default"
+        with self._lock:
+            self._evict_idle()
+            session = self.sessions.get(meeting_id)
+            if session is None and create:
+                session = MeetingSession(meeting_id, self.pipeline, self.scheduler, self.capture_factory)
+                self.sessions[meeting_id] = session
+                print(f"🆕 Meeting session created: {meeting_id}")
+            if session is not None:
+                session.last_used = time.time()
+            return session
+
+    def _evict_idle(self):
+        """Forget stopped meetings unused for idle_ttl seconds (caller holds the lock)"""
+        if not self.idle_ttl:
+            return
+        cutoff = time.time() - self.idle_ttl
+        for meeting_id, session in list(self.sessions.items()):
+            thread = session.thread
+            if session.running_flag.is_set() or (thread is not None and thread.is_alive()):
+                continue
+            if session.last_used < cutoff:
+                del self.sessions[meeting_id]
+                print(f"🧹 Meeting session evicted after {self.idle_ttl:.0f}s idle: {meeting_id}")
+
+    def remove(self, meeting_id):
+        """Stop and forget a meeting"""
+        with self._lock:
+            session = self.sessions.pop(meeting_id, None)
+        if session is not None and session.running_flag.is_set():
+            session.stop()
+
+    def active_sessions(self):
+        with self._lock:
+            return [s for s in self.sessions.values() if s.running_flag.is_set()]
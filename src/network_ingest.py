@@ -0,0 +1,409 @@
+# network_ingest.py - Network audio ingest for thin capture clients
+"""
+Accepts 16 kHz audio over TCP so capture and inference can run on
+different machines.
+
+Protocol (raw TCP):
+    1. Client sends one JSON line:
+           {"meeting": "room-1", "codec": "pcm16", "samplerate": 16000}
+       codec is "pcm16" (16-bit little-endian mono) or "opus"
+    2. Server answers one JSON line: {"status": "ok"} or {"status": "error", "error": "..."}
+    3. Client sends frames: header (type: u8, sequence: u32, length: u16, big-endian)
+       followed by `length` payload bytes. Type 1 = audio, type 2 = end of stream.
+
+Frames pass through a small jitter buffer (reordering + gap concealment) and
+are pushed into the meeting session's audio queue, i.e. the same segmenter
+as local capture. When the session falls behind the reader stops reading,
+which pushes back on the client through TCP flow control.
+
+On the end-of-stream frame the meeting is stopped once its queued audio is
+consumed. After a dropped connection it keeps running for `reconnect_grace`
+seconds, so a client that reconnects continues the same transcript.
+"""
+
+import asyncio
+import json
+import struct
+import threading
+
+import numpy as np
+
+FRAME_HEADER = struct.Struct("!BIH")
+FRAME_AUDIO = 1
+FRAME_END = 2
+SAMPLERATE = 16000
+CODECS = ("pcm16", "opus")
+
+
+class NetworkCaptureSource:
+    """
+    Capture source for sessions fed by the ingest server
+
+    The ingest server writes into the session queue directly, so start/stop
+    only track whether a stream is attached.
+    """
+
+    def __init__(self, audio_queue):
+        self.audio_queue = audio_queue
+        self.active = False
+
+    def start(self):
+        self.active = True
+
+    def stop(self):
+        self.active = False
+
+
+class JitterBuffer:
+    """
+    Reorders frames by sequence number
+
+    Frames are released in order. If a frame is still missing once `depth`
+    later frames are waiting, it is concealed with silence of the same length
+    as the previous frame. Gaps longer than `max_gap` frames (client stalled,
+    sequence jump) are skipped instead of being filled with silence.
+    """
+
+    def __init__(self, depth=4, max_gap=25):
+        self.depth = depth
+        self.max_gap = max_gap
+        self.frames = {}
+        self.next_sequence = None
+        self.last_length = 320
+        self.concealed = 0
+        self.skipped = 0
+        self.late = 0
+
+    def push(self, sequence, samples):
+        """
+        Add a frame
+
+        Returns:
+            list of np.ndarray frames ready to play, in order
+        """
+        if self.next_sequence is None:
+            self.next_sequence = sequence
+
+        if sequence < self.next_sequence:
+            self.late += 1  # Already concealed or duplicate
+            return []
+
+        self.frames[sequence] = samples
+        ready = []
+
+        while True:
+            frame = self.frames.pop(self.next_sequence, None)
+            if frame is None:
+                if len(self.frames) < self.depth:
+                    break
+                gap = min(self.frames) - self.next_sequence
+                if gap > self.max_gap:
+                    self.skipped += gap
+                    self.next_sequence += gap
+                    continue
+                frame = np.zeros(self.last_length, dtype=np.float32)
+                self.concealed += 1
+            else:
+                self.last_length = len(frame)
+            ready.append(frame)
+            self.next_sequence += 1
+
+        return ready
+
+    def flush(self):
+        """Release everything still buffered (end of stream)"""
+        ready = [self.frames[seq] for seq in sorted(self.frames)]
+        self.frames.clear()
+        return ready
+
+
+class _OpusDecoder:
+    """Lazy wrapper around opuslib (optional dependency)"""
+
+    def __init__(self):
+        import opuslib
+        self.decoder = opuslib.Decoder(SAMPLERATE, 1)
+
+    def decode(self, payload):
+        pcm = self.decoder.decode(payload, 1920)  # Up to 120 ms per frame
+        return np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def decode_pcm16(payload):
+    """16-bit little-endian PCM -> float32 in [-1, 1] (a trailing odd byte is ignored)"""
+    return np.frombuffer(payload[:len(payload) // 2 * 2], dtype='<i2').astype(np.float32) / 32768.0
+
+
+class IngestServer:
+    """
+    TCP ingest server feeding meeting sessions
+    """
+
+    def __init__(self, session_manager, host="0.0.0.0", port=7862, jitter_depth=4, max_stall=2.0,
+                 reconnect_grace=30.0):
+        self.session_manager = session_manager
+        self.host = host
+        self.port = port
+        self.jitter_depth = jitter_depth
+        self.max_stall = max_stall  # Seconds to wait on a full session queue before dropping
+        self.reconnect_grace = reconnect_grace  # Seconds a dropped stream's meeting keeps running
+        self.streams = {}  # meeting id -> peer address
+        self._expiry = {}  # meeting id -> pending stop of a dropped stream's meeting
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        print(f"🌐 Audio ingest listening on tcp://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    async def _reply(self, writer, **body):
+        writer.write((json.dumps(body) + "\n").encode('utf-8'))
+        await writer.drain()
+
+    def _attach(self, meeting_id, peer):
+        """Bind a stream to a meeting session, starting the meeting if needed"""
+        if meeting_id in self.streams:
+            return None, "meeting already has an audio stream"
+
+        session = self.session_manager.get(meeting_id)
+        if session.running_flag.is_set():
+            # Reconnect (or a meeting fed by ingest): keep its transcript
+            if session.capture_factory is not NetworkCaptureSource:
+                return None, "meeting is running with local capture"
+        elif not session.start(capture_factory=NetworkCaptureSource):
+            return None, "meeting is stopping, try again"
+
+        expiry = self._expiry.pop(meeting_id, None)
+        if expiry is not None:
+            expiry.cancel()
+        self.streams[meeting_id] = peer
+        return session, None
+
+    async def _detach(self, meeting_id, session, ended):
+        """
+        Release a stream's meeting
+
+        Args:
+            meeting_id: Meeting the stream was attached to
+            session: Its MeetingSession
+            ended: True on end-of-stream (stop now), False if the connection
+                   dropped (stop unless the client reconnects within the grace time)
+        """
+        self.streams.pop(meeting_id, None)
+        if not ended:
+            loop = asyncio.get_running_loop()
+            self._expiry[meeting_id] = loop.call_later(
+                self.reconnect_grace,
+                lambda: loop.create_task(self._detach(meeting_id, session, True))
+            )
+            return
+
+        self._expiry.pop(meeting_id, None)
+        if meeting_id in self.streams or not session.running_flag.is_set():
+            return  # Reconnected meanwhile, or already stopped from the UI
+
+        # Let the meeting loop take the queued audio before stopping
+        for _ in range(int(self.max_stall / 0.05)):
+            if session.audio_queue.empty():
+                break
+            await asyncio.sleep(0.05)
+        if meeting_id in self.streams:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, session.stop)
+        print(f"🌐 [{meeting_id}] Meeting stopped (audio stream closed)")
+
+    async def _handle_client(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        meeting_id = None
+        session = None
+        ended = False
+
+        try:
+            line = await asyncio.wait_for(reader.readline(), timeout=10)
+            try:
+                hello = json.loads(line.decode('utf-8'))
+            except ValueError:
+                hello = None
+            if not isinstance(hello, dict):
+                await self._reply(writer, status="error", error="invalid handshake")
+                return
+
+            meeting_id = str(hello.get('meeting') or "default")
+            codec = hello.get('codec', 'pcm16')
+            if codec not in CODECS:
+                await self._reply(writer, status="error", error=f"unsupported codec: {codec}")
+                return
+            try:
+                samplerate = int(hello.get('samplerate', SAMPLERATE))
+            except (TypeError, ValueError):
+                samplerate = None
+            if samplerate != SAMPLERATE:
+                await self._reply(writer, status="error", error="samplerate must be 16000")
+                return
+
+            if codec == "opus":
+                try:
+                    decode = _OpusDecoder().decode
+                except Exception as e:
+                    await self._reply(writer, status="error", error=f"opus not available: {e}")
+                    return
+            else:
+                decode = decode_pcm16
+
+            session, error = self._attach(meeting_id, peer)
+            if error:
+                await self._reply(writer, status="error", error=error)
+                session = None
+                return
+
+            await self._reply(writer, status="ok", meeting=session.meeting_id)
+            print(f"🌐 [{meeting_id}] Audio stream connected from {peer} ({codec})")
+
+            jitter = JitterBuffer(self.jitter_depth)
+            dropped = 0
+            corrupt = 0
+
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                frame_type, sequence, length = FRAME_HEADER.unpack(header)
+                payload = await reader.readexactly(length) if length else b""
+
+                if frame_type == FRAME_END:
+                    frames = jitter.flush()
+                elif frame_type == FRAME_AUDIO:
+                    try:
+                        samples = decode(payload)
+                    except Exception:
+                        samples = None
+                    if samples is None or not len(samples):
+                        corrupt += 1  # Skipped; the jitter buffer conceals the gap
+                        continue
+                    frames = jitter.push(sequence, samples)
+                else:
+                    continue
+
+                for frame in frames:
+                    if not await self._enqueue(session.audio_queue, frame):
+                        dropped += 1
+
+                if frame_type == FRAME_END:
+                    ended = True
+                    break
+
+            print(
+                f"🌐 [{meeting_id}] Stream ended (concealed {jitter.concealed}, skipped {jitter.skipped}, "
+                f"late {jitter.late}, dropped {dropped}, corrupt {corrupt})"
+            )
+
+        except asyncio.IncompleteReadError:
+            print(f"🌐 [{meeting_id}] Audio stream disconnected")
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"❌ Ingest error ({peer}): {e}")
+        finally:
+            if session is not None:
+                await self._detach(meeting_id, session, ended)
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _enqueue(self, audio_queue, frame):
+        """
+        Put a frame on the session queue
+
+        Waits (and stops reading the socket) while the queue is full.
+        After max_stall seconds the oldest queued frame is dropped instead.
+        """
+        waited = 0.0
+        while audio_queue.full():
+            if waited >= self.max_stall:
+                try:
+                    audio_queue.get_nowait()
+                except Exception:
+                    pass
+                break
+            await asyncio.sleep(0.01)
+            waited += 0.01
+
+        try:
+            audio_queue.put_nowait(frame)
+            return True
+        except Exception:
+            return False
+
+
+def start_ingest_server(session_manager, host="0.0.0.0", port=7862):
+    """
+    Run the ingest server in a background thread with its own event loop
+
+    Returns:
+        threading.Thread
+    """
+    server = IngestServer(session_manager, host, port)
+
+    def run():
+        try:
+            asyncio.run(server.serve_forever())
+        except Exception as e:
+            print(f"❌ Audio ingest error: {e}")
+
+    thread = threading.Thread(target=run, daemon=True, name="audio-ingest")
+    thread.start()
+    return thread
+
+
+def stream_microphone(host, port=7862, meeting_id="default", blocksize=320):
+    """
+    Thin client: send the local microphone to an ingest server (PCM16)
+    """
+    import queue
+    import socket
+    import sounddevice as sd
+
+    sock = socket.create_connection((host, port))
+    sock.sendall((json.dumps({"meeting": meeting_id, "codec": "pcm16", "samplerate": SAMPLERATE}) + "\n").encode('utf-8'))
+
+    reply = json.loads(sock.makefile('r').readline())
+    if reply.get('status') != "ok":
+        print(f"❌ Ingest refused: {reply.get('error')}")
+        sock.close()
+        return
+
+    print(f"✅ Streaming microphone to {host}:{port} (meeting '{meeting_id}')")
+    send_queue = queue.Queue(maxsize=500)
+    sequence = 0
+
+    def audio_callback(indata, frames, time_info, status):
+        # Never block the audio thread - the sender loop does the socket I/O
+        pcm = (np.clip(np.squeeze(indata), -1.0, 1.0) * 32767).astype('<i2').tobytes()
+        try:
+            send_queue.put_nowait(pcm)
+        except queue.Full:
+            pass
+
+    try:
+        with sd.InputStream(samplerate=SAMPLERATE, channels=1, dtype='float32',
+                            blocksize=blocksize, callback=audio_callback):
+            while True:
+                pcm = send_queue.get()
+                sock.sendall(FRAME_HEADER.pack(FRAME_AUDIO, sequence, len(pcm)) + pcm)
+                sequence += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.sendall(FRAME_HEADER.pack(FRAME_END, sequence, 0))
+        sock.close()
+        print("🛑 Streaming stopped")
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: python src/network_ingest.py <server-host> [port] [meeting-id]
+    target_host = sys.argv[1] if len(sys.argv) > 1 else "localhost"
+    target_port = int(sys.argv[2]) if len(sys.argv) > 2 else 7862
+    target_meeting = sys.argv[3] if len(sys.argv) > 3 else "default"
+    stream_microphone(target_host, target_port, target_meeting)
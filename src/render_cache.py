@@ -0,0 +1,109 @@
+# render_cache.py - Cached Markdown fragments for transcript views
+"""
+Render cache for transcript history and summaries
+Each segment is rendered to Markdown once and reused until it changes
+"""
+
+import threading
+
+
+def segment_key(index, segment):
+    """
+    Stable key for a transcript segment
+
+    Args:
+        index: Position of the segment in the transcript list
+        segment: Transcript dict ('id' is used when present) or plain text
+
+    Returns:
+        Hashable key
+    """
+    if isinstance(segment, str):
+        return index
+    return segment.get('id', index)
+
+
+def segment_version(segment):
+    """Version of a segment - changes whenever a rendered field changes"""
+    if isinstance(segment, str):
+        return segment
+    return (
+        segment.get('speaker'),
+        segment.get('en'),
+        segment.get('bn'),
+        segment.get('time'),
+    )
+
+
+class RenderCache:
+    """
+    Stores pre-rendered Markdown fragments keyed by segment id/version
+
+    Only segments whose version changed are re-rendered, views are
+    assembled with str.join instead of repeated string concatenation.
+    """
+
+    def __init__(self, render_fn):
+        """
+        Args:
+            render_fn: Function (number, segment) -> Markdown fragment
+        """
+        self.render_fn = render_fn
+        self._fragments = {}  # key -> (version, fragment)
+        self._lock = threading.Lock()
+
+    def fragment(self, number, index, segment):
+        """Get the fragment for one segment, rendering it only if changed"""
+        key = (segment_key(index, segment), number)
+        version = segment_version(segment)
+
+        with self._lock:
+            cached = self._fragments.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+        fragment = self.render_fn(number, segment)
+
+        with self._lock:
+            self._fragments[key] = (version, fragment)
+
+        return fragment
+
+    def render(self, segments, start=0, end=None):
+        """
+        Render a run of segments (numbered from 1) and join them
+
+        Args:
+            segments: Full transcript list
+            start: Index of the first segment to render
+            end: Index after the last segment (default: end of list)
+
+        Returns:
+            str: Joined Markdown
+        """
+        end = len(segments) if end is None else min(end, len(segments))
+        return "".join(
+            self.fragment(index + 1, index, segments[index])
+            for index in range(start, end)
+        )
+
+    def render_items(self, items):
+        """
+        Render (number, index, segment) triples in the given order
+
+        Returns:
+            str: Joined Markdown
+        """
+        return "".join(self.fragment(number, index, segment) for number, index, segment in items)
+
+    def invalidate(self, key=None):
+        """Drop one segment's fragments, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._fragments.clear()
+            else:
+                for cache_key in [k for k in self._fragments if k[0] == key]:
+                    del self._fragments[cache_key]
+
+    def __len__(self):
+        return len(self._fragments)
@@ -0,0 +1,139 @@
+# rolling_summarizer.py - Running meeting summary updated in the background
+"""
+Rolling (incremental) meeting summary
+
+Every N committed segments the running summary is updated from the previous
+summary plus the new segments only, so each update costs the same no matter
+how long the meeting is. At stop, flush() folds in the last few segments and
+the final summary is ready almost immediately.
+"""
+
+import os
+import threading
+import time
+
+# Segments per update (0 disables the rolling summary)
+ROLLING_SUMMARY_EVERY = int(os.getenv("MEETINGAI_ROLLING_SUMMARY_EVERY", "10"))
+
+
+class RollingSummarizer:
+    """
+    Keeps a running summary of one meeting
+
+    Updates run on a single background thread, so at most one LLM request
+    per meeting is in flight. Segments that arrive during an update are
+    picked up by the next one.
+    """
+
+    def __init__(self, update_fn, every=None, max_batch=None, on_update=None):
+        """
+        Args:
+            update_fn: Callable(previous_summary, new_segments) -> new summary
+            every: Segments per update (default: ROLLING_SUMMARY_EVERY)
+            max_batch: Most segments folded in per update (default: 3 * every)
+            on_update: Optional callback(snapshot dict) after each update
+        """
+        self.update_fn = update_fn
+        self.every = max(1, every or ROLLING_SUMMARY_EVERY)
+        self.max_batch = max_batch or self.every * 3
+        self.on_update = on_update
+
+        self.summary = ""
+        self.covered = 0          # Segments included in self.summary
+        self.updated_at = None
+        self.errors = 0
+
+        self._pending = []
+        self._force = False       # Fold in pending segments even if fewer than `every`
+        self._generation = 0      # Bumped by reset() to drop in-flight results
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def add(self, segment):
+        """Queue a committed segment (starts an update every N segments)"""
+        with self._lock:
+            self._pending.append(segment)
+            if len(self._pending) >= self.every:
+                self._kick()
+
+    def flush(self):
+        """Fold in all remaining segments (e.g. when the meeting stops)"""
+        with self._lock:
+            if self._pending:
+                self._force = True
+                self._kick()
+
+    def wait(self, timeout=None):
+        """Wait for the running update to finish; True if none is running"""
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+            return not worker.is_alive()
+        return True
+
+    def is_current(self, total_segments):
+        """True if the summary covers all `total_segments` segments"""
+        with self._lock:
+            return bool(self.summary) and not self._pending and self.covered == total_segments
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'summary': self.summary,
+                'covered': self.covered,
+                'pending': len(self._pending),
+                'updated_at': self.updated_at
+            }
+
+    def reset(self):
+        """Forget everything (new meeting)"""
+        with self._lock:
+            self._generation += 1
+            self._pending = []
+            self._force = False
+            self.summary = ""
+            self.covered = 0
+            self.updated_at = None
+            self.errors = 0
+
+    def _kick(self):
+        """Start the worker if it is idle (caller holds the lock)"""
+        if self._worker is not None:
+            return  # Running; it re-checks _pending before it exits
+        self._worker = threading.Thread(target=self._run, daemon=True, name="rolling-summary")
+        self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending or (not self._force and len(self._pending) < self.every):
+                    self._force = False
+                    self._worker = None  # Under the lock: the next add()/flush() starts a new worker
+                    return
+                batch = self._pending[:self.max_batch]
+                previous = self.summary
+                generation = self._generation
+
+            start = time.time()
+            try:
+                summary = self.update_fn(previous, batch)
+            except Exception as e:
+                print(f"⚠️ Rolling summary update failed: {e}")
+                with self._lock:
+                    self.errors += 1
+                    self._force = False
+                    self._worker = None
+                return  # Segments stay pending for the next update
+
+            with self._lock:
+                if generation != self._generation:
+                    continue  # Reset while the request was running: drop it, look at the new segments
+                if summary:
+                    self.summary = summary
+                self.covered += len(batch)
+                del self._pending[:len(batch)]
+                self.updated_at = time.time()
+
+            print(f"📋 Rolling summary updated: {self.covered} segments ({time.time() - start:.1f}s)")
+            if self.on_update is not None:
+                self.on_update(self.snapshot())
@@ -1,7 +1,6 @@
 # speaker_identifier.py - Improved speaker identification using clustering
 
 import numpy as np
-from sklearn.cluster import AgglomerativeClustering
 from collections import deque
 import warnings
 warnings.filterwarnings('ignore')
@@ -103,6 +102,8 @@ class ImprovedSpeakerIdentifier:
         Identify speaker using clustering of audio features
         """
         try:
+            from sklearn.cluster import AgglomerativeClustering  # Imported on first use
+            
             # Extract features
             features = self.extract_robust_features(audio_np, samplerate)
             
@@ -1,23 +1,15 @@
 # suggester.py
 
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
+try:
+    from llm_client import get_model
+except ImportError:  # Imported as src.suggester (Streamlit app)
+    from src.llm_client import get_model
 
-load_dotenv()
-GENAI_API_KEY = os.getenv("GENAI_API_KEY")
+# Shared Gemini model (resolved lazily on first use)
+model = get_model()
 
-if not GENAI_API_KEY:
+if not model:
     print("⚠️ WARNING: GENAI_API_KEY not found in .env file")
-    
-genai.configure(api_key=GENAI_API_KEY)
-
-# Use gemini-1.5-flash-latest or gemini-1.5-pro
-try:
-    model = genai.GenerativeModel("gemini-1.5-flash-latest")
-except:
-    # Fallback to older stable model
-    model = genai.GenerativeModel("gemini-pro")
 
 def get_suggestion(text):
     """
@@ -1,39 +1,24 @@
-import google.generativeai as genai
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-GENAI_API_KEY = os.getenv("GENAI_API_KEY")
-
-if not GENAI_API_KEY:
+try:
+    from render_cache import RenderCache
+    from llm_client import get_model
+    from extractive_summarizer import generate_local_summary
+except ImportError:  # Imported as src.summarizer (Streamlit app)
+    from src.render_cache import RenderCache
+    from src.llm_client import get_model
+    from src.extractive_summarizer import generate_local_summary
+
+# Shared Gemini model (resolved lazily on first use)
+model = get_model()
+
+if not model:
     print("⚠️ WARNING: GENAI_API_KEY not found in .env file")
 
-genai.configure(api_key=GENAI_API_KEY)
-
-# Try multiple model names (in order of preference)
-model = None
-model_names = [
-    "gemini-1.5-flash-latest",
-    "gemini-1.5-flash",
-    "gemini-1.5-pro-latest", 
-    "gemini-pro"
-]
-
-for model_name in model_names:
-    try:
-        model = genai.GenerativeModel(model_name)
-        print(f"✅ Using Gemini model: {model_name}")
-        break
-    except Exception as e:
-        print(f"⚠️ Model {model_name} not available: {e}")
-        continue
-
-if model is None:
-    print("❌ No Gemini model available. Summary will be basic text only.")
+# Numbered transcript lines, cached per segment
+segment_cache = RenderCache(lambda number, text: f"\n**{number}.** {text}\n")
 
 def generate_summary(transcript_list):
     """
-    Generate a meeting summary (without AI for now)
+    Generate a meeting summary (local extractive summary, no AI)
     
     Args:
         transcript_list: List of transcript segments
@@ -63,14 +48,16 @@ def generate_summary(transcript_list):
 
 ---
 
+{generate_local_summary(transcript_list, title="## 🧠 Key Points")}
+---
+
 ## 📝 Full Transcript:
 
 """
     
-    # Add all segments with numbers
-    for i, text in enumerate(transcript_list, 1):
-        summary += f"\n**{i}.** {text}\n"
-    
-    summary += "\n---\n\n*AI-powered summary is currently disabled. Enable Gemini API for intelligent summaries.*"
-    
-    return summary
\ No newline at end of file
+    # Add all segments with numbers (cached fragments)
+    return "".join([
+        summary,
+        segment_cache.render(transcript_list),
+        "\n---\n\n*Key points are extracted locally. Enable Gemini API for AI-written summaries.*"
+    ])
\ No newline at end of file
@@ -0,0 +1,280 @@
+# summary_schema.py - Typed meeting summary (JSON) + local Markdown rendering
+"""
+Structured meeting summary
+
+The LLM returns JSON in the shape of SUMMARY_SCHEMA. It is parsed, checked
+and normalised here (missing fields get defaults, single values become
+lists, plain-string action items become objects), so the stored result
+always has the same shape. Rendering to Markdown and exporting are local.
+"""
+
+import json
+import re
+
+# JSON-Schema subset: type / properties / required / items
+# ('from_string' names the field a bare string is coerced into)
+SUMMARY_SCHEMA = {
+    'type': 'object',
+    'required': ['executive_summary'],
+    'properties': {
+        'executive_summary': {'type': 'string'},
+        'topics': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['title'],
+                'from_string': 'title',
+                'properties': {
+                    'title': {'type': 'string'},
+                    'points': {'type': 'array', 'items': {'type': 'string'}},
+                },
+            },
+        },
+        'action_items': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['task'],
+                'from_string': 'task',
+                'properties': {
+                    'task': {'type': 'string'},
+                    'owner': {'type': 'string'},
+                    'speaker': {'type': 'string'},
+                    'timestamp': {'type': 'string'},
+                    'due': {'type': 'string'},
+                },
+            },
+        },
+        'decisions': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'required': ['decision'],
+                'from_string': 'decision',
+                'properties': {
+                    'decision': {'type': 'string'},
+                    'speaker': {'type': 'string'},
+                    'timestamp': {'type': 'string'},
+                },
+            },
+        },
+        'next_steps': {'type': 'array', 'items': {'type': 'string'}},
+        'suggestions': {'type': 'array', 'items': {'type': 'string'}},
+    },
+}
+
+# Shown to the model in the prompt
+SUMMARY_JSON_EXAMPLE = """{
+  "executive_summary": "2-3 sentence overview of the entire meeting",
+  "topics": [{"title": "Main topic discussed", "points": ["key point", "key point"]}],
+  "action_items": [{"task": "what has to be done", "owner": "who will do it", "speaker": "who said it", "timestamp": "HH:MM:SS", "due": "deadline if mentioned"}],
+  "decisions": [{"decision": "conclusion or agreement reached", "speaker": "who stated it", "timestamp": "HH:MM:SS"}],
+  "next_steps": ["what should happen after this meeting"],
+  "suggestions": ["recommendation for improvement or follow-up"]
+}"""
+
+FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+
+
+class SummaryValidationError(ValueError):
+    """Model output that is not a usable summary"""
+
+
+def _check(value, schema, path, errors):
+    """Validate + normalise one value against a schema node"""
+    kind = schema['type']
+
+    if kind == 'string':
+        if value is None:
+            return ""
+        if isinstance(value, (int, float)):
+            return str(value)
+        if not isinstance(value, str):
+            errors.append(f"{path}: expected string")
+            return ""
+        return value.strip()
+
+    if kind == 'array':
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        items = [_check(item, schema['items'], f"{path}[{i}]", errors) for i, item in enumerate(value)]
+        return [item for item in items if item not in ("", None)]
+
+    if kind == 'object':
+        if isinstance(value, str) and schema.get('from_string'):
+            value = {schema['from_string']: value}
+        if not isinstance(value, dict):
+            if path == "$":
+                errors.append(f"{path}: expected object")
+            return None  # A bad list item is dropped, not an error
+
+        result = {}
+        for key, sub_schema in schema['properties'].items():
+            result[key] = _check(value.get(key), sub_schema, f"{path}.{key}", errors)
+            if key in schema.get('required', []) and path == "$":
+                if key not in value:
+                    errors.append(f"{path}.{key}: missing")
+                elif not result[key]:
+                    errors.append(f"{path}.{key}: empty")
+
+        if any(not result[key] for key in schema.get('required', [])) and path != "$":
+            return None  # Item without its main field (e.g. action item without task)
+        return result  # The root is kept for previews; the error list marks it invalid
+
+    raise ValueError(f"Unknown schema type: {kind}")
+
+
+def validate_summary(data, schema=SUMMARY_SCHEMA):
+    """
+    Validate and normalise a summary dict
+
+    Args:
+        data: Parsed JSON
+        schema: Schema node (default: SUMMARY_SCHEMA)
+
+    Returns:
+        tuple: (normalised dict, list of problems found - empty if valid)
+
+    Raises:
+        SummaryValidationError: If data is not an object at all
+    """
+    errors = []
+    result = _check(data, schema, "$", errors)
+    if result is None:
+        raise SummaryValidationError("Summary is not a JSON object")
+    return result, errors
+
+
+def parse_summary_json(text):
+    """
+    Parse model output (tolerates ```json fences and text around the object)
+
+    Returns:
+        dict: Normalised summary
+
+    Raises:
+        SummaryValidationError: If no JSON object can be parsed, or it has
+            problems (e.g. no executive_summary) - the caller should retry or
+            fall back instead of storing it
+    """
+    text = FENCE_PATTERN.sub("", text or "").strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise SummaryValidationError("No JSON object in response")
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError as e:
+        raise SummaryValidationError(f"Invalid JSON: {e}")
+    summary, errors = validate_summary(data)
+    if errors:
+        raise SummaryValidationError(f"Invalid summary: {'; '.join(errors[:5])}")
+    return summary
+
+
+def parse_partial_json(text):
+    """
+    Best-effort parse of an incomplete JSON object (for streaming previews)
+
+    Open strings, arrays and objects are closed; if that is not enough the
+    text is cut back to the previous separator and tried again.
+
+    Returns:
+        dict or None
+    """
+    text = FENCE_PATTERN.sub("", text or "")
+    start = text.find("{")
+    if start < 0:
+        return None
+    text = text[start:]
+
+    for _ in range(4):
+        closers = []
+        in_string = escape = False
+        for ch in text:
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in "{[":
+                closers.append("}" if ch == "{" else "]")
+            elif ch in "}]" and closers:
+                closers.pop()
+
+        candidate = text.rstrip().rstrip(",:") + ('"' if in_string else "") + "".join(reversed(closers))
+        try:
+            data = json.loads(candidate)
+            return data if isinstance(data, dict) else None
+        except ValueError:
+            cut = max(text.rfind(","), text.rfind("{", 1), text.rfind("["))
+            if cut <= 0:
+                return None
+            text = text[:cut]
+    return None
+
+
+def render_summary_markdown(summary):
+    """
+    Render a validated summary with the six summary sections
+
+    Args:
+        summary: Dict from parse_summary_json() / validate_summary()
+
+    Returns:
+        str: Markdown
+    """
+    lines = [
+        "### 1. Executive Summary",
+        summary.get('executive_summary') or "-",
+        "",
+        "### 2. Key Discussion Points",
+    ]
+    for topic in summary.get('topics', []):
+        lines.append(f"- **{topic['title']}**")
+        lines += [f"  - {point}" for point in topic.get('points', [])]
+    if not summary.get('topics'):
+        lines.append("- (none)")
+
+    lines += ["", "### 3. Action Items"]
+    for item in summary.get('action_items', []):
+        owner = item.get('owner') or item.get('speaker') or "Unassigned"
+        when = f" [{item['timestamp']}]" if item.get('timestamp') else ""
+        due = f" - *due {item['due']}*" if item.get('due') else ""
+        lines.append(f"- [ ] **{owner}**{when}: {item['task']}{due}")
+    if not summary.get('action_items'):
+        lines.append("- (none)")
+
+    lines += ["", "### 4. Important Decisions"]
+    for decision in summary.get('decisions', []):
+        when = f"[{decision['timestamp']}] " if decision.get('timestamp') else ""
+        by = f" (*{decision['speaker']}*)" if decision.get('speaker') else ""
+        lines.append(f"- {when}{decision['decision']}{by}")
+    if not summary.get('decisions'):
+        lines.append("- (none)")
+
+    lines += ["", "### 5. Next Steps"]
+    lines += [f"- {step}" for step in summary.get('next_steps', [])] or ["- (none)"]
+
+    lines += ["", "### 6. Suggestions"]
+    lines += [f"- {suggestion}" for suggestion in summary.get('suggestions', [])] or ["- (none)"]
+
+    return "\n".join(lines) + "\n"
+
+
+def summary_to_markdown(text):
+    """
+    Model output -> (summary dict or None, Markdown)
+
+    Falls back to showing the raw text if it is not a valid JSON summary.
+    """
+    try:
+        summary = parse_summary_json(text)
+    except SummaryValidationError:
+        return None, text
+    return summary, render_summary_markdown(summary)
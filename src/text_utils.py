@@ -0,0 +1,56 @@
+# text_utils.py - Text helpers shared by the local summarizer and the transcript compactor
+"""
+Shared English text helpers
+
+Stopwords, tokenising / sentence patterns, action and decision phrase
+patterns, and near-duplicate detection for re-transcribed utterances.
+"""
+
+import re
+from difflib import SequenceMatcher
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further get
+got had has have having he her here hers him his how i if in into is it its itself just know let
+like me more most my no nor not now of off on once only or other our ours out over own really
+right said same say she should so some such than that the their theirs them then there these they
+thing things think this those through to too um uh under until up us very was we well were what
+when where which while who whom why will with would yeah yes you your yours okay ok oh actually
+going gonna go one two kind sort mean maybe much many lot i'm i've i'd you're you've you'd we're we've
+we'd they're they've it's that's there's what's don't doesn't didn't can't won't isn't aren't
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9'\-]+")
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+NORMALIZE = re.compile(r"[^a-z0-9 ]+")
+
+ACTION_PATTERN = re.compile(
+    r"\b(?:i'll|i will|we'll|we will|you'll|you will|let's|let us|need to|needs to|have to|has to|must|"
+    r"should|going to|action item|to-?do|follow[- ]up|make sure|take care of|assign(?:ed)?|deadline|"
+    r"can you|could you|please)\b",
+    re.IGNORECASE
+)
+DECISION_PATTERN = re.compile(
+    r"\b(?:decided|decide to|agreed|agree to|we'll go with|let's go with|go ahead with|approved|"
+    r"decision|settled on|confirmed|final(?:ly|ized)?)\b",
+    re.IGNORECASE
+)
+
+DUPLICATE_RATIO = 0.9      # SequenceMatcher ratio for near-duplicates
+
+
+def normalize(text):
+    """Lowercase, punctuation-free, single-spaced text for comparisons"""
+    return " ".join(NORMALIZE.sub(" ", text.lower()).split())
+
+
+def is_duplicate(a, b):
+    """True if normalised texts a and b are (near) the same utterance"""
+    if a == b:
+        return True
+    shorter, longer = sorted((a, b), key=len)
+    if len(shorter) >= 15 and shorter in longer:
+        return True
+    matcher = SequenceMatcher(None, a, b)
+    return matcher.real_quick_ratio() >= DUPLICATE_RATIO and matcher.ratio() >= DUPLICATE_RATIO
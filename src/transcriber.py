@@ -1,41 +1,57 @@
 # transcriber.py - Using faster-whisper with auto device detection
 
-from faster_whisper import WhisperModel
+import threading
 import numpy as np
-import torch
 
-print("📥 Loading faster-whisper model...")
-print(f"🎮 CUDA available: {torch.cuda.is_available()}")
+# Whisper model is loaded on first use (faster-whisper + torch are slow to import)
+model = None
+_model_lock = threading.Lock()
 
-# Auto-detect best device
-try:
-    # Try GPU first
-    if torch.cuda.is_available():
-        print(f"🎮 Attempting GPU: {torch.cuda.get_device_name(0)}")
-        model = WhisperModel(
-            "tiny",  # CHANGED: tiny for ultra-low latency (was "base")
-            device="cuda",
-            compute_type="float16",
-            device_index=0,
-            num_workers=2  # Reduced for lower latency
-        )
-        print("✅ Faster-whisper TINY model loaded on GPU (ULTRA FAST MODE)")
-    else:
-        raise Exception("CUDA not available")
-        
-except Exception as e:
-    print(f"⚠️ GPU load failed: {e}")
-    print("📥 Loading TINY model on CPU...")
+def get_model():
+    """Load the faster-whisper model on first call (thread-safe)"""
+    global model
     
-    # Fallback to CPU with tiny model
-    model = WhisperModel(
-        "tiny",  # Tiny model for speed
-        device="cpu",
-        compute_type="int8",
-        cpu_threads=2,
-        num_workers=2
-    )
-    print("✅ Faster-whisper TINY model loaded on CPU (FAST MODE)")
+    with _model_lock:
+        if model is not None:
+            return model
+        
+        from faster_whisper import WhisperModel
+        import torch
+        
+        print("📥 Loading faster-whisper model...")
+        print(f"🎮 CUDA available: {torch.cuda.is_available()}")
+        
+        # Auto-detect best device
+        try:
+            # Try GPU first
+            if torch.cuda.is_available():
+                print(f"🎮 Attempting GPU: {torch.cuda.get_device_name(0)}")
+                model = WhisperModel(
+                    "tiny",  # CHANGED: tiny for ultra-low latency (was "base")
+                    device="cuda",
+                    compute_type="float16",
+                    device_index=0,
+                    num_workers=2  # Reduced for lower latency
+                )
+                print("✅ Faster-whisper TINY model loaded on GPU (ULTRA FAST MODE)")
+            else:
+                raise Exception("CUDA not available")
+                
+        except Exception as e:
+            print(f"⚠️ GPU load failed: {e}")
+            print("📥 Loading TINY model on CPU...")
+            
+            # Fallback to CPU with tiny model
+            model = WhisperModel(
+                "tiny",  # Tiny model for speed
+                device="cpu",
+                compute_type="int8",
+                cpu_threads=2,
+                num_workers=2
+            )
+            print("✅ Faster-whisper TINY model loaded on CPU (FAST MODE)")
+        
+        return model
 
 def transcribe(audio_np):
     """
@@ -57,7 +73,7 @@ def transcribe(audio_np):
             audio_np = audio_np / np.abs(audio_np).max()
         
         # Fast transcription
-        segments, info = model.transcribe(
+        segments, info = get_model().transcribe(
             audio_np,
             language="en",
             beam_size=1,  # Fast mode
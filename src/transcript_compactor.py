@@ -0,0 +1,190 @@
+# transcript_compactor.py - Shrink transcripts before they go into a prompt
+"""
+Token-aware transcript compaction
+
+Live transcription produces many tiny fragments ("Um.", "Uh-huh."),
+filler words and repeated re-transcriptions of the same audio. Before a
+transcript is sent to the LLM it is:
+
+1. cleaned   - disfluencies removed, disfluency-only segments dropped, and
+               acknowledgements ("Yeah.", "right.") dropped unless they answer
+               a question (short replies like "No." or "Sure." always stay)
+2. deduped   - near-identical consecutive segments collapsed
+3. merged    - consecutive segments of the same speaker joined
+4. trimmed   - lowest-information sentences dropped until it fits the budget
+
+The full transcript shown to users is never changed.
+"""
+
+import math
+import os
+import re
+
+try:
+    from text_utils import (
+        STOPWORDS, TOKEN_PATTERN, ACTION_PATTERN, DECISION_PATTERN, SENTENCE_SPLIT, normalize, is_duplicate
+    )
+except ImportError:  # Imported as src.transcript_compactor
+    from src.text_utils import (
+        STOPWORDS, TOKEN_PATTERN, ACTION_PATTERN, DECISION_PATTERN, SENTENCE_SPLIT, normalize, is_duplicate
+    )
+
+# Estimated prompt tokens allowed for a transcript (0 = no trimming)
+TOKEN_BUDGET = int(os.getenv("MEETINGAI_SUMMARY_TOKEN_BUDGET", "24000"))
+
+# Disfluencies: dropped wherever they are
+FILLER_WORDS = frozenset("um umm uh uhh erm hmm hm mm mhm mm-hmm uh-huh".split())
+# Backchannel acknowledgements: dropped unless the segment before was a question
+# (no/yes/sure/... always carry an answer and are never dropped)
+BACKCHANNEL_WORDS = frozenset("yeah yep yup okay ok right alright".split())
+FILLER_PHRASES = re.compile(r"\b(?:you know|i mean)\b", re.IGNORECASE)
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:['\-][a-z0-9]+)*")  # Every word, incl. numbers and "I"
+INLINE_FILLERS = re.compile(r"\b(?:u+m+|u+h+|erm|hm+)\b[,.]?\s*|,\s*you know,", re.IGNORECASE)
+
+DUPLICATE_WINDOW = 3       # Compare with this many previous segments
+LINE_OVERHEAD_TOKENS = 8   # "[HH:MM:SS] Person-1: " prefix per line
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English)"""
+    return _tokens_for_length(len(text)) if text else 0
+
+
+def _tokens_for_length(chars):
+    return max(1, math.ceil(chars / 4)) if chars else 0
+
+
+def _is_filler(text, answers_question=False):
+    """
+    True if the segment has fillers and nothing else ("42." or "I." are answers)
+
+    Acknowledgements ("Yeah.", "right.") count as fillers unless the
+    segment answers a question.
+    """
+    text = (text or "").lower()
+    phrases = len(FILLER_PHRASES.findall(text))
+    words = WORD_PATTERN.findall(FILLER_PHRASES.sub(" ", text))
+    fillers = FILLER_WORDS if answers_question else FILLER_WORDS | BACKCHANNEL_WORDS
+    return 0 < phrases + len(words) <= 4 and all(w in fillers for w in words)
+
+
+def _sentence_score(sentence):
+    """Information value of a sentence (content words, decisions/actions count extra)"""
+    score = sum(1 for w in TOKEN_PATTERN.findall(sentence.lower()) if w not in STOPWORDS)
+    if ACTION_PATTERN.search(sentence) or DECISION_PATTERN.search(sentence):
+        score += 5
+    return score
+
+
+def compact_transcript(transcripts_list, token_budget=None):
+    """
+    Compact a transcript for prompting
+
+    Args:
+        transcripts_list: List of transcript dicts ('id', 'speaker', 'en', 'time')
+        token_budget: Estimated token limit (default: TOKEN_BUDGET, 0 = no limit)
+
+    Returns:
+        tuple: (compacted segments, stats dict)
+            segments keep the transcript dict format; 'id' is the first merged
+            segment's id and 'ids' lists all of them
+    """
+    token_budget = TOKEN_BUDGET if token_budget is None else token_budget
+    stats = {
+        'segments_in': len(transcripts_list),
+        'tokens_in': sum(estimate_tokens(t.get('en', '')) + LINE_OVERHEAD_TOKENS for t in transcripts_list),
+        'fillers': 0,
+        'duplicates': 0,
+        'merged': 0,
+        'trimmed_sentences': 0,
+    }
+
+    # 1 + 2: clean fillers, drop near-duplicate re-transcriptions
+    kept = []
+    for index, t in enumerate(transcripts_list):
+        raw = t.get('en', '') or ""
+        text = " ".join(INLINE_FILLERS.sub(" ", raw).split())
+        answers_question = index > 0 and (transcripts_list[index - 1].get('en') or "").strip().endswith("?")
+        if _is_filler(raw, answers_question) or not WORD_PATTERN.search(text.lower()):
+            stats['fillers'] += 1
+            continue
+
+        normalized = normalize(text)
+        duplicate_of = None
+        for previous in kept[-DUPLICATE_WINDOW:]:
+            if previous['speaker'] == t.get('speaker') and is_duplicate(previous['norm'], normalized):
+                duplicate_of = previous
+                break
+        if duplicate_of is not None:
+            stats['duplicates'] += 1
+            if len(normalized) > len(duplicate_of['norm']):
+                duplicate_of['en'] = text  # Keep the more complete version
+                duplicate_of['norm'] = normalized
+            continue
+
+        kept.append({
+            'id': t.get('id', index),
+            'speaker': t.get('speaker', 'Unknown'),
+            'time': t.get('time', ''),
+            'en': text,
+            'norm': normalized,
+        })
+
+    # 3: merge consecutive segments of the same speaker
+    merged = []
+    for segment in kept:
+        if merged and merged[-1]['speaker'] == segment['speaker']:
+            merged[-1]['en'] += " " + segment['en']
+            merged[-1]['ids'].append(segment['id'])
+            stats['merged'] += 1
+        else:
+            merged.append({
+                'id': segment['id'],
+                'ids': [segment['id']],
+                'speaker': segment['speaker'],
+                'time': segment['time'],
+                'en': segment['en'],
+            })
+
+    # 4: drop the least informative sentences until the transcript fits
+    total = sum(estimate_tokens(s['en']) + LINE_OVERHEAD_TOKENS for s in merged)
+    if token_budget and total > token_budget:
+        sentences = []  # (score, line, position, characters)
+        split_lines = []
+        for line, segment in enumerate(merged):
+            parts = [p for p in SENTENCE_SPLIT.split(segment['en']) if p.strip()]
+            split_lines.append(parts)
+            for position, sentence in enumerate(parts):
+                sentences.append((_sentence_score(sentence), line, position, len(sentence)))
+
+        # Each line's estimate is recomputed from its remaining length after a
+        # drop (subtracting per-sentence estimates would over-count the savings)
+        remaining = [len(parts) for parts in split_lines]
+        chars = [len(" ".join(parts)) for parts in split_lines]
+        line_tokens = [_tokens_for_length(n) + LINE_OVERHEAD_TOKENS if n else 0 for n in chars]
+        total = sum(line_tokens)
+
+        dropped = set()
+        ranked = sorted(sentences, key=lambda item: (item[0], -item[3]))
+        for score, line, position, length in ranked[:-1]:  # Always keep the best sentence
+            if total <= token_budget:
+                break
+            dropped.add((line, position))
+            remaining[line] -= 1
+            chars[line] -= length + (1 if remaining[line] else 0)  # Sentence and its joining space
+            tokens = _tokens_for_length(chars[line]) + LINE_OVERHEAD_TOKENS if remaining[line] else 0
+            total += tokens - line_tokens[line]
+            line_tokens[line] = tokens
+            stats['trimmed_sentences'] += 1
+
+        trimmed = []
+        for line, segment in enumerate(merged):
+            parts = [p for position, p in enumerate(split_lines[line]) if (line, position) not in dropped]
+            if parts:
+                segment['en'] = " ".join(parts)
+                trimmed.append(segment)
+        merged = trimmed
+
+    stats['segments_out'] = len(merged)
+    stats['tokens_out'] = sum(estimate_tokens(s['en']) + LINE_OVERHEAD_TOKENS for s in merged)
+    return merged, stats
@@ -1,12 +1,22 @@
 # translator.py - English to Bangla translation
 
-from deep_translator import GoogleTranslator
-import time
+import threading
 
-# Initialize translator (English to Bengali)
-translator = GoogleTranslator(source='en', target='bn')
+# Translator is created on first use (deep_translator pulls in requests/bs4)
+translator = None
+_translator_lock = threading.Lock()
 
-print("✅ Translator initialized (English → Bangla)")
+def get_translator():
+    """Create the English → Bangla translator on first call"""
+    global translator
+    
+    with _translator_lock:
+        if translator is None:
+            from deep_translator import GoogleTranslator
+            translator = GoogleTranslator(source='en', target='bn')
+            print("✅ Translator initialized (English → Bangla)")
+    
+    return translator
 
 def translate_to_bangla(text):
     """
@@ -26,7 +36,7 @@ def translate_to_bangla(text):
         print(f"🔄 Translating: '{text[:100]}'...")
         
         # Translate using Google Translate (free, no API key)
-        bangla_text = translator.translate(text)
+        bangla_text = get_translator().translate(text)
         
         print(f"✅ Translation result: '{bangla_text[:100]}'")
         
@@ -52,7 +62,7 @@ def translate_batch(text_list):
     for text in text_list:
         if text:
             try:
-                bangla = translator.translate(text)
+                bangla = get_translator().translate(text)
                 results.append(bangla)
             except Exception as e:
                 print(f"⚠️ Translation error: {e}")
@@ -0,0 +1,108 @@
+# startup_report.py
+"""
+Startup import-time report
+Runs `python -X importtime` on an entry point and lists the slowest imports
+and any heavy dependency that was loaded before the UI is served
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+# Dependencies that must only be imported when their feature is first used
+HEAVY_MODULES = [
+    "torch",
+    "faster_whisper",
+    "sklearn",
+    "sounddevice",
+    "pygame",
+    "gtts",
+    "deep_translator",
+    "google.generativeai",
+]
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_startup(module="app_gradio"):
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    Args:
+        module: Module to import (default: app_gradio)
+
+    Returns:
+        dict: {
+            'module': str,
+            'returncode': int,
+            'wall_s': float,        # Interpreter start + import, wall clock
+            'import_s': float,      # Cumulative import time of `module`
+            'imports': [(name, self_us, cumulative_us), ...],
+            'heavy': [names of HEAVY_MODULES that were imported],
+            'error': str
+        }
+    """
+    start = time.time()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    wall_s = time.time() - start
+
+    imports = []
+    error_lines = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            error_lines.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header line
+        imports.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+
+    imported = {name for name, _, _ in imports}
+    heavy = [name for name in HEAVY_MODULES if name in imported]
+    module_us = next((cum for name, _, cum in imports if name == module), 0)
+
+    return {
+        'module': module,
+        'returncode': result.returncode,
+        'wall_s': wall_s,
+        'import_s': module_us / 1e6,
+        'imports': imports,
+        'heavy': heavy,
+        'error': "\n".join(error_lines[-10:]) if result.returncode else ""
+    }
+
+
+def print_report(report, top=15):
+    """Print the slowest imports and heavy modules"""
+    print("=" * 60)
+    print(f"🚀 STARTUP REPORT: import {report['module']}")
+    print("=" * 60)
+
+    if report['returncode'] != 0:
+        print(f"❌ Import failed:\n{report['error']}")
+        return
+
+    print(f"⏱️  Wall clock (interpreter + import): {report['wall_s']:.2f}s")
+    print(f"⏱️  Cumulative import time:            {report['import_s']:.2f}s")
+
+    print(f"\n🐢 Slowest {top} imports (cumulative):")
+    slowest = sorted(report['imports'], key=lambda item: item[2], reverse=True)[:top]
+    for name, self_us, cumulative_us in slowest:
+        print(f"   {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name}")
+
+    if report['heavy']:
+        print(f"\n⚠️ Heavy modules imported at startup: {', '.join(report['heavy'])}")
+    else:
+        print("\n✅ No heavy optional modules imported at startup")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    print_report(measure_startup(sys.argv[1] if len(sys.argv) > 1 else "app_gradio"))
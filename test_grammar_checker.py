@@ -0,0 +1,60 @@
+# test_grammar_checker.py
+"""
+Grammar Checker Rule Test
+Runs the built-in offline rules on sentences they must correct and on
+correct sentences they must leave alone (no LanguageTool, no Gemini)
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+pytest.importorskip("dotenv")
+
+from ai_converstion_practise.grammar_checker import GrammarChecker
+
+
+@pytest.fixture
+def checker():
+    return GrammarChecker(model=object(), use_languagetool=False)
+
+
+@pytest.mark.parametrize("sentence, corrected", [
+    ("He go to school every day.", "He goes to school every day."),
+    ("She don't like coffee.", "She doesn't like coffee."),
+    ("Yesterday it work fine.", "Yesterday it works fine."),
+    ("They was late.", "They were late."),
+    ("I bought a apple.", "I bought an apple."),
+    ("It took an long time.", "It took a long time."),
+    ("I didn't went home.", "I didn't go home."),
+    ("I need more informations.", "I need more information."),
+    ("This is more better.", "This is better."),
+])
+def test_incorrect_sentences(checker, sentence, corrected):
+    errors = checker.local_check(sentence)
+    assert errors
+    assert checker._local_result(sentence, errors)['corrected_sentence'] == corrected
+
+
+@pytest.mark.parametrize("sentence", [
+    "What is it like?",
+    "I saw it go away.",
+    "I made it work.",
+    "Let it go.",
+    "Does he go there often?",
+    "She wants to go home.",
+    "He has an MBA.",
+    "It is a USB cable.",
+    "I have an idea.",
+    "She bought a uniform.",
+    "He goes to work by train.",
+])
+def test_correct_sentences(checker, sentence):
+    assert checker.local_check(sentence) == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
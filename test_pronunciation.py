@@ -0,0 +1,159 @@
+# test_pronunciation.py
+"""
+Pronunciation Scorer Test
+Runs phonemize_words through phonemizer's own Separator and phonemize()
+arguments, and the acoustic scorer with a stub ONNX session. espeak is
+replaced by a small lexicon unless it is installed.
+"""
+
+import os
+import shutil
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+phonemizer = pytest.importorskip("phonemizer")
+
+from ai_converstion_practise import acoustic_scorer
+from ai_converstion_practise.pronunciation_checker import PronunciationChecker, WORD_PATTERN
+
+LEXICON = {
+    "hello": "h ə l oʊ",
+    "world": "w ɜː l d",
+    "don't": "d oʊ n t",
+    "hm": "",           # espeak says nothing for some tokens
+    "i": "aɪ",
+    "think": "θ ɪ ŋ k",
+    "sink": "s ɪ ŋ k",
+    "so": "s oʊ",
+    "too": "t uː",
+}
+
+HAS_ESPEAK = bool(shutil.which("espeak-ng") or shutil.which("espeak"))
+
+
+def fake_phonemize(text, language='en-us', backend='espeak', separator=None, strip=False,
+                   preserve_empty_lines=False, **kwargs):
+    """espeak stand-in with phonemize()'s line handling"""
+    assert isinstance(separator, phonemizer.separator.Separator)
+    lines = [separator.phone.join(LEXICON.get(word, "").split()) for word in text]
+    if not preserve_empty_lines:
+        lines = [line for line in lines if line]
+    return lines
+
+
+@pytest.fixture
+def lexicon(monkeypatch):
+    monkeypatch.setattr(phonemizer, "phonemize", fake_phonemize)
+
+
+def test_word_pattern_needs_a_letter():
+    assert WORD_PATTERN.findall("' don't 'hello' ''") == ["don't", "hello"]
+
+
+def test_phonemize_words(lexicon):
+    checker = PronunciationChecker()
+    phonemes = checker.phonemize_words(["world", "hm", "hello", "don't"])
+
+    assert phonemes == {
+        "hello": ("h", "ə", "l", "oʊ"),
+        "hm": (),
+        "don't": ("d", "oʊ", "n", "t"),
+        "world": ("w", "ɜː", "l", "d"),
+    }
+    assert checker.phonemize_calls == 1
+
+    checker.phonemize_words(["hello", "world"])
+    assert checker.phonemize_calls == 1  # Served from the cache
+
+
+def test_check(lexicon):
+    result = PronunciationChecker().check("hello world", "hello world")
+    assert result['score'] == 100
+    assert result['word_errors'] == []
+
+
+def test_check_similar_substitution(lexicon):
+    result = PronunciationChecker().check("i sink so", "i think so")
+
+    assert result['distance'] == 0.5  # θ/s is a similar pair
+    assert result['score'] == 93
+    assert result['word_errors'] == [
+        {'word': "think", 'index': 1, 'expected': "θ", 'heard': "s", 'score': 88},
+    ]
+    assert result['extra_words'] == []
+
+
+def test_check_missing_word(lexicon):
+    result = PronunciationChecker().check("i so", "i think so")
+
+    assert result['distance'] == 4.0
+    assert result['score'] == 43
+    assert result['word_errors'] == [
+        {'word': "think", 'index': 1, 'expected': "θ ɪ ŋ k", 'heard': "", 'score': 0},
+    ]
+
+
+def test_check_extra_word(lexicon):
+    result = PronunciationChecker().check("i think so too", "i think so")
+
+    # The extra word costs overall score, but "so" itself was said correctly
+    assert result['distance'] == 2.0
+    assert result['score'] == 71
+    assert result['word_errors'] == []
+    assert result['extra_words'] == ["too"]
+
+
+class StubSession:
+    """ONNX session whose frames spell out `tokens` in order, blank between them"""
+
+    def __init__(self, tokens, vocab_size):
+        self.tokens = tokens
+        self.vocab_size = vocab_size
+
+    def get_inputs(self):
+        return [type("Input", (), {"name": "input_values"})()]
+
+    def run(self, outputs, inputs):
+        batch, samples = inputs["input_values"].shape
+        frames = acoustic_scorer.num_frames(samples)
+        logits = np.zeros((batch, frames, self.vocab_size), dtype=np.float32)
+        logits[:, :, 0] = 5.0
+        per_token = frames // len(self.tokens)
+        for k, token in enumerate(self.tokens):
+            logits[:, k * per_token:k * per_token + per_token // 2, token] = 10.0
+        return [logits]
+
+
+def test_score_many(lexicon):
+    vocab = {"<pad>": 0, "h": 1, "ə": 2, "l": 3, "oʊ": 4, "w": 5, "ɜː": 6, "d": 7}
+    session = StubSession([1, 2, 3, 4, 5, 6, 3, 7], len(vocab))
+    acoustic_scorer._models["stub.onnx"] = (session, vocab, 0)
+    try:
+        scorer = acoustic_scorer.AcousticScorer(model_path="stub.onnx")
+        audio = np.random.default_rng(0).standard_normal(acoustic_scorer.SAMPLERATE).astype(np.float32)
+        results = scorer.score_many([(audio, "hello world"), (audio[:160], "hello world")])
+    finally:
+        del acoustic_scorer._models["stub.onnx"]
+
+    result, too_short = results
+    assert too_short is None
+    assert result['score'] >= 95
+    assert [w['word'] for w in result['words']] == ["hello", "world"]
+    assert all(not w['weak'] for w in result['words'])
+    assert scorer.stats['utterances'] == 2 and scorer.stats['batches'] == 1
+
+
+@pytest.mark.skipif(not HAS_ESPEAK, reason="espeak is not installed")
+def test_phonemize_words_espeak():
+    checker = PronunciationChecker()
+    phonemes = checker.phonemize_words(["hello", "world"])
+    assert phonemes["hello"] and phonemes["world"]
+    assert checker.check("hello world", "hello world")['score'] == 100
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,32 @@
+# test_startup.py
+"""
+Startup Time Test
+Checks that the app imports within the time budget and that heavy
+dependencies (Whisper, torch, pygame, ...) are not loaded at startup
+"""
+
+import os
+
+from startup_report import measure_startup, print_report
+
+# Seconds allowed for `import app_gradio` (override with MEETINGAI_STARTUP_BUDGET)
+STARTUP_BUDGET = float(os.getenv("MEETINGAI_STARTUP_BUDGET", "5.0"))
+
+
+def test_startup_budget():
+    report = measure_startup("app_gradio")
+    print_report(report)
+
+    assert report['returncode'] == 0, report['error']
+    assert not report['heavy'], f"Heavy modules imported at startup: {report['heavy']}"
+    assert report['import_s'] <= STARTUP_BUDGET, (
+        f"Startup took {report['import_s']:.2f}s (budget {STARTUP_BUDGET:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    try:
+        test_startup_budget()
+        print(f"✅ Startup within budget ({STARTUP_BUDGET:.1f}s)")
+    except AssertionError as e:
+        print(f"❌ {e}")
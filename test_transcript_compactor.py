@@ -0,0 +1,100 @@
+# test_transcript_compactor.py
+"""
+Transcript Compaction Test
+Checks filler/acknowledgement removal, duplicate collapsing, merging and
+that trimming keeps the estimated size within the token budget
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from transcript_compactor import compact_transcript, estimate_tokens, LINE_OVERHEAD_TOKENS
+
+WORDS = ("project budget deadline design review customer release feature test deploy server "
+         "team plan schedule issue bug fix report data model we should the a to and").split()
+
+
+def segment(index, speaker, text):
+    return {'id': index, 'speaker': speaker, 'time': f"00:00:{index % 60:02d}", 'en': text}
+
+
+def meeting(segments, seed=0):
+    rng = random.Random(seed)
+    return [
+        segment(i, f"Person-{i % 3 + 1}", " ".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14))).capitalize() + "."
+            for _ in range(rng.randint(1, 4))
+        ))
+        for i in range(segments)
+    ]
+
+
+def prompt_tokens(segments):
+    return sum(estimate_tokens(s['en']) + LINE_OVERHEAD_TOKENS for s in segments)
+
+
+@pytest.mark.parametrize("budget", [500, 2000, 10000])
+def test_trim_stays_within_budget(budget):
+    segments, stats = compact_transcript(meeting(1500), token_budget=budget)
+    assert stats['trimmed_sentences'] > 0
+    assert prompt_tokens(segments) <= budget
+    assert stats['tokens_out'] == prompt_tokens(segments)
+
+
+def test_no_trim_without_budget():
+    transcript = meeting(200)
+    _, stats = compact_transcript(transcript, token_budget=0)
+    assert stats['trimmed_sentences'] == 0
+
+
+def test_fillers_and_acknowledgements():
+    transcript = [
+        segment(0, "Person-1", "We ship the release on Friday."),
+        segment(1, "Person-2", "Yeah."),
+        segment(2, "Person-1", "right."),
+        segment(3, "Person-2", "Um."),
+        segment(4, "Person-1", "Can you review the design first?"),
+        segment(5, "Person-2", "Yeah."),
+        segment(6, "Person-1", "How many tests fail?"),
+        segment(7, "Person-2", "42."),
+        segment(8, "Person-1", "Is the server down?"),
+        segment(9, "Person-2", "No."),
+    ]
+    segments, stats = compact_transcript(transcript, token_budget=0)
+    texts = [s['en'] for s in segments]
+
+    assert stats['fillers'] == 3
+    assert texts == [
+        "We ship the release on Friday. Can you review the design first?",
+        "Yeah.",                              # Answers the question
+        "How many tests fail?",
+        "42.",
+        "Is the server down?",
+        "No.",
+    ]
+
+
+def test_duplicates_and_merge():
+    transcript = [
+        segment(0, "Person-1", "We should move the deadline"),
+        segment(1, "Person-1", "We should move the deadline to next week."),
+        segment(2, "Person-1", "The budget is fine."),
+        segment(3, "Person-2", "Agreed."),
+    ]
+    segments, stats = compact_transcript(transcript, token_budget=0)
+
+    assert stats['duplicates'] == 1
+    assert [s['en'] for s in segments] == [
+        "We should move the deadline to next week. The budget is fine.",
+        "Agreed.",
+    ]
+    assert segments[0]['ids'] == [0, 2]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))